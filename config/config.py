@@ -1,5 +1,4 @@
 import os
-import tkinter as tk
 import platform
 
 from program_paths import *
@@ -26,6 +25,14 @@ FILE_PATHS_SAVES_PATH = os.path.join(SAVES_PATH, "view_file_paths.txt")
 CONFIGURATION_SAVES_DIRECTORY = "configurations"
 SETUP_SAVES_DIRECTORY = "setups"
 
+# Calculated values kept between sessions are stored in the cache directory of the user rather than with the saves
+if platform.system() == "Windows":
+    USER_CACHE_PATH = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "YACRAF calculator", "Cache")
+elif platform.system() == "Darwin":
+    USER_CACHE_PATH = os.path.join(os.path.expanduser("~"), "Library", "Caches", "YACRAF calculator")
+else:
+    USER_CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "yacraf_calculator")
+
 # Ensure directory exists
 os.makedirs(SCRIPTS_PATH, exist_ok=True)
 
@@ -34,8 +41,9 @@ os.makedirs(SCRIPTS_PATH, exist_ok=True)
 # Available types of attribute values
 VALUE_TYPES = (ValueTypeString, ValueTypeNumber, ValueTypeProbability, ValueTypeTriangleDistribution)
 
-# Available types of calculation operations between input attribute values
-CALCULATION_TYPES = (CalculationTypeMean, CalculationTypeAND, CalculationTypeOR, CalculationTypeMultiplication, CalculationTypeDivision, CalculationTypeSampleTriangle, CalculationTypeQualitative)
+# Available types of calculation operations between input attribute values, both built-in and from the plugins directory
+calculation_type_registry.load_plugins(PLUGINS_PATH, CalculationType)
+CALCULATION_TYPES = calculation_type_registry.get_calculation_types()
 
 
 
@@ -189,6 +197,7 @@ OPTIONS_TITLE_COLOR = "dim gray"
 OPTIONS_HEADER_COLOR = "gray"
 OPTIONS_BUTTON_COLOR = "light gray"
 OPTIONS_BACKGROUND_COLOR = "gainsboro"
+OPTIONS_MAX_SHOWN_WARNINGS = 10 # Most frequent warnings shown after a calculation
 
 
 
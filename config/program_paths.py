@@ -29,3 +29,4 @@ IMPORT_PATHS = (SOURCE_PATH, \
 
 SAVES_DIRECTORY = "saves"
 SCRIPTS_PATH = os.path.join(BASE_PATH, "scripts")
+PLUGINS_PATH = os.path.join(BASE_PATH, "plugins")
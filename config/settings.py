@@ -13,6 +13,16 @@ class Settings:
         self.__canvas_height = 600
         self.__num_samples = 10000
         self.__warn_duplicate_names = True
+        self.__batch_calculations = False
+        self.__monte_carlo = False
+        self.__exact_triangle_comparison = False
+        self.__seed = 0
+        self.__adaptive_sampling = False
+        self.__sampling_tolerance = 0.002
+        self.__min_samples = 500
+        self.__sampling_strategy = "Random"
+        self.__num_processes = 1
+        self.__verbose_warnings = False
         self.__save_name = save_name
         
         if os.path.exists(SETTINGS_FILE):
@@ -32,6 +42,36 @@ class Settings:
                     elif variable == "WARN_DUPLICATE_NAMES":
                         self.__warn_duplicate_names = value == "True"
                         
+                    elif variable == "BATCH_CALCULATIONS":
+                        self.__batch_calculations = value == "True" # Whether attributes sharing value type and calculation type are calculated together
+                        
+                    elif variable == "MONTE_CARLO":
+                        self.__monte_carlo = value == "True" # Whether triangle distributions are represented by samples that all calculation types operate on
+                        
+                    elif variable == "EXACT_TRIANGLE_COMPARISON":
+                        self.__exact_triangle_comparison = value == "True" # Whether two triangle distributions are compared analytically instead of by sampling
+                        
+                    elif variable == "SEED":
+                        self.__seed = int(value) # Seed of the random streams used when sampling distributions
+                        
+                    elif variable == "ADAPTIVE_SAMPLING":
+                        self.__adaptive_sampling = value == "True" # Whether to stop sampling once the standard error is below the tolerance, where the number of samples is the maximum
+                        
+                    elif variable == "SAMPLING_TOLERANCE":
+                        self.__sampling_tolerance = float(value)
+                        
+                    elif variable == "MIN_SAMPLES":
+                        self.__min_samples = int(value) # Minimum number of samples when sampling adaptively, which also is the number of samples drawn in each step
+                        
+                    elif variable == "SAMPLING_STRATEGY":
+                        self.__sampling_strategy = value # Name of the strategy used when drawing samples, found in sampler.py
+                        
+                    elif variable == "NUM_PROCESSES":
+                        self.__num_processes = int(value) # Number of processes calculating independent parts of the setup in parallel, where 1 calculates everything in the program's own process
+                        
+                    elif variable == "VERBOSE_WARNINGS":
+                        self.__verbose_warnings = value == "True" # Whether warnings found while calculating are printed when found, rather than only collected
+                        
                     elif variable == "SAVE_NAME":
                         if save_name == None:
                             self.__save_name = value
@@ -58,6 +98,66 @@ class Settings:
     def set_warn_duplicate_names(self, warn_duplicate_names):
         self.__warn_duplicate_names = warn_duplicate_names
         
+    def uses_batch_calculations(self):
+        return self.__batch_calculations
+        
+    def set_batch_calculations(self, batch_calculations):
+        self.__batch_calculations = batch_calculations
+        
+    def uses_monte_carlo(self):
+        return self.__monte_carlo
+        
+    def set_monte_carlo(self, monte_carlo):
+        self.__monte_carlo = monte_carlo
+        
+    def uses_exact_triangle_comparison(self):
+        return self.__exact_triangle_comparison
+        
+    def set_exact_triangle_comparison(self, exact_triangle_comparison):
+        self.__exact_triangle_comparison = exact_triangle_comparison
+        
+    def get_seed(self):
+        return self.__seed
+        
+    def set_seed(self, seed):
+        self.__seed = seed
+        
+    def uses_adaptive_sampling(self):
+        return self.__adaptive_sampling
+        
+    def set_adaptive_sampling(self, adaptive_sampling):
+        self.__adaptive_sampling = adaptive_sampling
+        
+    def get_sampling_tolerance(self):
+        return self.__sampling_tolerance
+        
+    def set_sampling_tolerance(self, sampling_tolerance):
+        self.__sampling_tolerance = sampling_tolerance
+        
+    def get_min_samples(self):
+        return self.__min_samples
+        
+    def set_min_samples(self, min_samples):
+        self.__min_samples = min_samples
+        
+    def get_sampling_strategy(self):
+        return self.__sampling_strategy
+        
+    def set_sampling_strategy(self, sampling_strategy):
+        self.__sampling_strategy = sampling_strategy
+        
+    def get_num_processes(self):
+        return self.__num_processes
+        
+    def set_num_processes(self, num_processes):
+        self.__num_processes = num_processes
+        
+    def uses_verbose_warnings(self):
+        return self.__verbose_warnings
+        
+    def set_verbose_warnings(self, verbose_warnings):
+        self.__verbose_warnings = verbose_warnings
+        
     def get_save_name(self):
         return self.__save_name
         
@@ -67,5 +167,15 @@ class Settings:
                                     ("CANVAS_HEIGHT", self.__canvas_height), \
                                     ("NUM_SAMPLES", self.__num_samples), \
                                     ("WARN_DUPLICATE_NAMES", self.__warn_duplicate_names), \
+                                    ("BATCH_CALCULATIONS", self.__batch_calculations), \
+                                    ("MONTE_CARLO", self.__monte_carlo), \
+                                    ("EXACT_TRIANGLE_COMPARISON", self.__exact_triangle_comparison), \
+                                    ("SEED", self.__seed), \
+                                    ("ADAPTIVE_SAMPLING", self.__adaptive_sampling), \
+                                    ("SAMPLING_TOLERANCE", self.__sampling_tolerance), \
+                                    ("MIN_SAMPLES", self.__min_samples), \
+                                    ("SAMPLING_STRATEGY", self.__sampling_strategy), \
+                                    ("NUM_PROCESSES", self.__num_processes), \
+                                    ("VERBOSE_WARNINGS", self.__verbose_warnings), \
                                     ("SAVE_NAME", self.__save_name)]:
                 file_settings.write(f"{variable} = {value}\n")
@@ -1,6 +1,7 @@
-import tkinter as tk
 import sys
 import os
+import time
+import importlib.util
 
 sys.path.append("config")
 from program_paths import *
@@ -12,8 +13,23 @@ for path in IMPORT_PATHS:
 from settings import Settings
 
 def main():
+    # Calculate the values of a save without any GUI, optionally running a script first
+    if len(sys.argv) >= 3 and sys.argv[1] == "--headless":
+        options = dict(zip(sys.argv[3::2], sys.argv[4::2])) # Key: Option, Value: Given value
+        
+        if len(sys.argv) % 2 == 0 or any(option not in ("--out", "--script") for option in options):
+            print(f"Usage: {sys.argv[0]} --headless <save_name> [--out <results_file>] [--script <script_name>]")
+            return
+            
+        save_name = sys.argv[2]
+        results_file_path = options.get("--out", "results.json")
+        
+        run_headless(save_name, results_file_path, options.get("--script"))
+        return
+        
     if len(sys.argv) != 2:
         print(f"Usage: {sys.argv[0]} <save_name>")
+        print(f"       {sys.argv[0]} --headless <save_name> [--out <results_file>] [--script <script_name>]")
         
         saves_path = os.path.join(BASE_PATH, SAVES_DIRECTORY)
         print(f"Existing saves: {[name for name in os.listdir(saves_path) if os.path.isdir(os.path.join(saves_path, name))]}")
@@ -24,12 +40,57 @@ def main():
     settings = Settings(save_name)
     settings.save()
     
+    import tkinter as tk
     from model import Model
     
     root = tk.Tk()
     model = Model(root)
     root.mainloop()
     
+def run_headless(save_name, results_file_path, script_name=None):
+    """
+    Restores the calculation blocks of a save, calculates all values, and writes them to a JSON file, without importing tkinter
+    
+    script_name: Name of a script in the scripts directory to run after calculating, as shown on its button in the GUI, None to not run any script
+    """
+    if not os.path.isdir(os.path.join(BASE_PATH, SAVES_DIRECTORY, save_name)):
+        print(f"Error: Could not find save {save_name}")
+        return
+        
+    if script_name != None and not os.path.isfile(os.path.join(SCRIPTS_PATH, f"{script_name}.py")):
+        print(f"Error: Could not find script {script_name}")
+        print(f"Existing scripts: {[name.replace('.py', '') for name in os.listdir(SCRIPTS_PATH) if name.endswith('.py') and name != 'SCRIPT_TEMPLATE.py']}")
+        return
+        
+    settings = Settings(save_name)
+    settings.save()
+    
+    from headless_model import HeadlessModel
+    from diagnostics import diagnostics
+    
+    start_time = time.perf_counter()
+    
+    headless_model = HeadlessModel()
+    headless_model.calculate_values()
+    
+    if script_name != None:
+        from script_interface import ScriptInterface
+        
+        # Import the module of the script
+        spec = importlib.util.spec_from_file_location(script_name, os.path.join(SCRIPTS_PATH, f"{script_name}.py"))
+        script_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(script_module)
+        
+        script_module.script_control(ScriptInterface(headless_model))
+        
+        # Markers cannot be drawn, so they are printed instead
+        for script_marker in headless_model.get_script_markers():
+            print(f"Marker {script_marker['value']} ({script_marker['color']}): {script_marker['view']} / {script_marker['class_type']} / {script_marker['class_instance']}")
+            
+    headless_model.save_results(results_file_path)
+    
+    diagnostics.print_summary()
+    print(f"Calculated {save_name} in {time.perf_counter() - start_time:.3f} s, results written to {results_file_path}")
+    
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,55 @@
+# Copy this file and rename it to add the calculation types in it to the program, where every subclass of CalculationType defined in the file is added
+# The calculation types are added after the built-in ones in the configuration views, and their symbols must not be used by any other calculation type
+
+# Methods of a calculation type:
+
+# symbol()
+#     Returns the short text shown on the input block of a configuration attribute using the calculation type
+
+# explaination()
+#     Returns the text shown when choosing the calculation type
+
+# number_of_inputs()
+#     Returns the number of inputs the calculation type requires, where the order of the inputs matters, or None if any number of inputs is allowed (default None)
+
+# supported_value_types()
+#     Returns the value types of the attributes that can be calculated with the calculation type (default numbers, probabilities and triangle distributions)
+
+# allowed_input_value_types(value_type)
+#     Returns the value types allowed as inputs when calculating an attribute of the specified value type (default triangle distributions for triangle distributions, otherwise numbers and probabilities)
+
+# check_input_value_types(value_type, input_value_types)
+#     Returns None if an attribute of the specified value type can be calculated from inputs of the specified value types, otherwise a warning telling why not (default checks each input against allowed_input_value_types)
+
+# calculate_output_value(input_values, sampler)
+#     Returns the value of a single attribute as a NumPy array, calculated from a list of NumPy arrays with the value of each input
+
+# supports_batches() and calculate_output_values_batch(input_values, input_counts)
+#     Optionally calculates the values of many attributes as one NumPy operation, where input_values is a 3D NumPy array (attribute, input, value) padded with zeros and input_counts is the number of inputs of each attribute
+#     Used instead of calculate_output_value when batch calculations are enabled in the settings, so both should give the same values
+
+import numpy as np
+from general_calculations import CalculationType
+
+class CalculationTypeMaximum(CalculationType):
+    @staticmethod
+    def symbol():
+        return "^"
+        
+    @staticmethod
+    def explaination():
+        return "Maximum"
+        
+    @staticmethod
+    def calculate_output_value(input_values, sampler):
+        return np.max(np.stack(input_values), axis=0)
+        
+    @staticmethod
+    def supports_batches():
+        return True
+        
+    @staticmethod
+    def calculate_output_values_batch(input_values, input_counts):
+        # Ignore the zeros used as padding
+        is_input = np.arange(input_values.shape[1])[None, :, None] < input_counts[:, None, None]
+        return np.max(np.where(is_input, input_values, -np.inf), axis=1)
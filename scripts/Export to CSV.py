@@ -1,27 +1,33 @@
+import numpy as np
+
 def script_logic(script_if):
     # Insert logic here
     script_if.calculate_values()
     
     # Write all class instances of the given types to CSV format that can be converted to a table used in a report
     for class_type_name in ("Loss event", "Abuse case", "Attacker"):
-        headers = [class_type_name]
+        attribute_names = script_if.get_attribute_names(class_type_name)
+        headers = [class_type_name] + attribute_names
         rows = []
         
+        # The values of all class instances and attributes of the class type are read at once
+        class_instance_names, values_per_attribute = script_if.get_attribute_table(class_type_name, attribute_names)
+        
         # For each unique class instance found among the class types
-        for i, class_instance_name in enumerate(script_if.get_class_instance_names(class_type_name)):
+        for i, class_instance_name in enumerate(class_instance_names):
             row = [class_instance_name]
             
             # For each attribute type that the current class type has
-            for attribute_name in script_if.get_attribute_names(class_type_name):
-                if i == 0:
-                    headers.append(attribute_name)
-                    
-                attribute_values = script_if.get_attribute_values(class_type_name, class_instance_name, attribute_name)
+            for attribute_name in attribute_names:
+                values = values_per_attribute[attribute_name][i]
                 
-                if len(attribute_values) > 1:
-                    print(f"Warning: Multiple attributes found when searching for {class_type_name}, {class_instance_name}, and {attribute_name}, using the attribute value of the first encountered")
+                # Values that are not numbers, such as text or missing values, are not included in the table
+                if np.isnan(values).all():
+                    attribute_value = script_if.get_attribute_values(class_type_name, class_instance_name, attribute_name)[0]
+                else:
+                    attribute_value = tuple(values[~np.isnan(values)].tolist())
                     
-                row.append(script_if.convert_value_to_string(attribute_values[0]))
+                row.append(script_if.convert_value_to_string(attribute_value))
                 
             rows.append(row)
             
@@ -28,6 +28,15 @@
 #     Returns a list of the values displayed by the specified attributes, each displayed value being represented by a tuple
 #     Example: [(1, 2, 3), (0.45,), ("Text",), ...]
 
+# script_if.get_attribute_sampling_errors(class_type, class_instance, attribute, view=None)
+#     Returns a list of the standard errors of the values of the specified attributes, in the same order as get_attribute_values, where the error is None for values not estimated by sampling
+#     Example: [0.0098, None, ...]
+
+# script_if.get_attribute_table(class_type, attributes=None, view=None)
+#     Returns the displayed values of the listed attributes (all attributes if None) of all instances of a class type at once, which is much faster than get_attribute_values when reading many values
+#     Returns a tuple of a list of class instance names and a dictionary with a NumPy array for each attribute, with one row of individual values per class instance, where values that are not numbers are NaN
+#     Example: (["DoS attack", ...], {"Local difficulty": array([[1., 2., 3.], ...]), ...})
+
 # script_if.convert_value_to_string(attribute_value)
 #     Returns the specified attribute tuple value as a formatted string
 
@@ -37,12 +46,32 @@
 # script_if.reset_override_attribute_values(*, class_type=None, class_instance=None, attribute=None, view=None)
 #     Resets any override value of matching attributes
 
+# script_if.calculate_scenario_values(scenarios, class_type, class_instance, attribute, view=None)
+#     Calculates the values of the specified attributes in several scenarios at once, without changing the displayed values
+#     Each scenario is a dictionary of override values keyed by (class_type, class_instance, attribute), where None considers all
+#     Returns a list with a list of values for each scenario, in the same format as get_attribute_values
+#     Example: script_if.calculate_scenario_values([{("Defense", "Firewall", "Enabled"): 0}, {("Defense", "Firewall", "Enabled"): 1}], "Asset", None, "Risk")
+
+# script_if.get_sensitivities(class_type, class_instance, attribute, *, relative_change=0.1, view=None)
+#     Decreases and increases each manually entered attribute that the specified attribute depends on by the relative change, and returns how much the value of the specified attribute changes
+#     Returns a list of tuples (input_class_type, input_class_instance, input_attribute, low_value, high_value, effect) sorted with the largest effect first, where the effect is the difference between the means of the high and low values
+#     Example: [("Attack step", "Phishing", "Local difficulty", (2.1, 3.0, 4.2), (2.4, 3.3, 4.6), 0.33), ...]
+
 # script_if.set_class_marker(value, color, *, class_type=None, class_instance=None, view=None)
 #     Adds a visual marker on all matching class instances
 
 # script_if.calculate_values()
 #     Calculates all attribute values
 
+# with script_if.batch():
+#     Stages override values, resets of override values and markers made within the block, applying them at the end of the block with a single calculation and update of the displayed values
+#     Nothing is applied if an exception is raised within the block, and values read within the block do not include the staged changes
+#     Example: with script_if.batch(): script_if.override_attribute_values(0, "Defense", attribute="Enabled")
+
+# script_if.get_diagnostics()
+#     Returns a list of dictionaries describing the distinct warnings found by the last calculation, with the most frequent first
+#     Example: [{"code": "Invalid input value", "message": "Warning: ...", "class_type": "Attack step", "class_instance": "Phishing", "attribute": "Local difficulty", "count": 3}, ...]
+
 def script_logic(script_if):
     # Insert logic here
     script_if.calculate_values()
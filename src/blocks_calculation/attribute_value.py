@@ -0,0 +1,109 @@
+from enum import IntEnum
+import numpy as np
+
+class ValueStatus(IntEnum):
+    """
+    Kind of value held by an attribute value, where only numbers are used in calculations
+    """
+    NUMBERS = 0 # One or more floats, such as a number or a triangle distribution
+    TEXT = 1 # Anything that is not only floats, such as a string or an incorrectly entered value
+    MISSING = 2 # Displayed as "-", could not be calculated as inputs are missing
+    SETUP_ERROR = 3 # Could not be calculated as an input value was incorrect
+    CONFIGURATION_ERROR = 4 # Could not be calculated as the configuration attribute is not correctly connected
+    
+# Tuples displayed for the values that are not numbers or text
+STATUS_TUPLES = {ValueStatus.MISSING: ("-",), \
+                 ValueStatus.SETUP_ERROR: ("SETUP ERROR",), \
+                 ValueStatus.CONFIGURATION_ERROR: ("CONFIGURATION ERROR",)}
+                 
+class AttributeValue:
+    """
+    Value of a setup attribute, holding the numbers as a read-only NumPy array so that calculations can use them without converting from tuples
+    Values are converted to and from tuples only where they are displayed, saved or given to scripts
+    """
+    __slots__ = ("__elements", "__status")
+    
+    def __init__(self, elements, status=ValueStatus.NUMBERS):
+        if status == ValueStatus.NUMBERS:
+            if type(elements) is not np.ndarray or elements.dtype != np.float64:
+                elements = np.array(elements, dtype=np.float64)
+                
+            elements.flags.writeable = False # Shared between attributes, so calculations must not change it in place
+            
+        self.__elements = elements # NumPy array of floats if numbers, tuple if text, otherwise an empty tuple
+        self.__status = status
+        
+    @staticmethod
+    def from_tuple(value):
+        """
+        Returns the attribute value of a tuple in the format displayed and saved, such as (1.0, 2.0, 3.0), ("Text",) or ("-",)
+        """
+        for status, status_tuple in STATUS_TUPLES.items():
+            if value == status_tuple:
+                return STATUS_VALUES[status]
+                
+        if len(value) > 0 and all(isinstance(element, float) for element in value):
+            return AttributeValue(value)
+            
+        return AttributeValue(value, ValueStatus.TEXT)
+        
+    def to_tuple(self):
+        """
+        Returns the value as a tuple in the format displayed and saved
+        """
+        if self.__status == ValueStatus.NUMBERS:
+            return tuple(self.__elements.tolist())
+            
+        elif self.__status == ValueStatus.TEXT:
+            return self.__elements
+            
+        return STATUS_TUPLES[self.__status]
+        
+    def get_elements(self):
+        """
+        Returns a read-only NumPy array of floats if the value is numbers, otherwise a tuple
+        """
+        return self.__elements
+        
+    def get_status(self):
+        return self.__status
+        
+    def is_numbers(self):
+        return self.__status == ValueStatus.NUMBERS
+        
+    def __eq__(self, other):
+        if not isinstance(other, AttributeValue):
+            return NotImplemented
+            
+        if self.__status != other.__status:
+            return False
+            
+        if self.__status == ValueStatus.NUMBERS:
+            return np.array_equal(self.__elements, other.__elements)
+            
+        return self.__elements == other.__elements
+        
+    def __hash__(self):
+        return hash((self.__status, self.to_tuple()))
+        
+    def __reduce__(self):
+        # Recreated through the constructor, so that the elements are read-only in other processes as well
+        return AttributeValue, (self.__elements, self.__status)
+        
+    def __repr__(self):
+        return f"AttributeValue({self.to_tuple()})"
+        
+# Shared values of those without elements
+STATUS_VALUES = {status: AttributeValue((), status) for status in STATUS_TUPLES}
+MISSING_VALUE = STATUS_VALUES[ValueStatus.MISSING]
+SETUP_ERROR_VALUE = STATUS_VALUES[ValueStatus.SETUP_ERROR]
+CONFIGURATION_ERROR_VALUE = STATUS_VALUES[ValueStatus.CONFIGURATION_ERROR]
+
+def to_attribute_value(value):
+    """
+    Returns the attribute value of None, a tuple or an attribute value, where None stays None
+    """
+    if value is None or isinstance(value, AttributeValue):
+        return value
+        
+    return AttributeValue.from_tuple(value)
@@ -0,0 +1,254 @@
+import numpy as np
+from attribute_value import AttributeValue, ValueStatus, STATUS_VALUES
+
+MAX_STORED_WIDTH = 3 # Most numbers of any value type, where values with more numbers are kept outside of the arrays
+NO_VALUE = -1 # Status of an attribute without a value
+
+# Index along the first dimension of the value arrays
+VALUE = 0
+OVERRIDE_VALUE = 1
+
+class AttributeValueStore:
+    """
+    Stores the values, override values, sampling errors and dirty flags of all setup attributes as columns of NumPy arrays, where each setup attribute has a row given by its attribute id
+    Setup attributes only keep their attribute id and read and write their values through the store, so that operations on many setup attributes can be done as single NumPy operations
+    
+    Numbers are stored in rows of a float array together with their width and status, while text and values with more numbers than fit in a row are kept in dictionaries
+    The AttributeValues read or written during a calculation are kept until the cache is cleared, so that calculations do not recreate them every time an input value is read
+    """
+    def __init__(self, capacity=1024):
+        self.__numbers = np.zeros((2, capacity, MAX_STORED_WIDTH)) # Value and override value of each attribute id
+        self.__widths = np.zeros((2, capacity), dtype=np.int8)
+        self.__statuses = np.full((2, capacity), NO_VALUE, dtype=np.int8) # ValueStatus, or NO_VALUE if there is no value
+        self.__other_values = ({}, {}) # Key: Attribute id, Value: AttributeValue that does not fit in the arrays, for values and override values respectively
+        self.__sampling_errors = np.full(capacity, np.nan) # NaN if the value was not estimated by sampling
+        self.__is_dirty = np.ones(capacity, dtype=bool)
+        self.__cached_values = ([None] * capacity, [None] * capacity) # AttributeValue of each attribute id, None if not cached, for values and override values respectively
+        self.__free_attribute_ids = [] # Released attribute ids, reused before new rows are taken
+        self.__num_attribute_ids = 0 # Number of rows ever taken
+        
+    def add(self):
+        """
+        Returns the attribute id of a new row without a value or override value, which is marked as dirty
+        """
+        if len(self.__free_attribute_ids) > 0:
+            attribute_id = self.__free_attribute_ids.pop()
+        else:
+            if self.__num_attribute_ids == len(self.__is_dirty):
+                self.grow()
+                
+            attribute_id = self.__num_attribute_ids
+            self.__num_attribute_ids += 1
+            
+        self.__statuses[:, attribute_id] = NO_VALUE
+        self.__cached_values[VALUE][attribute_id] = None
+        self.__cached_values[OVERRIDE_VALUE][attribute_id] = None
+        self.__sampling_errors[attribute_id] = np.nan
+        self.__is_dirty[attribute_id] = True
+        
+        return attribute_id
+        
+    def release(self, attribute_id):
+        """
+        Makes the row of an attribute id available to new setup attributes
+        """
+        for other_values in self.__other_values:
+            other_values.pop(attribute_id, None)
+            
+        self.__free_attribute_ids.append(attribute_id)
+        
+    def grow(self):
+        """
+        Doubles the number of rows, keeping the existing rows
+        """
+        capacity = 2 * len(self.__is_dirty)
+        
+        self.__numbers = np.concatenate([self.__numbers, np.zeros_like(self.__numbers)], axis=1)
+        self.__widths = np.concatenate([self.__widths, np.zeros_like(self.__widths)], axis=1)
+        self.__statuses = np.concatenate([self.__statuses, np.full_like(self.__statuses, NO_VALUE)], axis=1)
+        self.__sampling_errors = np.concatenate([self.__sampling_errors, np.full(capacity // 2, np.nan)])
+        self.__is_dirty = np.concatenate([self.__is_dirty, np.ones(capacity // 2, dtype=bool)])
+        
+        for cached_values in self.__cached_values:
+            cached_values.extend([None] * (capacity // 2))
+            
+    def clear_cache(self):
+        """
+        Removes all cached AttributeValues, which are recreated from the arrays when read again
+        """
+        capacity = len(self.__is_dirty)
+        self.__cached_values = ([None] * capacity, [None] * capacity)
+        
+    def get(self, kind, attribute_id):
+        """
+        Returns the AttributeValue of an attribute id, or None if there is no value
+        
+        kind: VALUE or OVERRIDE_VALUE
+        """
+        status = self.__statuses.item(kind, attribute_id)
+        
+        if status == NO_VALUE:
+            return None
+            
+        value = self.__cached_values[kind][attribute_id]
+        
+        if value is not None:
+            return value
+            
+        if attribute_id in self.__other_values[kind]:
+            value = self.__other_values[kind][attribute_id]
+            
+        elif status == ValueStatus.NUMBERS:
+            value = AttributeValue(self.__numbers[kind, attribute_id, :self.__widths.item(kind, attribute_id)].copy())
+            
+        else:
+            value = STATUS_VALUES[status]
+            
+        self.__cached_values[kind][attribute_id] = value
+        return value
+        
+    def set(self, kind, attribute_id, value):
+        """
+        Sets the AttributeValue of an attribute id, where None removes the value
+        
+        kind: VALUE or OVERRIDE_VALUE
+        """
+        self.__other_values[kind].pop(attribute_id, None)
+        self.__cached_values[kind][attribute_id] = value
+        
+        if value is None:
+            self.__statuses[kind, attribute_id] = NO_VALUE
+            return
+            
+        status = value.get_status()
+        self.__statuses[kind, attribute_id] = status
+        
+        if status == ValueStatus.NUMBERS and len(value.get_elements()) <= MAX_STORED_WIDTH:
+            elements = value.get_elements()
+            self.__numbers[kind, attribute_id, :len(elements)] = elements
+            self.__widths[kind, attribute_id] = len(elements)
+            
+        elif status in (ValueStatus.NUMBERS, ValueStatus.TEXT):
+            self.__other_values[kind][attribute_id] = value
+            
+    def has(self, kind, attribute_id):
+        return self.__statuses.item(kind, attribute_id) != NO_VALUE
+        
+    def get_current_numbers(self, attribute_ids):
+        """
+        Returns a NumPy array with a row for each of the specified attribute ids, holding the numbers of the override value if there is one, otherwise of the value
+        The rows are as wide as the widest value, where the numbers past the width of a value and values that are not numbers, such as text or missing values, are NaN
+        
+        attribute_ids: NumPy array of attribute ids
+        """
+        kinds = np.where(self.__statuses[OVERRIDE_VALUE, attribute_ids] != NO_VALUE, OVERRIDE_VALUE, VALUE)
+        statuses = self.__statuses[kinds, attribute_ids]
+        widths = np.where(statuses == ValueStatus.NUMBERS, self.__widths[kinds, attribute_ids], 0)
+        wide_elements_per_row = {} # Key: Row, Value: Numbers of a value with more numbers than fit in the arrays
+        
+        for kind, other_values in enumerate(self.__other_values):
+            if len(other_values) > 0:
+                is_wide = (kinds == kind) & (statuses == ValueStatus.NUMBERS) & np.isin(attribute_ids, np.fromiter(other_values, dtype=int, count=len(other_values)))
+                
+                for row in np.flatnonzero(is_wide).tolist():
+                    wide_elements_per_row[row] = other_values[attribute_ids[row]].get_elements()
+                    widths[row] = 0
+                    
+        width = max([1, int(widths.max(initial=0))] + [len(elements) for elements in wide_elements_per_row.values()])
+        numbers = np.full((len(attribute_ids), width), np.nan)
+        stored_width = min(width, MAX_STORED_WIDTH)
+        
+        numbers[:, :stored_width] = np.where(np.arange(stored_width) < widths[:, np.newaxis], self.__numbers[kinds, attribute_ids, :stored_width], np.nan)
+        
+        for row, elements in wide_elements_per_row.items():
+            numbers[row, :len(elements)] = elements
+            
+        return numbers
+        
+    def get_sampling_error(self, attribute_id):
+        """
+        Returns the standard error of the value if it was estimated by sampling, otherwise None
+        """
+        sampling_error = self.__sampling_errors.item(attribute_id)
+        
+        # NaN is the only value not equal to itself
+        if sampling_error != sampling_error:
+            return None
+            
+        return sampling_error
+        
+    def set_sampling_error(self, attribute_id, sampling_error):
+        self.__sampling_errors[attribute_id] = np.nan if sampling_error == None else sampling_error
+        
+    def is_dirty(self, attribute_id):
+        return self.__is_dirty.item(attribute_id)
+        
+    def get_dirty(self, attribute_ids):
+        """
+        Returns a NumPy array of whether each of the specified attribute ids is dirty
+        """
+        return self.__is_dirty[attribute_ids]
+        
+    def set_dirty(self, attribute_ids, is_dirty):
+        """
+        attribute_ids: Attribute id or NumPy array of attribute ids
+        """
+        self.__is_dirty[attribute_ids] = is_dirty
+        
+    def reset_override_values(self, attribute_ids):
+        """
+        Removes the override values of all specified attribute ids, marking those that had one as dirty
+        
+        attribute_ids: NumPy array of attribute ids
+        
+        Returns a NumPy array of the attribute ids that had an override value
+        """
+        attribute_ids = attribute_ids[self.__statuses[OVERRIDE_VALUE, attribute_ids] != NO_VALUE]
+        
+        if len(self.__other_values[OVERRIDE_VALUE]) > 0:
+            for attribute_id in attribute_ids.tolist():
+                self.__other_values[OVERRIDE_VALUE].pop(attribute_id, None)
+                
+        self.__statuses[OVERRIDE_VALUE, attribute_ids] = NO_VALUE
+        self.__is_dirty[attribute_ids] = True
+        self.clear_cache()
+        
+        return attribute_ids
+        
+    def take_snapshot(self, attribute_ids):
+        """
+        Returns a copy of everything stored for the specified attribute ids, which can be given to restore_snapshot
+        
+        attribute_ids: NumPy array of attribute ids
+        """
+        attribute_id_set = set(attribute_ids.tolist())
+        
+        return (attribute_ids.copy(), \
+                self.__numbers[:, attribute_ids], \
+                self.__widths[:, attribute_ids], \
+                self.__statuses[:, attribute_ids], \
+                tuple({attribute_id: value for attribute_id, value in other_values.items() if attribute_id in attribute_id_set} for other_values in self.__other_values), \
+                self.__sampling_errors[attribute_ids], \
+                self.__is_dirty[attribute_ids])
+                
+    def restore_snapshot(self, snapshot):
+        """
+        Sets everything stored for the attribute ids of a snapshot back to what it was when the snapshot was taken
+        """
+        attribute_ids, numbers, widths, statuses, other_values_snapshot, sampling_errors, is_dirty = snapshot
+        
+        for other_values, other_values_in_snapshot in zip(self.__other_values, other_values_snapshot):
+            if len(other_values) > 0:
+                for attribute_id in attribute_ids.tolist():
+                    other_values.pop(attribute_id, None)
+                    
+            other_values.update(other_values_in_snapshot)
+            
+        self.__numbers[:, attribute_ids] = numbers
+        self.__widths[:, attribute_ids] = widths
+        self.__statuses[:, attribute_ids] = statuses
+        self.__sampling_errors[attribute_ids] = sampling_errors
+        self.__is_dirty[attribute_ids] = is_dirty
+        self.clear_cache()
+        
+attribute_value_store = AttributeValueStore() # Values of all setup attributes in the process
@@ -0,0 +1,78 @@
+import os
+import sys
+import inspect
+import importlib
+from diagnostics import diagnostics, PLUGIN_NOT_LOADED, DUPLICATE_CALCULATION_TYPE
+
+class CalculationTypeRegistry:
+    """
+    Keeps the calculation types that configuration attributes can use, both those built into the program and those loaded from the plugins directory
+    A calculation type is a subclass of CalculationType, declaring which value types it supports and how values are calculated from the input values, optionally for several attributes at once
+    """
+    def __init__(self):
+        self.__calculation_types = [] # In the order they are shown
+        
+    def register(self, calculation_type):
+        """
+        Adds a calculation type, unless another calculation type already uses its symbol
+        
+        Returns whether the calculation type was added
+        """
+        for registered_calculation_type in self.__calculation_types:
+            if registered_calculation_type.symbol() == calculation_type.symbol():
+                if registered_calculation_type != calculation_type:
+                    diagnostics.add(DUPLICATE_CALCULATION_TYPE, f"Warning: Calculation type {calculation_type.__name__} was not added, as its symbol {calculation_type.symbol()} already is used by {registered_calculation_type.__name__}")
+                    
+                return False
+                
+        self.__calculation_types.append(calculation_type)
+        return True
+        
+    def get_calculation_types(self):
+        return tuple(self.__calculation_types)
+        
+    def load_plugins(self, plugins_path, base_calculation_type):
+        """
+        Imports every Python file in the plugins directory, except the template, and adds the calculation types defined in them
+        The directory is added to the import paths, so that saves referring to calculation types of plugins can be restored
+        
+        Problems with the plugins are recorded as diagnostics, which are also printed as the plugins are loaded before any calculation
+        
+        base_calculation_type: Class that the calculation types of the plugins are subclasses of
+        """
+        if not os.path.isdir(plugins_path):
+            return
+            
+        if plugins_path not in sys.path:
+            sys.path.append(plugins_path)
+            
+        # Not caused by any specific attribute
+        previous_context = diagnostics.set_context(None)
+        previous_is_verbose = diagnostics.is_verbose()
+        diagnostics.set_verbose(True)
+        
+        for file_name_full in sorted(os.listdir(plugins_path)):
+            if file_name_full.strip()[-3:] != ".py":
+                continue
+                
+            module_name = file_name_full.strip().replace(".py", "")
+            
+            # Skip the template file
+            if module_name == "PLUGIN_TEMPLATE":
+                continue
+                
+            # A plugin that cannot be imported should not prevent the program from starting
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as e:
+                diagnostics.add(PLUGIN_NOT_LOADED, f"Warning: Could not load the plugin {file_name_full}: {e}")
+                continue
+                
+            for _, calculation_type in inspect.getmembers(module, inspect.isclass):
+                if issubclass(calculation_type, base_calculation_type) and calculation_type.__module__ == module.__name__:
+                    self.register(calculation_type)
+                    
+        diagnostics.set_verbose(previous_is_verbose)
+        diagnostics.set_context(previous_context)
+        
+calculation_type_registry = CalculationTypeRegistry() # Calculation types available in the process
@@ -1,3 +1,7 @@
+import weakref
+from evaluation_plan import mark_structure_changed
+from diagnostics import diagnostics
+from general_calculations import CalculationKernel
 from config import *
 
 class ConfigurationAttribute:
@@ -13,6 +17,9 @@ class ConfigurationAttribute:
         self.__input_scalar = 1 # Float or integer
         self.__input_offset = 0 # Float or integer
         self.__is_hidden = False
+        self.__dependent_configuration_attributes = weakref.WeakSet() # Configuration attributes taking this one as input, whose validation depends on its value type
+        self.__is_correctly_connected = None # Cached result of validating the value type, calculation type and inputs, None if it needs to be validated again
+        self.__kernel = None # Cached CalculationKernel, None if it needs to be created again
         
     def get_name(self):
         return self.__name
@@ -23,17 +30,32 @@ class ConfigurationAttribute:
     def get_configuration_class(self):
         return self.__configuration_class
         
+    def get_diagnostics_names(self):
+        """
+        Returns a tuple (class type, class instance, attribute) identifying this attribute in diagnostics, where the class instance is None
+        """
+        return (self.__configuration_class.get_name(), None, self.__name)
+        
     def get_value_type(self):
         return self.__value_type
         
     def set_value_type(self, value_type):
         self.__value_type = value_type
+        self.mark_validation_changed()
+        self.mark_setup_attributes_dirty()
+        
+        # The value type is checked when validating the configuration attributes taking this one as input
+        for dependent_configuration_attribute in self.__dependent_configuration_attributes:
+            dependent_configuration_attribute.mark_validation_changed()
+            dependent_configuration_attribute.mark_setup_attributes_dirty()
         
     def get_calculation_type(self):
         return self.__calculation_type
         
     def set_calculation_type(self, calculation_type):
         self.__calculation_type = calculation_type
+        self.mark_validation_changed()
+        self.mark_setup_attributes_dirty()
         
     def get_input_configuration_attributes(self):
         return self.__input_configuration_attributes
@@ -47,28 +69,91 @@ class ConfigurationAttribute:
         is_internal: Whether the configuration attribute added as an input is connected internally (within the same class instance)
         """
         self.__input_configuration_attributes[input_configuration_attribute] = is_internal
+        input_configuration_attribute.add_dependent_configuration_attribute(self)
+        self.mark_validation_changed()
+        mark_structure_changed()
         
     def remove_input_configuration_attribute(self, input_configuration_attribute):
         self.__input_configuration_attributes.pop(input_configuration_attribute)
+        input_configuration_attribute.remove_dependent_configuration_attribute(self)
+        self.mark_validation_changed()
+        mark_structure_changed()
+        
+    def add_dependent_configuration_attribute(self, dependent_configuration_attribute):
+        self.__dependent_configuration_attributes.add(dependent_configuration_attribute)
+        
+    def remove_dependent_configuration_attribute(self, dependent_configuration_attribute):
+        # Another input of the dependent attribute might still be this one if connected both internally and externally
+        if self not in dependent_configuration_attribute.get_input_configuration_attributes():
+            self.__dependent_configuration_attributes.discard(dependent_configuration_attribute)
+            
+    def mark_validation_changed(self):
+        """
+        Marks that the cached validation and kernel of this attribute are outdated, without affecting any other configuration attribute
+        """
+        self.__is_correctly_connected = None
+        self.__kernel = None
+        
+    def is_correctly_connected(self):
+        """
+        Returns whether the value type supports the calculation type and the value types of the input configuration attributes
+        The validation is shared by all setup versions of this attribute and only redone after this attribute or the value type of an input has changed, so any warning is printed once
+        """
+        if self.__is_correctly_connected == None:
+            # Warnings are attributed to the configuration attribute, as they apply to all of its setup versions
+            previous_context = diagnostics.set_context(self)
+            
+            self.__is_correctly_connected = self.__value_type.correctly_connected(self.__calculation_type, list(self.__input_configuration_attributes.keys()))
+            
+            diagnostics.set_context(previous_context)
+            
+        return self.__is_correctly_connected
+        
+    def get_kernel(self):
+        """
+        Returns the CalculationKernel calculating the values of all setup versions of this attribute
+        The kernel is only created again after the value type, calculation type, inputs, input scalar or input offset have changed
+        """
+        if self.__kernel == None:
+            self.__kernel = CalculationKernel(self.__value_type, self.__calculation_type, self.is_correctly_connected(), self.__input_scalar, self.__input_offset)
+            
+        return self.__kernel
         
     def get_input_scalar(self):
         return self.__input_scalar
         
     def set_input_scalar(self, input_scalar):
         self.__input_scalar = input_scalar
+        self.__kernel = None
+        self.mark_setup_attributes_dirty()
         
     def reset_input_scalar(self):
         self.__input_scalar = 1
+        self.__kernel = None
+        self.mark_setup_attributes_dirty()
         
     def get_input_offset(self):
         return self.__input_offset
         
     def set_input_offset(self, input_offset):
         self.__input_offset = input_offset
+        self.__kernel = None
+        self.mark_setup_attributes_dirty()
         
     def reset_input_offset(self):
         self.__input_offset = 0
+        self.__kernel = None
+        self.mark_setup_attributes_dirty()
         
+    def mark_setup_attributes_dirty(self):
+        """
+        Marks all setup versions of this attribute to be recalculated, typically due to a change in how their values are calculated
+        """
+        for setup_class in self.__configuration_class.get_setup_class_versions():
+            for setup_attribute in setup_class.get_setup_attributes():
+                if setup_attribute.has_configuration_attribute(self):
+                    setup_attribute.mark_dirty()
+                    
     def is_hidden(self):
         return self.__is_hidden
         
@@ -39,6 +39,9 @@ class ConfigurationClass:
             for setup_class_version in self.__setup_class_versions:
                 setup_class_version.remove_setup_attribute(configuration_attribute)
                 
+    def get_setup_class_versions(self):
+        return self.__setup_class_versions
+        
     def create_setup_version(self):
         setup_class = SetupClass("New instance", self)
         self.__setup_class_versions.append(setup_class)
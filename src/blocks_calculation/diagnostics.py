@@ -0,0 +1,114 @@
+# Codes identifying the kind of problem a diagnostic describes
+INVALID_INPUT_VALUE = "Invalid input value"
+INVALID_INPUT_SCALARS = "Invalid input scalars"
+INVALID_TRIANGLE_DISTRIBUTION = "Invalid triangle distribution"
+WRONG_NUMBER_OF_INPUTS = "Wrong number of inputs"
+UNSUPPORTED_CALCULATION_TYPE = "Unsupported calculation type"
+UNSUPPORTED_INPUT_VALUE_TYPE = "Unsupported input value type"
+CYCLIC_ATTRIBUTES = "Cyclic attributes"
+DUPLICATE_INSTANCE_NAME = "Duplicate instance name"
+PARALLEL_CALCULATION_FAILED = "Parallel calculation failed"
+PLUGIN_NOT_LOADED = "Plugin not loaded"
+DUPLICATE_CALCULATION_TYPE = "Duplicate calculation type"
+RESULT_CACHE_FAILED = "Result cache failed"
+
+class Diagnostics:
+    """
+    Collects the warnings found while calculating as records, where identical warnings are counted rather than repeated
+    Nothing is printed unless verbose, in which case each distinct warning is printed the first time it is found
+    
+    Each warning is attributed to the current context, which is the setup attribute or configuration attribute being calculated or validated
+    """
+    def __init__(self):
+        self.__counts = {} # Key: Tuple (code, message, class type, class instance, attribute), Value: Number of times found
+        self.__context = None # Any object with get_diagnostics_names, such as a setup attribute or configuration attribute
+        self.__is_verbose = False
+        
+    def is_verbose(self):
+        return self.__is_verbose
+        
+    def set_verbose(self, is_verbose):
+        self.__is_verbose = is_verbose
+        
+    def set_context(self, context):
+        """
+        Sets what later warnings are attributed to
+        
+        Returns the previous context, so that it can be restored
+        """
+        previous_context = self.__context
+        self.__context = context
+        
+        return previous_context
+        
+    def add(self, code, message):
+        """
+        Records a warning, where message is the full text that is printed when verbose
+        """
+        if self.__context == None:
+            names = (None, None, None)
+        else:
+            names = self.__context.get_diagnostics_names()
+            
+        self.add_record((code, message) + names, 1)
+        
+    def add_record(self, key, count):
+        if key in self.__counts:
+            self.__counts[key] += count
+            return
+            
+        self.__counts[key] = count
+        
+        if self.__is_verbose:
+            code, message, class_type, class_instance, attribute = key
+            location = " / ".join(name for name in (class_type, class_instance, attribute) if name != None)
+            
+            print(message if location == "" else f"{message} ({location})")
+            
+    def merge(self, counts):
+        """
+        Adds records collected elsewhere, such as in another process
+        
+        counts: Dictionary in the same format as returned by get_counts
+        """
+        for key, count in counts.items():
+            self.add_record(key, count)
+            
+    def get_counts(self):
+        return self.__counts
+        
+    def get_records(self):
+        """
+        Returns a list of dictionaries, one for each distinct warning, with the most frequent first
+        Each dictionary contains the code, message, class type, class instance and attribute of the warning, and how many times it was found
+        """
+        records = [{"code": code, \
+                    "message": message, \
+                    "class_type": class_type, \
+                    "class_instance": class_instance, \
+                    "attribute": attribute, \
+                    "count": count} for (code, message, class_type, class_instance, attribute), count in self.__counts.items()]
+                    
+        records.sort(key=lambda record: record["count"], reverse=True)
+        return records
+        
+    def get_num_warnings(self):
+        """
+        Returns the total number of warnings, counting each repetition
+        """
+        return sum(self.__counts.values())
+        
+    def print_summary(self):
+        """
+        Prints a single line telling how many warnings were found, unless verbose since the warnings then already have been printed
+        """
+        num_warnings = self.get_num_warnings()
+        
+        if not self.__is_verbose and num_warnings > 0:
+            print(f"Warning: Found {num_warnings} warnings ({len(self.__counts)} distinct) while calculating, shown in the settings or printed when found if verbose warnings are enabled")
+            
+    def clear(self):
+        self.__counts = {}
+        self.__context = None
+        
+diagnostics = Diagnostics() # Collects the warnings of all calculations in the process
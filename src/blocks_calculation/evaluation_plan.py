@@ -0,0 +1,431 @@
+import numpy as np
+from concurrent.futures.process import BrokenProcessPool
+from general_calculations import combine_values_batch, sample_triangle_distribution
+from sampler import Sampler
+from diagnostics import diagnostics, CYCLIC_ATTRIBUTES, PARALLEL_CALCULATION_FAILED
+from attribute_value import CONFIGURATION_ERROR_VALUE, MISSING_VALUE
+from attribute_value_store import attribute_value_store
+from parallel_evaluation import ComponentAttribute, evaluate_components, find_components, get_process_pool, shut_down_process_pool, split_into_chunks
+from scenario_evaluation import ScenarioValues, evaluate_scenarios
+from config import *
+
+structure_version = 0 # Incremented whenever the connections between setup attributes might have changed
+
+def mark_structure_changed():
+    """
+    Notifies all evaluation plans that the connections between setup attributes might have changed, so that they are rebuilt before being used again
+    """
+    global structure_version
+    structure_version += 1
+    
+def get_structure_version():
+    return structure_version
+    
+class EvaluationPlan:
+    """
+    Topologically sorted list of setup attributes together with their resolved input setup attributes
+    Built once from a set of setup attributes and reused across calculations until the structure of the setup changes, where later calculations only recalculate setup attributes affected by changed values
+    """
+    def __init__(self, setup_attributes):
+        self.__structure_version = get_structure_version()
+        self.__ordered_setup_attributes = [] # Each setup attribute appears after all of its input setup attributes
+        self.__levels = [] # List of lists of setup attributes, where each setup attribute only takes input from setup attributes in previous levels
+        self.__attribute_ids_per_level = None # List of NumPy arrays with the attribute ids of the setup attributes in each level, found when first needed
+        self.__inputs_per_setup_attribute = {} # Key: Setup attribute, Value: List of input setup attributes
+        self.__dependent_setup_attributes = {} # Key: Setup attribute, Value: List of setup attributes taking it as input
+        self.__cyclic_setup_attributes = [] # Setup attributes that (indirectly) take themselves as input and cannot be ordered
+        self.__components = None # Topologically sorted lists of setup attributes that do not take input from each other, found when first needed
+        self.__needs_full_evaluation = True # Whether all setup attributes should be calculated, regardless of which values have changed
+        self.__used_calculation_settings = None # Settings affecting calculated values in the last evaluation
+        
+        self.resolve_inputs(setup_attributes)
+        self.sort_topologically()
+        
+    def resolve_inputs(self, setup_attributes):
+        """
+        Finds the input setup attributes of all specified setup attributes, including any setup attributes they in turn take input from
+        """
+        setup_attributes_to_resolve = list(setup_attributes)
+        
+        while len(setup_attributes_to_resolve) > 0:
+            setup_attribute = setup_attributes_to_resolve.pop()
+            
+            if setup_attribute in self.__inputs_per_setup_attribute:
+                continue
+                
+            input_setup_attributes = list(setup_attribute.get_connected_setup_attributes().keys())
+            
+            for input_setup_attribute in input_setup_attributes:
+                if input_setup_attribute not in self.__inputs_per_setup_attribute:
+                    setup_attributes_to_resolve.append(input_setup_attribute)
+                    
+            self.__inputs_per_setup_attribute[setup_attribute] = input_setup_attributes
+            
+    def sort_topologically(self):
+        """
+        Orders the setup attributes so that each one comes after all of its input setup attributes (Kahn's algorithm)
+        """
+        num_remaining_inputs = {} # Key: Setup attribute, Value: Number of input setup attributes not yet placed in the order
+        level_per_setup_attribute = {} # Key: Setup attribute, Value: Length of the longest chain of input setup attributes leading to it
+        dependent_setup_attributes = self.__dependent_setup_attributes
+        
+        for setup_attribute, input_setup_attributes in self.__inputs_per_setup_attribute.items():
+            num_remaining_inputs[setup_attribute] = len(input_setup_attributes)
+            
+            for input_setup_attribute in input_setup_attributes:
+                dependent_setup_attributes.setdefault(input_setup_attribute, []).append(setup_attribute)
+                
+        ready_setup_attributes = [setup_attribute for setup_attribute, num_inputs in num_remaining_inputs.items() if num_inputs == 0]
+        
+        while len(ready_setup_attributes) > 0:
+            setup_attribute = ready_setup_attributes.pop()
+            self.__ordered_setup_attributes.append(setup_attribute)
+            
+            # All input setup attributes have been placed, so the level is final
+            level = level_per_setup_attribute.get(setup_attribute, 0)
+            
+            if level == len(self.__levels):
+                self.__levels.append([])
+                
+            self.__levels[level].append(setup_attribute)
+            
+            for dependent_setup_attribute in dependent_setup_attributes.get(setup_attribute, []):
+                level_per_setup_attribute[dependent_setup_attribute] = max(level_per_setup_attribute.get(dependent_setup_attribute, 0), level + 1)
+                num_remaining_inputs[dependent_setup_attribute] -= 1
+                
+                if num_remaining_inputs[dependent_setup_attribute] == 0:
+                    ready_setup_attributes.append(dependent_setup_attribute)
+                    
+        # Any setup attribute that never got all of its inputs placed is part of, or depends on, a cycle
+        if len(self.__ordered_setup_attributes) < len(self.__inputs_per_setup_attribute):
+            self.__cyclic_setup_attributes = [setup_attribute for setup_attribute, num_inputs in num_remaining_inputs.items() if num_inputs > 0]
+            
+            diagnostics.add(CYCLIC_ATTRIBUTES, f"Warning: Found {len(self.__cyclic_setup_attributes)} attributes that (indirectly) take themselves as input, their values cannot be calculated")
+            
+    def is_outdated(self):
+        """
+        Returns whether the structure of the setup has changed since the plan was built
+        """
+        return self.__structure_version != get_structure_version()
+        
+    def get_ordered_setup_attributes(self):
+        return self.__ordered_setup_attributes
+        
+    def get_inputs(self, setup_attribute):
+        """
+        Returns a list of the input setup attributes of the specified setup attribute
+        """
+        return self.__inputs_per_setup_attribute[setup_attribute]
+        
+    def get_dependents(self, setup_attribute):
+        """
+        Returns a list of the setup attributes in the plan that take the specified setup attribute as input
+        """
+        return self.__dependent_setup_attributes.get(setup_attribute, [])
+        
+    def get_levels(self):
+        return self.__levels
+        
+    def get_attribute_ids_per_level(self):
+        """
+        Returns a list of NumPy arrays with the attribute ids of the setup attributes in each level, in the same order as the levels
+        """
+        if self.__attribute_ids_per_level == None:
+            self.__attribute_ids_per_level = [np.array([setup_attribute.get_attribute_id() for setup_attribute in level], dtype=int) for level in self.__levels]
+            
+        return self.__attribute_ids_per_level
+        
+    def get_attribute_ids(self):
+        """
+        Returns a NumPy array with the attribute ids of all setup attributes in the plan
+        """
+        return np.array([setup_attribute.get_attribute_id() for setup_attribute in self.__inputs_per_setup_attribute], dtype=int)
+        
+    def get_components(self):
+        """
+        Returns a list of weakly connected components, each a topologically sorted list of setup attributes that only take input from each other
+        """
+        if self.__components == None:
+            self.__components = find_components(self.__ordered_setup_attributes, self.__inputs_per_setup_attribute)
+            
+        return self.__components
+        
+    def evaluate(self):
+        """
+        Calculates the value of every setup attribute in the plan whose value is missing or might have changed, level by level so that all input values are available
+        A setup attribute is recalculated if it has been marked as dirty or if the current value of any of its input setup attributes changed during this evaluation
+        
+        When sampling is enabled in the settings, triangle distributions are represented by samples and all setup attributes are calculated, since samples are not kept between evaluations
+        When more than one process is enabled in the settings, independent parts of the setup are instead calculated in parallel
+        
+        Returns a list of all setup attributes that were considered during the evaluation
+        """
+        diagnostics.set_verbose(settings.uses_verbose_warnings())
+        
+        sampler = Sampler.from_settings(settings)
+        uses_batch_calculations = settings.uses_batch_calculations()
+        uses_monte_carlo = settings.uses_monte_carlo()
+        calculation_settings = (uses_monte_carlo, sampler.get_configuration())
+        
+        if uses_monte_carlo or calculation_settings != self.__used_calculation_settings:
+            self.__needs_full_evaluation = True
+            
+        updated_setup_attributes = None
+        
+        if settings.get_num_processes() > 1:
+            updated_setup_attributes = self.evaluate_components_in_parallel(sampler, uses_monte_carlo, settings.get_num_processes())
+            
+        if updated_setup_attributes == None:
+            updated_setup_attributes = self.evaluate_levels(sampler, uses_batch_calculations, uses_monte_carlo)
+            
+        for setup_attribute in self.__cyclic_setup_attributes:
+            if setup_attribute.get_attribute_value() is None:
+                setup_attribute.set_value(MISSING_VALUE)
+                
+            setup_attribute.clear_dirty()
+            
+        self.__needs_full_evaluation = False
+        self.__used_calculation_settings = calculation_settings
+        
+        return updated_setup_attributes
+        
+    def mark_evaluated(self):
+        """
+        Marks that the setup attributes not marked as dirty already have the values calculated with the current settings, such as when the values were restored from an earlier session
+        The next evaluation then only calculates the setup attributes marked as dirty, together with those depending on them
+        """
+        self.__needs_full_evaluation = False
+        self.__used_calculation_settings = (settings.uses_monte_carlo(), Sampler.from_settings(settings).get_configuration())
+        
+    def evaluate_scenarios(self, override_values_per_scenario, setup_attributes):
+        """
+        Calculates the values of setup attributes in several scenarios without changing the values of the setup attributes, where each scenario overrides the values of some setup attributes
+        The scenarios are calculated together in one pass, where every value has the scenario as its leading dimension
+        
+        When sampling is enabled in the settings, each scenario is instead calculated by a separate evaluation, since samples are not kept between evaluations
+        
+        override_values_per_scenario: List of scenarios, each a dictionary (Key: Setup attribute, Value: Override value as a tuple)
+        setup_attributes: List of setup attributes whose values should be returned
+        
+        Returns a list of ScenarioValues, one for each of the specified setup attributes
+        """
+        self.evaluate()
+        
+        if not settings.uses_monte_carlo():
+            return evaluate_scenarios(self, override_values_per_scenario, setup_attributes, Sampler.from_settings(settings))
+            
+        num_scenarios = len(override_values_per_scenario)
+        value_per_scenario_per_attribute = [{} for _ in setup_attributes]
+        
+        # The values from before the scenarios are restored from a snapshot, rather than calculated again
+        snapshot = attribute_value_store.take_snapshot(self.get_attribute_ids())
+        
+        for i, override_values in enumerate(override_values_per_scenario):
+            for setup_attribute, override_value in override_values.items():
+                setup_attribute.set_override_value(override_value)
+                
+            self.evaluate()
+            
+            for setup_attribute, value_per_scenario in zip(setup_attributes, value_per_scenario_per_attribute):
+                value_per_scenario[i] = setup_attribute.get_current_value()
+                
+            attribute_value_store.restore_snapshot(snapshot)
+            
+        scenario_values_per_attribute = []
+        
+        for setup_attribute, value_per_scenario in zip(setup_attributes, value_per_scenario_per_attribute):
+            scenario_values = ScenarioValues(setup_attribute.get_value_type(), setup_attribute.get_current_value(), num_scenarios)
+            scenario_values.set_values(value_per_scenario)
+            scenario_values_per_attribute.append(scenario_values)
+            
+        return scenario_values_per_attribute
+        
+    def evaluate_levels(self, sampler, uses_batch_calculations, uses_monte_carlo):
+        """
+        Calculates the setup attributes in the program's own process, level by level
+        
+        Returns a list of all setup attributes that were considered
+        """
+        updated_setup_attributes = []
+        affected_setup_attributes = set() # Setup attributes that take input from a setup attribute whose value changed
+        samples_per_setup_attribute = {} # Key: Setup attribute, Value: NumPy array of samples, kept until all setup attributes taking it as input have been calculated
+        num_remaining_dependents = {setup_attribute: len(dependent_setup_attributes) for setup_attribute, dependent_setup_attributes in self.__dependent_setup_attributes.items()}
+        
+        for level, attribute_ids in zip(self.__levels, self.get_attribute_ids_per_level()):
+            setup_attributes_to_update = []
+            setup_attributes_to_calculate = []
+            
+            for setup_attribute, is_dirty in zip(level, attribute_value_store.get_dirty(attribute_ids).tolist()):
+                if self.__needs_full_evaluation or is_dirty or setup_attribute in affected_setup_attributes:
+                    setup_attributes_to_update.append((setup_attribute, is_dirty, setup_attribute.get_current_attribute_value()))
+                    
+                    # Manually entered values are kept, unless there is no value at all
+                    if setup_attribute.get_attribute_value() is None or not setup_attribute.takes_manual_input():
+                        setup_attributes_to_calculate.append(setup_attribute)
+                        
+            if uses_monte_carlo:
+                setup_attributes_to_calculate = set(setup_attributes_to_calculate)
+                
+                for setup_attribute, _, _ in setup_attributes_to_update:
+                    self.calculate_samples(setup_attribute, setup_attribute in setup_attributes_to_calculate, samples_per_setup_attribute, num_remaining_dependents, sampler)
+                    
+            elif uses_batch_calculations:
+                self.calculate_values_in_batches(setup_attributes_to_calculate, sampler)
+            else:
+                for setup_attribute in setup_attributes_to_calculate:
+                    self.calculate_value(setup_attribute, sampler)
+                    
+            # Setup attributes that were not updated were not dirty either
+            attribute_value_store.set_dirty(attribute_ids, False)
+            
+            for setup_attribute, is_dirty, previous_value in setup_attributes_to_update:
+                updated_setup_attributes.append(setup_attribute)
+                
+                # Only propagate further if the value seen by other setup attributes might have changed
+                if self.__needs_full_evaluation or is_dirty or setup_attribute.get_current_attribute_value() != previous_value:
+                    affected_setup_attributes.update(self.get_dependents(setup_attribute))
+                    
+        return updated_setup_attributes
+        
+    def evaluate_components_in_parallel(self, sampler, uses_monte_carlo, num_processes):
+        """
+        Calculates the components containing any setup attribute whose value is missing or might have changed, where the components are distributed over a pool of processes
+        All setup attributes of such a component are calculated, which gives the same values as only calculating those affected since the samplers always draw the same samples for the same setup attribute
+        
+        Returns a list of all setup attributes that were considered, or None if the components should be calculated in the program's own process instead
+        """
+        components = [component for component in self.get_components() if self.__needs_full_evaluation or any(setup_attribute.is_dirty() for setup_attribute in component)]
+        
+        # Not worth sending to other processes
+        if len(components) < 2:
+            return None
+            
+        component_attributes_per_component = []
+        
+        for component in components:
+            index_per_setup_attribute = {setup_attribute: i for i, setup_attribute in enumerate(component)}
+            component_attributes = []
+            
+            for setup_attribute in component:
+                input_setup_attributes = self.__inputs_per_setup_attribute[setup_attribute]
+                is_calculated = setup_attribute.get_attribute_value() is None or not setup_attribute.takes_manual_input()
+                
+                component_attributes.append(ComponentAttribute(setup_attribute, \
+                                                               [index_per_setup_attribute[input_setup_attribute] for input_setup_attribute in input_setup_attributes], \
+                                                               [setup_attribute.get_setup_input_scalars(input_setup_attribute) for input_setup_attribute in input_setup_attributes], \
+                                                               is_calculated, \
+                                                               sampler.for_setup_attribute(setup_attribute)))
+                                                               
+            component_attributes_per_component.append(component_attributes)
+            
+        # Several chunks per process, so that processes finishing early can take over remaining chunks
+        chunks = split_into_chunks(components, 4 * num_processes)
+        
+        try:
+            results_and_counts_per_chunk = list(get_process_pool(num_processes).map(evaluate_components, \
+                                                                         [[component_attributes_per_component[i] for i in chunk] for chunk in chunks], \
+                                                                         [uses_monte_carlo] * len(chunks)))
+        except (BrokenProcessPool, OSError) as e:
+            # Not caused by any specific setup attribute
+            previous_context = diagnostics.set_context(None)
+            diagnostics.add(PARALLEL_CALCULATION_FAILED, f"Warning: Could not calculate in parallel, calculating in a single process instead: {e}")
+            diagnostics.set_context(previous_context)
+            
+            shut_down_process_pool()
+            return None
+            
+        updated_setup_attributes = []
+        
+        for chunk, (results_per_component, diagnostics_counts) in zip(chunks, results_and_counts_per_chunk):
+            diagnostics.merge(diagnostics_counts)
+            
+            for i, results in zip(chunk, results_per_component):
+                for setup_attribute, component_attribute, (value, sampling_error) in zip(components[i], component_attributes_per_component[i], results):
+                    if component_attribute.is_calculated():
+                        setup_attribute.set_calculated_value(value, sampling_error)
+                        
+                    setup_attribute.clear_dirty()
+                    updated_setup_attributes.append(setup_attribute)
+                    
+        return updated_setup_attributes
+        
+    def calculate_value(self, setup_attribute, sampler):
+        """
+        Calculates the value of a single setup attribute whose input setup attributes already have been calculated
+        """
+        input_setup_attributes = self.__inputs_per_setup_attribute[setup_attribute]
+        setup_input_scalars_per_attribute = [setup_attribute.get_setup_input_scalars(input_setup_attribute) for input_setup_attribute in input_setup_attributes]
+        
+        setup_attribute.calculate_value_from_inputs(input_setup_attributes, setup_input_scalars_per_attribute, sampler.for_setup_attribute(setup_attribute))
+        
+    def calculate_samples(self, setup_attribute, is_calculated, samples_per_setup_attribute, num_remaining_dependents, sampler):
+        """
+        Calculates the value of a single setup attribute where triangle distributions are represented by samples, and then releases the samples of input setup attributes that no other setup attribute needs
+        
+        is_calculated: Whether the value should be calculated from the input setup attributes, otherwise samples are drawn from the manually entered value
+        samples_per_setup_attribute: Dictionary with the samples of already calculated setup attributes, where the samples of this setup attribute are added
+        num_remaining_dependents: Dictionary with the number of setup attributes taking each setup attribute as input that have not yet been calculated
+        """
+        diagnostics.set_context(setup_attribute)
+        
+        input_setup_attributes = self.__inputs_per_setup_attribute[setup_attribute]
+        sampler = sampler.for_setup_attribute(setup_attribute)
+        samples = None
+        
+        if is_calculated:
+            samples = setup_attribute.calculate_value_from_samples(input_setup_attributes, \
+                                                                   [samples_per_setup_attribute.get(input_setup_attribute) for input_setup_attribute in input_setup_attributes], \
+                                                                   [setup_attribute.get_setup_input_scalars(input_setup_attribute) for input_setup_attribute in input_setup_attributes], \
+                                                                   sampler)
+                                                                   
+        # Triangle distributions that were not calculated from samples, such as manually entered, overridden and default values, are sampled directly
+        if setup_attribute.get_value_type() == ValueTypeTriangleDistribution and (samples is None or setup_attribute.has_override_value()):
+            samples = sample_triangle_distribution(setup_attribute.get_current_attribute_value(), sampler)
+            
+        if samples is not None and num_remaining_dependents.get(setup_attribute, 0) > 0:
+            samples_per_setup_attribute[setup_attribute] = samples
+            
+        for input_setup_attribute in input_setup_attributes:
+            num_remaining_dependents[input_setup_attribute] -= 1
+            
+            if num_remaining_dependents[input_setup_attribute] == 0:
+                samples_per_setup_attribute.pop(input_setup_attribute, None)
+                
+    def calculate_values_in_batches(self, setup_attributes, sampler):
+        """
+        Calculates the values of setup attributes from the same level, where those sharing value type and calculation type are calculated together as one NumPy operation when the calculation type supports it
+        """
+        batches = {} # Key: Tuple (value type, calculation type), Value: List of setup attributes
+        
+        for setup_attribute in setup_attributes:
+            configuration_attribute = setup_attribute.get_configuration_attribute()
+            value_type = configuration_attribute.get_value_type()
+            calculation_type = configuration_attribute.get_calculation_type()
+            
+            if calculation_type == None or not calculation_type.supports_batches():
+                self.calculate_value(setup_attribute, sampler)
+                
+            elif configuration_attribute.is_correctly_connected():
+                batches.setdefault((value_type, calculation_type), []).append(setup_attribute)
+                
+            else:
+                setup_attribute.set_calculated_value(CONFIGURATION_ERROR_VALUE)
+                
+        for (value_type, calculation_type), batch_setup_attributes in batches.items():
+            input_setup_attributes_per_attribute = []
+            setup_input_scalars_per_attribute_per_attribute = []
+            
+            for setup_attribute in batch_setup_attributes:
+                input_setup_attributes = self.__inputs_per_setup_attribute[setup_attribute]
+                
+                input_setup_attributes_per_attribute.append(input_setup_attributes)
+                setup_input_scalars_per_attribute_per_attribute.append([setup_attribute.get_setup_input_scalars(input_setup_attribute) for input_setup_attribute in input_setup_attributes])
+                
+            calculated_values = combine_values_batch(value_type, \
+                                                     calculation_type, \
+                                                     input_setup_attributes_per_attribute, \
+                                                     setup_input_scalars_per_attribute_per_attribute, \
+                                                     batch_setup_attributes)
+                                                     
+            for setup_attribute, calculated_value in zip(batch_setup_attributes, calculated_values):
+                setup_attribute.set_calculated_value(calculated_value)
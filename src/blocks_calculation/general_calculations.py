@@ -1,11 +1,164 @@
 import os
 import numpy as np
 from helper_functions_general import convert_value_to_string, convert_string_to_value
+from sampler import calculate_standard_error, calculate_triangle_inverse_cdf
+from attribute_value import AttributeValue, ValueStatus, CONFIGURATION_ERROR_VALUE, MISSING_VALUE, SETUP_ERROR_VALUE
+from calculation_type_registry import calculation_type_registry
+from diagnostics import diagnostics, INVALID_INPUT_SCALARS, INVALID_INPUT_VALUE, INVALID_TRIANGLE_DISTRIBUTION, UNSUPPORTED_CALCULATION_TYPE, UNSUPPORTED_INPUT_VALUE_TYPE, WRONG_NUMBER_OF_INPUTS
 from config import *
 
-def combine_values(value_type, calculation_type, input_setup_attributes, setup_input_scalars_per_attribute, configuration_attribute, num_samples):
+MONTE_CARLO_PERCENTILES = (5, 50, 95) # Percentiles of the samples shown as (a, b, c) for triangle distributions when sampling
+
+class CalculationKernel:
+    """
+    Calculation of the values of a configuration attribute, specialized once for its value type, calculation type, input scalar and input offset and shared by all of its setup versions
+    Everything that does not depend on the input values is decided when the kernel is created, so that calculating a setup attribute only gathers its input values and applies the operations that are needed
+    """
+    def __init__(self, value_type, calculation_type, is_correctly_connected, input_scalar, input_offset):
+        self.__value_type = value_type
+        self.__calculation_type = calculation_type
+        self.__is_correctly_connected = is_correctly_connected
+        self.__input_scalar = input_scalar
+        self.__input_offset = input_offset
+        self.__number_of_inputs = None if calculation_type == None else calculation_type.number_of_inputs()
+        self.__calculate_output_value = None if calculation_type == None else calculation_type.calculate_output_value
+        self.__is_scaled = input_scalar != 1 or input_offset != 0
+        self.__adjust_to_range = None # Only set if the value type has a range, as the default leaves values unchanged
+        
+        if value_type.adjust_to_range is not ValueType.adjust_to_range:
+            self.__adjust_to_range = value_type.adjust_to_range
+            
+    def calculate(self, input_setup_attributes, setup_input_scalars_per_attribute, sampler):
+        """
+        Returns an AttributeValue of the calculated value by combining the value of all input setup attributes according to the calculation type
+        """
+        if not self.__is_correctly_connected:
+            return CONFIGURATION_ERROR_VALUE
+            
+        # Missing connected setup attributes for the given calculation type to be correctly calculated
+        if self.__number_of_inputs != None and len(input_setup_attributes) != self.__number_of_inputs:
+            return MISSING_VALUE
+            
+        input_values = []
+        
+        for input_setup_attribute, setup_input_scalars in zip(input_setup_attributes, setup_input_scalars_per_attribute):
+            input_value = get_input_elements(input_setup_attribute)
+            
+            # If an input value could not previously be calculated or extracted, this value cannot be calculated either
+            if isinstance(input_value, AttributeValue):
+                return input_value
+                
+            # Apply input scalars
+            if setup_input_scalars != None:
+                input_value = apply_setup_input_scalars(input_value.copy(), np.array(setup_input_scalars), input_setup_attribute.get_value_type().allowed_number_of_scalars())
+                
+            input_values.append(input_value)
+            
+        if len(input_values) == 0:
+            return AttributeValue(self.__value_type.default_value())
+            
+        calculated_value = self.__calculate_output_value(input_values, sampler)
+        
+        if self.__is_scaled:
+            calculated_value = calculated_value * self.__input_scalar + self.__input_offset
+            
+        if self.__adjust_to_range != None:
+            # Copied since the range is adjusted in place and the calculated value might share memory with an input value
+            if not self.__is_scaled:
+                calculated_value = np.array(calculated_value, dtype=np.float64)
+                
+            calculated_value = self.__adjust_to_range(calculated_value)
+            
+        return AttributeValue(calculated_value)
+        
+    def __reduce__(self):
+        # Recreated through the constructor, as the bound functions refer to the value type and calculation type
+        return CalculationKernel, (self.__value_type, self.__calculation_type, self.__is_correctly_connected, self.__input_scalar, self.__input_offset)
+        
+def get_input_elements(input_setup_attribute):
+    """
+    Returns the read-only NumPy array of the current value of an input setup attribute, or the AttributeValue to use as the calculated value if the input value cannot be used
+    """
+    input_value = input_setup_attribute.get_current_attribute_value()
+    status = input_value.get_status()
+    
+    # If an input value could not previously be calculated, this value cannot be calculated either
+    if status in (ValueStatus.MISSING, ValueStatus.SETUP_ERROR):
+        return input_value
+        
+    elements = input_value.get_elements() if status == ValueStatus.NUMBERS else input_value.to_tuple()
+    
+    # Could not extract input value
+    if not input_setup_attribute.get_value_type().is_correct_input_value(elements) or status != ValueStatus.NUMBERS:
+        return SETUP_ERROR_VALUE
+        
+    return elements
+    
+def combine_values_batch(value_type, calculation_type, input_setup_attributes_per_attribute, setup_input_scalars_per_attribute_per_attribute, setup_attributes):
+    """
+    Returns a list of AttributeValues with the calculated values of several setup attributes sharing value type and calculation type, where the values are calculated together as one NumPy operation
+    Gives the same values as the calculation kernel of each setup attribute, and requires that the calculation type supports batches
+    """
+    configuration_attributes = [setup_attribute.get_configuration_attribute() for setup_attribute in setup_attributes]
+    calculated_values = [None] * len(setup_attributes)
+    input_values_per_attribute = [] # List of input values of each setup attribute to calculate
+    calculated_indices = [] # Index of each setup attribute to calculate
+    
+    for i, (input_setup_attributes, setup_input_scalars_per_attribute) in enumerate(zip(input_setup_attributes_per_attribute, setup_input_scalars_per_attribute_per_attribute)):
+        input_values = []
+        diagnostics.set_context(setup_attributes[i])
+        
+        for input_setup_attribute, setup_input_scalars in zip(input_setup_attributes, setup_input_scalars_per_attribute):
+            input_value = get_input_elements(input_setup_attribute)
+            
+            # If an input value could not previously be calculated or extracted, this value cannot be calculated either
+            if isinstance(input_value, AttributeValue):
+                calculated_values[i] = input_value
+                break
+                
+            # Apply input scalars
+            if setup_input_scalars != None:
+                input_value = apply_setup_input_scalars(input_value.copy(), np.array(setup_input_scalars), input_setup_attribute.get_value_type().allowed_number_of_scalars())
+                
+            input_values.append(input_value)
+            
+        if calculated_values[i] is not None:
+            continue
+            
+        if len(input_values) == 0:
+            calculated_values[i] = AttributeValue(value_type.default_value())
+            continue
+            
+        input_values_per_attribute.append(input_values)
+        calculated_indices.append(i)
+        
+    if len(calculated_indices) > 0:
+        input_counts = np.array([len(input_values) for input_values in input_values_per_attribute])
+        input_scalars = np.array([configuration_attributes[i].get_input_scalar() for i in calculated_indices])
+        input_offsets = np.array([configuration_attributes[i].get_input_offset() for i in calculated_indices])
+        
+        # Attributes with fewer inputs than others are padded with zeros
+        padded_input_values = np.zeros((len(calculated_indices), np.max(input_counts), len(input_values_per_attribute[0][0])))
+        
+        for j, input_values in enumerate(input_values_per_attribute):
+            padded_input_values[j, :len(input_values)] = input_values
+            
+        output_rows = calculation_type.calculate_output_values_batch(padded_input_values, input_counts)
+        output_rows = output_rows * input_scalars[:, None] + input_offsets[:, None]
+        output_rows = value_type.adjust_rows_to_range(output_rows)
+        
+        for i, output_row in zip(calculated_indices, output_rows):
+            calculated_values[i] = AttributeValue(output_row)
+            
+    return calculated_values
+    
+def combine_values_monte_carlo(value_type, calculation_type, input_setup_attributes, samples_per_input_attribute, setup_input_scalars_per_attribute, configuration_attribute, sampler):
     """
-    Returns a string of the calculated value by combining the value of all input setup attributes according to the calculation type
+    Same as CalculationKernel.calculate, but where triangle distributions are represented by samples so that the calculation types operate on the samples rather than on (a, b, c)
+    
+    samples_per_input_attribute: List of NumPy arrays with the samples of each input setup attribute, None for input setup attributes that are not triangle distributions
+    
+    Returns a tuple (value, samples), where value is the AttributeValue to display and samples is a NumPy array of samples if the value is a triangle distribution, otherwise None
     """
     calculated_value = value_type.default_value()
     input_values = []
@@ -14,34 +167,167 @@ def combine_values(value_type, calculation_type, input_setup_attributes, setup_i
     
     # Missing connected setup attributes for the given calculation type to be correctly calculated
     if number_of_inputs != None and len(input_setup_attributes) != number_of_inputs:
-        return ("-",)
+        return MISSING_VALUE, None
         
     for i, input_setup_attribute in enumerate(input_setup_attributes):
         input_value_type = input_setup_attribute.get_value_type()
-        input_value = input_setup_attribute.get_current_value()
+        input_value = get_input_elements(input_setup_attribute)
         
-        # If an input value could not previously be calculated, this value cannot be calculated either
-        if input_value in (("-",), ("SETUP ERROR",)):
-            return input_value
+        # If an input value could not previously be calculated or extracted, this value cannot be calculated either
+        if isinstance(input_value, AttributeValue):
+            return input_value, None
             
-        # Could not extract input value
-        if not input_value_type.is_correct_input_value(input_value):
-            return ("SETUP ERROR",)
-            
-        input_value = np.array(input_value)
+        input_samples = samples_per_input_attribute[i]
         setup_input_scalars = setup_input_scalars_per_attribute[i]
         
+        if input_value_type == ValueTypeTriangleDistribution:
+            # The triangle distribution could not be sampled
+            if input_samples is None:
+                return SETUP_ERROR_VALUE, None
+                
+            # Separate scalars for a, b and c change the shape of the triangle distribution, so the scaled triangle distribution is sampled instead of scaling each sample
+            if setup_input_scalars != None and len(setup_input_scalars) == 3 and len(set(setup_input_scalars)) > 1:
+                input_samples = sample_scaled_triangle_distribution(input_value * np.array(setup_input_scalars), input_samples)
+                setup_input_scalars = None
+                
+                if input_samples is None:
+                    return SETUP_ERROR_VALUE, None
+                    
+            elif setup_input_scalars != None and len(setup_input_scalars) == 3:
+                setup_input_scalars = setup_input_scalars[:1]
+                
+            input_value = input_samples
+            
         # Apply input scalars
         if setup_input_scalars != None:
-            input_value = apply_setup_input_scalars(input_value, np.array(setup_input_scalars), input_value_type.allowed_number_of_scalars())
+            input_value = apply_setup_input_scalars(input_value.copy(), np.array(setup_input_scalars), input_value_type.allowed_number_of_scalars())
             
         input_values.append(input_value)
         
     if len(input_values) > 0:
-        calculated_value = calculation_type.calculate_output_value(input_values, num_samples) * configuration_attribute.get_input_scalar() + configuration_attribute.get_input_offset()
+        calculated_value = calculation_type.calculate_output_value_from_samples(input_values, sampler) * configuration_attribute.get_input_scalar() + configuration_attribute.get_input_offset()
         calculated_value = value_type.adjust_to_range(calculated_value)
         
-    return tuple(calculated_value)
+    if value_type == ValueTypeTriangleDistribution and len(input_values) > 0:
+        return AttributeValue(np.percentile(calculated_value, MONTE_CARLO_PERCENTILES)), calculated_value
+        
+    return AttributeValue(calculated_value), None
+    
+def sample_triangle_distribution(value, sampler):
+    """
+    Returns a NumPy array of samples from the triangle distribution (a, b, c), or None if the value is not a valid triangle distribution
+    
+    value: AttributeValue
+    """
+    if not value.is_numbers() or len(value.get_elements()) != 3:
+        return None
+        
+    a, b, c = value.get_elements().tolist()
+    
+    if not a <= b <= c:
+        diagnostics.add(INVALID_TRIANGLE_DISTRIBUTION, f"Warning: Could not sample the triangle distribution {value.to_tuple()}, expected a <= b <= c")
+        return None
+        
+    # All values are equal, so every sample is the same
+    if a == c:
+        return np.full(sampler.get_num_samples(), b)
+        
+    return sampler.sample_triangle(a, b, c)
+    
+def sample_scaled_triangle_distribution(value, samples):
+    """
+    Returns a NumPy array of samples from the triangle distribution (a, b, c), or None if the value is not a valid triangle distribution
+    The samples are drawn at the same quantiles as the specified samples of the unscaled triangle distribution, so that they follow other setup attributes in the same way
+    
+    value: NumPy array (a, b, c) of the input triangle distribution with setup input scalars applied to each of a, b and c
+    samples: NumPy array of samples of the input triangle distribution before scaling
+    """
+    a, b, c = value.tolist()
+    
+    if not a <= b <= c:
+        diagnostics.add(INVALID_TRIANGLE_DISTRIBUTION, f"Warning: Could not sample the scaled triangle distribution {tuple(value.tolist())}, expected a <= b <= c")
+        return None
+        
+    # All values are equal, so every sample is the same
+    if a == c:
+        return np.full(len(samples), b)
+        
+    quantiles = (np.argsort(np.argsort(samples, kind="stable")) + 0.5) / len(samples)
+    
+    return calculate_triangle_inverse_cdf(quantiles, a, b, c)
+    
+def is_valid_triangle_distribution(value):
+    """
+    Returns whether the value (a, b, c) is a triangle distribution where a <= b <= c
+    """
+    a, b, c = value
+    return a <= b <= c
+    
+def calculate_triangle_pdf(x, triangle_distribution):
+    """
+    Returns the probability density of the triangle distribution (a, b, c) at each point in the NumPy array x, where a < c
+    """
+    a, b, c = triangle_distribution
+    pdf = np.zeros(len(x))
+    
+    is_left = (x > a) & (x < b)
+    is_right = (x >= b) & (x < c)
+    
+    pdf[is_left] = 2 * (x[is_left] - a) / ((c - a) * (b - a))
+    pdf[is_right] = 2 * (c - x[is_right]) / ((c - a) * (c - b))
+    
+    return pdf
+    
+def calculate_triangle_cdf(x, triangle_distribution):
+    """
+    Returns the cumulative probability of the triangle distribution (a, b, c) at each point in the NumPy array x, where a < c
+    """
+    a, b, c = triangle_distribution
+    cdf = np.zeros(len(x))
+    
+    is_left = (x > a) & (x <= b)
+    is_right = (x > b) & (x < c)
+    
+    cdf[is_left] = (x[is_left] - a)**2 / ((c - a) * (b - a))
+    cdf[is_right] = 1 - (c - x[is_right])**2 / ((c - a) * (c - b))
+    cdf[x >= c] = 1
+    
+    return cdf
+    
+def calculate_probability_first_greater(first_triangle_distribution, second_triangle_distribution):
+    """
+    Returns the exact probability P(X > Y) where X and Y follow the specified triangle distributions (a, b, c)
+    P(X > Y) is the integral of the density of X times the cumulative probability of Y, which between the parameters of the two distributions is a polynomial of at most degree three
+    Each such piece is therefore integrated exactly by Gauss-Legendre quadrature with two points
+    """
+    first_a, first_b, first_c = first_triangle_distribution
+    second_a, second_b, second_c = second_triangle_distribution
+    
+    # A distribution where all values are equal is a single point
+    if first_a == first_c:
+        if second_a == second_c:
+            return float(first_a > second_a)
+            
+        return calculate_triangle_cdf(np.array([first_a]), second_triangle_distribution)[0]
+        
+    if second_a == second_c:
+        return 1 - calculate_triangle_cdf(np.array([second_a]), first_triangle_distribution)[0]
+        
+    # Pieces between consecutive parameters where X has a density
+    breakpoints = np.unique(np.clip(np.array(first_triangle_distribution + second_triangle_distribution, dtype=float), first_a, first_c))
+    starts = breakpoints[:-1]
+    ends = breakpoints[1:]
+    
+    half_widths = (ends - starts) / 2
+    midpoints = (ends + starts) / 2
+    gauss_offset = 1 / np.sqrt(3)
+    
+    probability = 0
+    
+    for x in (midpoints - half_widths * gauss_offset, midpoints + half_widths * gauss_offset):
+        probability += np.sum(half_widths * calculate_triangle_pdf(x, first_triangle_distribution) * calculate_triangle_cdf(x, second_triangle_distribution))
+        
+    return min(max(probability, 0), 1)
     
 def get_attribute_value_types(configuration_attributes):
     """
@@ -61,7 +347,7 @@ def apply_setup_input_scalars(values, input_scalars, allowed_scalar_values):
     if len(input_scalars) in allowed_scalar_values:
         values *= input_scalars
     else:
-        print(f"Warning: Could not apply input setup scalars {input_scalars} to {values}, expected a number of values equal to a value in {allowed_scalar_values}")
+        diagnostics.add(INVALID_INPUT_SCALARS, f"Warning: Could not apply input setup scalars {input_scalars} to {values}, expected a number of values equal to a value in {allowed_scalar_values}")
         
     return values
     
@@ -73,15 +359,26 @@ class ValueType:
     def symbol():
         return None
         
-    @staticmethod
-    def correctly_connected(calculation_type, input_configuration_attributes):
+    @classmethod
+    def correctly_connected(cls, calculation_type, input_configuration_attributes):
         """
         Checks if the configuration is correct considering a specific calculation type and its input configuration attributes
+        Which value types a calculation type supports, both as its own value type and as inputs, is declared by the calculation type
         """
         number_of_inputs = calculation_type.number_of_inputs()
         
         if number_of_inputs != None and len(input_configuration_attributes) != number_of_inputs:
-            print(f"Warning: Calculation type {CalculationTypeDivision.symbol()} require exactly {number_of_inputs} input attributes in the configuration")
+            diagnostics.add(WRONG_NUMBER_OF_INPUTS, f"Warning: Calculation type {calculation_type.symbol()} require exactly {number_of_inputs} input attributes in the configuration")
+            return False
+            
+        elif cls not in calculation_type.supported_value_types():
+            diagnostics.add(UNSUPPORTED_CALCULATION_TYPE, f"Warning: Attribute value type {cls.symbol()} does not support calculation type {calculation_type.symbol()}")
+            return False
+            
+        message = calculation_type.check_input_value_types(cls, get_attribute_value_types(input_configuration_attributes))
+        
+        if message != None:
+            diagnostics.add(UNSUPPORTED_INPUT_VALUE_TYPE, message)
             return False
             
         return True
@@ -100,6 +397,13 @@ class ValueType:
         """
         return value
         
+    @staticmethod
+    def adjust_rows_to_range(values):
+        """
+        Adjusts each row of the specified 2D NumPy array to fit within the allowed range of the value type
+        """
+        return values
+        
 class ValueTypeString(ValueType):
     @staticmethod
     def explaination():
@@ -114,7 +418,7 @@ class ValueTypeString(ValueType):
         if calculation_type in (None, CalculationTypeQualitative):
             return True
             
-        print(f"Warning: Attribute value type \"Simple text\" does not support calculation type {calculation_type.symbol()}")
+        diagnostics.add(UNSUPPORTED_CALCULATION_TYPE, f"Warning: Attribute value type \"Simple text\" does not support calculation type {calculation_type.symbol()}")
         return False
         
 class ValueTypeNumber(ValueType):
@@ -138,37 +442,14 @@ class ValueTypeNumber(ValueType):
     def allowed_number_of_scalars():
         return (1,)
         
-    @staticmethod
-    def correctly_connected(calculation_type, input_configuration_attributes):
-        if not ValueType.correctly_connected(calculation_type, input_configuration_attributes):
-            return False
-            
-        elif calculation_type == CalculationTypeQualitative:
-            return True
-            
-        elif calculation_type in (CalculationTypeMean, CalculationTypeAND, CalculationTypeOR, CalculationTypeMultiplication, CalculationTypeDivision):
-            for input_value_type in get_attribute_value_types(input_configuration_attributes):
-                if input_value_type not in (ValueTypeNumber, ValueTypeProbability):
-                    print(f"Warning: Attribute value type {ValueTypeNumber.symbol()} does not support {input_value_type.symbol()} as input for the calculation type {calculation_type.symbol()}")
-                    return False
-                    
-            return True
-            
-        elif calculation_type == CalculationTypeSampleTriangle:
-            print(f"Warning: Attribute value type {ValueTypeNumber.symbol()} does not support calculation type {calculation_type.symbol()}")
-            return False
-            
-        print(f"Error: Could not match calculation type {calculation_type} in value type {ValueTypeNumber.symbol()}")
-        return True
-        
     @staticmethod
     def is_correct_input_value(input_value):
         if len(input_value) != 1:
-            print(f"Warning: The input {input_value} did not contain exactly one value for the attribute value type {ValueTypeNumber.symbol()}")
+            diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The input {input_value} did not contain exactly one value for the attribute value type {ValueTypeNumber.symbol()}")
             return False
             
         elif not isinstance(input_value[0], float):
-            print(f"Warning: The input {input_value[0]} could not be converted to a float for the attribute value type {ValueTypeNumber.symbol()}")
+            diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The input {input_value[0]} could not be converted to a float for the attribute value type {ValueTypeNumber.symbol()}")
             return False
             
         return True
@@ -194,38 +475,18 @@ class ValueTypeProbability(ValueType):
     def allowed_number_of_scalars():
         return (1,)
         
-    @staticmethod
-    def correctly_connected(calculation_type, input_configuration_attributes):
-        if not ValueType.correctly_connected(calculation_type, input_configuration_attributes):
-            return False
-            
-        elif calculation_type == CalculationTypeQualitative:
-            return True
-            
-        elif calculation_type in (CalculationTypeMean, CalculationTypeAND, CalculationTypeOR, CalculationTypeMultiplication, CalculationTypeDivision, CalculationTypeSampleTriangle):
-            for input_value_type in get_attribute_value_types(input_configuration_attributes):
-                if (calculation_type != CalculationTypeSampleTriangle and input_value_type not in (ValueTypeNumber, ValueTypeProbability)) or \
-                   (calculation_type == CalculationTypeSampleTriangle and input_value_type != ValueTypeTriangleDistribution):
-                    print(f"Warning: Attribute value type {ValueTypeProbability.symbol()} does not support {input_value_type.symbol()} as input for the calculation type {calculation_type.symbol()}")
-                    return False
-                    
-            return True
-            
-        print(f"Error: Could not match calculation type {calculation_type} in value type {ValueTypeProbability.symbol()}")
-        return True
-        
     @staticmethod
     def is_correct_input_value(input_value):
         if len(input_value) != 1:
-            print(f"Warning: The input {input_value} did not contain exactly one value for the attribute value type {ValueTypeProbability.symbol()}")
+            diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The input {input_value} did not contain exactly one value for the attribute value type {ValueTypeProbability.symbol()}")
             return False
             
         elif not isinstance(input_value[0], float):
-            print(f"Warning: The input {input_value[0]} could not be converted to a float for the attribute value type {ValueTypeProbability.symbol()}")
+            diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The input {input_value[0]} could not be converted to a float for the attribute value type {ValueTypeProbability.symbol()}")
             return False
             
         elif input_value[0] < 0 or input_value[0] > 1:
-            print(f"Warning: The input {input_value[0]} at the attribute value type {ValueTypeProbability.symbol()} is not in [0, 1]")
+            diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The input {input_value[0]} at the attribute value type {ValueTypeProbability.symbol()} is not in [0, 1]")
             return False
             
         return True
@@ -240,6 +501,11 @@ class ValueTypeProbability(ValueType):
             
         return value
         
+    @staticmethod
+    def adjust_rows_to_range(values):
+        values[:, 0] = np.clip(values[:, 0], 0, 1)
+        return values
+        
 class ValueTypeTriangleDistribution(ValueType):
     @staticmethod
     def symbol():
@@ -261,59 +527,15 @@ class ValueTypeTriangleDistribution(ValueType):
     def allowed_number_of_scalars():
         return (1, 3)
         
-    @staticmethod
-    def correctly_connected(calculation_type, input_configuration_attributes):
-        if not ValueType.correctly_connected(calculation_type, input_configuration_attributes):
-            return False
-            
-        elif calculation_type == CalculationTypeQualitative:
-            return True
-            
-        elif calculation_type in (CalculationTypeMean, CalculationTypeAND, CalculationTypeOR):
-            for input_value_type in get_attribute_value_types(input_configuration_attributes):
-                if input_value_type != ValueTypeTriangleDistribution:
-                    print(f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} does not support {input_value_type.symbol()} as input for the calculation type {calculation_type.symbol()}")
-                    return False
-                    
-            return True
-            
-        elif calculation_type == CalculationTypeMultiplication:
-            for input_value_type in get_attribute_value_types(input_configuration_attributes):
-                if input_value_type == ValueTypeTriangleDistribution:
-                    return True
-                    
-            print(f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} with the calculation type {calculation_type.symbol()} requires at least one input to be of type {ValueTypeTriangleDistribution.symbol()}")
-            return False
-            
-        elif calculation_type == CalculationTypeDivision:
-            first_value_type, second_value_type = get_attribute_value_types(input_configuration_attributes)
-            
-            if first_value_type != ValueTypeTriangleDistribution:
-                print(f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} with the calculation type {calculation_type.symbol()} does not support value type {first_value_type.symbol()} as its first input")
-                return False
-                
-            elif second_value_type not in (ValueTypeNumber, ValueTypeProbability, ValueTypeTriangleDistribution):
-                print(f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} with the calculation type {calculation_type.symbol()} does not support value type {first_value_type.symbol()} as its second input")
-                return False
-                
-            return True
-                    
-        elif calculation_type == CalculationTypeSampleTriangle:
-            print(f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} does not support calculation type {calculation_type.symbol()}")
-            return False
-            
-        print(f"Error: Could not match calculation type {calculation_type} in value type {ValueTypeTriangleDistribution.symbol()}")
-        return True
-        
     @staticmethod
     def is_correct_input_value(input_value):
         if len(input_value) != 3:
-            print(f"Warning: The input {input_value} did not contain exactly three values for the attribute value type {ValueTypeProbability.symbol()}")
+            diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The input {input_value} did not contain exactly three values for the attribute value type {ValueTypeProbability.symbol()}")
             return False
             
         for value in input_value:
             if not isinstance(value, float):
-                print(f"Warning: The value {value} in the input {input_value} could not be converted to a float for the attribute value type {ValueTypeProbability.symbol()}")
+                diagnostics.add(INVALID_INPUT_VALUE, f"Warning: The value {value} in the input {input_value} could not be converted to a float for the attribute value type {ValueTypeProbability.symbol()}")
                 return False
                 
         return True
@@ -331,15 +553,74 @@ class CalculationType:
         return None
         
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
+    def supported_value_types():
+        """
+        Returns the value types of the attributes that can be calculated with this calculation type, by default all value types made of numbers
+        """
+        return (ValueTypeNumber, ValueTypeProbability, ValueTypeTriangleDistribution)
+        
+    @staticmethod
+    def allowed_input_value_types(value_type):
+        """
+        Returns the value types allowed as inputs when calculating an attribute of the specified value type
+        By default triangle distributions are calculated from triangle distributions, and numbers and probabilities from numbers and probabilities
+        """
+        if value_type == ValueTypeTriangleDistribution:
+            return (ValueTypeTriangleDistribution,)
+            
+        return (ValueTypeNumber, ValueTypeProbability)
+        
+    @classmethod
+    def check_input_value_types(cls, value_type, input_value_types):
+        """
+        Returns None if an attribute of the specified value type can be calculated from inputs of the specified value types, otherwise a warning telling why not
+        By default each input must be of one of the allowed input value types, regardless of its position
+        """
+        allowed_input_value_types = cls.allowed_input_value_types(value_type)
+        
+        for input_value_type in input_value_types:
+            if input_value_type not in allowed_input_value_types:
+                return f"Warning: Attribute value type {value_type.symbol()} does not support {input_value_type.symbol()} as input for the calculation type {cls.symbol()}"
+                
+        return None
+        
+    @staticmethod
+    def calculate_output_value(input_values, sampler):
         """
         input_values: List of NumPy arrays representing input values from each input attribute
-        num_samples: Number of samples to perform, if applicaple to the calculation type
+        sampler: Sampler drawing the samples, if applicaple to the calculation type
         
         Returns the calculated value based on the list of input values
         """
         return None
         
+    @staticmethod
+    def supports_batches():
+        """
+        Returns whether values of several attributes can be calculated together with calculate_output_values_batch
+        """
+        return False
+        
+    @staticmethod
+    def calculate_output_values_batch(input_values, input_counts):
+        """
+        input_values: 3D NumPy array (attribute, input, value), where attributes with fewer inputs than others are padded with zeros
+        input_counts: NumPy array with the number of inputs of each attribute
+        
+        Returns a 2D NumPy array where each row is the calculated value of an attribute
+        """
+        return None
+        
+    @classmethod
+    def calculate_output_value_from_samples(cls, input_values, sampler):
+        """
+        input_values: List of NumPy arrays representing input values from each input attribute, where triangle distributions are represented by samples
+        sampler: Sampler that drew the samples
+        
+        Returns the calculated value based on the list of input values, by default calculated elementwise in the same way as calculate_output_value
+        """
+        return cls.calculate_output_value(input_values, sampler)
+        
 class CalculationTypeMean(CalculationType):
     @staticmethod
     def symbol():
@@ -350,9 +631,17 @@ class CalculationTypeMean(CalculationType):
         return "Mean"
         
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
+    def calculate_output_value(input_values, sampler):
         return np.mean(np.stack(input_values), axis=0)
         
+    @staticmethod
+    def supports_batches():
+        return True
+        
+    @staticmethod
+    def calculate_output_values_batch(input_values, input_counts):
+        return np.sum(input_values, axis=1) / input_counts[:, None]
+        
 class CalculationTypeAND(CalculationType):
     @staticmethod
     def symbol():
@@ -363,9 +652,17 @@ class CalculationTypeAND(CalculationType):
         return "AND (addition)"
         
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
+    def calculate_output_value(input_values, sampler):
         return np.sum(np.stack(input_values), axis=0)
         
+    @staticmethod
+    def supports_batches():
+        return True
+        
+    @staticmethod
+    def calculate_output_values_batch(input_values, input_counts):
+        return np.sum(input_values, axis=1)
+        
 class CalculationTypeOR(CalculationType):
     @staticmethod
     def symbol():
@@ -376,9 +673,19 @@ class CalculationTypeOR(CalculationType):
         return "OR (minimum)"
         
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
+    def calculate_output_value(input_values, sampler):
         return np.min(np.stack(input_values), axis=0)
         
+    @staticmethod
+    def supports_batches():
+        return True
+        
+    @staticmethod
+    def calculate_output_values_batch(input_values, input_counts):
+        # Ignore the zeros used as padding
+        is_input = np.arange(input_values.shape[1])[None, :, None] < input_counts[:, None, None]
+        return np.min(np.where(is_input, input_values, np.inf), axis=1)
+        
 class CalculationTypeMultiplication(CalculationType):
     @staticmethod
     def symbol():
@@ -388,8 +695,19 @@ class CalculationTypeMultiplication(CalculationType):
     def explaination():
         return "Multiplication"
         
+    @classmethod
+    def check_input_value_types(cls, value_type, input_value_types):
+        # A triangle distribution can be scaled by numbers and probabilities, as long as there is a triangle distribution to scale
+        if value_type == ValueTypeTriangleDistribution:
+            if ValueTypeTriangleDistribution not in input_value_types:
+                return f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} with the calculation type {cls.symbol()} requires at least one input to be of type {ValueTypeTriangleDistribution.symbol()}"
+                
+            return None
+            
+        return super().check_input_value_types(value_type, input_value_types)
+        
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
+    def calculate_output_value(input_values, sampler):
         output_value = np.ones(1)
         
         for input_value in input_values:
@@ -410,12 +728,28 @@ class CalculationTypeDivision(CalculationType):
     def explaination():
         return "Division between two values, (1) / (2)"
         
+    @classmethod
+    def check_input_value_types(cls, value_type, input_value_types):
+        # A triangle distribution can be divided by numbers, probabilities and other triangle distributions
+        if value_type == ValueTypeTriangleDistribution:
+            first_value_type, second_value_type = input_value_types
+            
+            if first_value_type != ValueTypeTriangleDistribution:
+                return f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} with the calculation type {cls.symbol()} does not support value type {first_value_type.symbol()} as its first input"
+                
+            elif second_value_type not in (ValueTypeNumber, ValueTypeProbability, ValueTypeTriangleDistribution):
+                return f"Warning: Attribute value type {ValueTypeTriangleDistribution.symbol()} with the calculation type {cls.symbol()} does not support value type {second_value_type.symbol()} as its second input"
+                
+            return None
+            
+        return super().check_input_value_types(value_type, input_value_types)
+        
     @staticmethod
     def number_of_inputs():
         return 2
         
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
+    def calculate_output_value(input_values, sampler):
         return input_values[0] / input_values[1]
         
 class CalculationTypeSampleTriangle(CalculationType):
@@ -427,13 +761,25 @@ class CalculationTypeSampleTriangle(CalculationType):
     def explaination():
         return "Sample two triangle distributions, ratio of (1) > (2)"
         
+    @staticmethod
+    def supported_value_types():
+        return (ValueTypeProbability,)
+        
+    @staticmethod
+    def allowed_input_value_types(value_type):
+        return (ValueTypeTriangleDistribution,)
+        
     @staticmethod
     def number_of_inputs():
         return 2
         
     @staticmethod
-    def calculate_output_value(input_values, num_samples):
-        sampled_values = []
+    def calculate_output_value(input_values, sampler):
+        # Compare the two triangle distributions analytically, unless they are not valid triangle distributions
+        if sampler.uses_exact_triangle_comparison() and all(is_valid_triangle_distribution(input_value) for input_value in input_values):
+            return np.array([calculate_probability_first_greater(tuple(input_values[0]), tuple(input_values[1]))])
+            
+        triangle_distributions = []
         
         for input_value in input_values:
             a, b, c = input_value
@@ -442,11 +788,21 @@ class CalculationTypeSampleTriangle(CalculationType):
             if a == b == c:
                 a -= 1e-10
                 
-            # Sample current triangle distribution
-            sampled_values.append(np.random.triangular(a, b, c, num_samples))
+            triangle_distributions.append((a, b, c))
             
-        # Compare samples
-        return np.array([np.array(np.sum(sampled_values[0] > sampled_values[1]) / num_samples)])
+        # Sample both triangle distributions and compare the samples, where the ratio increases with the first and decreases with the second
+        def draw_comparisons(num_samples):
+            return sampler.sample_triangle(*triangle_distributions[0], num_samples, 1) > sampler.sample_triangle(*triangle_distributions[1], num_samples, -1)
+            
+        return np.array([sampler.estimate_ratio(draw_comparisons)])
+        
+    @staticmethod
+    def calculate_output_value_from_samples(input_values, sampler):
+        # The inputs already are samples, so only compare them
+        comparisons = input_values[0] > input_values[1]
+        sampler.set_sampling_error(calculate_standard_error(np.sum(comparisons), len(comparisons)))
+        
+        return np.array([np.mean(comparisons)])
         
 class CalculationTypeQualitative(CalculationType):
     @staticmethod
@@ -456,3 +812,16 @@ class CalculationTypeQualitative(CalculationType):
     @staticmethod
     def explaination():
         return "Manual and qualitative evaluation"
+        
+    @staticmethod
+    def supported_value_types():
+        return (ValueTypeString, ValueTypeNumber, ValueTypeProbability, ValueTypeTriangleDistribution)
+        
+    @staticmethod
+    def check_input_value_types(value_type, input_value_types):
+        # The value is entered manually, so the inputs are only shown for reference
+        return None
+        
+# Built-in calculation types in the order they are shown, where calculation types from plugins are added after them
+for calculation_type in (CalculationTypeMean, CalculationTypeAND, CalculationTypeOR, CalculationTypeMultiplication, CalculationTypeDivision, CalculationTypeSampleTriangle, CalculationTypeQualitative):
+    calculation_type_registry.register(calculation_type)
@@ -0,0 +1,224 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import * # Imported before general_calculations, as processes started by the pool might not have imported config yet
+from general_calculations import combine_values_monte_carlo, sample_triangle_distribution
+from diagnostics import diagnostics
+from attribute_value import CONFIGURATION_ERROR_VALUE
+
+process_pool = None # Kept between calculations, as starting processes takes longer than calculating most setups
+process_pool_size = None
+
+def get_process_pool(num_processes):
+    """
+    Returns a pool of the specified number of processes, replacing any existing pool of another size
+    """
+    global process_pool, process_pool_size
+    
+    if process_pool == None or process_pool_size != num_processes:
+        shut_down_process_pool()
+        
+        process_pool = ProcessPoolExecutor(num_processes)
+        process_pool_size = num_processes
+        
+    return process_pool
+    
+def shut_down_process_pool():
+    global process_pool, process_pool_size
+    
+    if process_pool != None:
+        process_pool.shutdown(cancel_futures=True)
+        
+    process_pool = None
+    process_pool_size = None
+    
+def find_components(ordered_setup_attributes, inputs_per_setup_attribute):
+    """
+    Splits the setup attributes into weakly connected components, where no setup attribute takes input from a setup attribute in another component
+    
+    ordered_setup_attributes: Topologically sorted list of setup attributes
+    inputs_per_setup_attribute: Dictionary (Key: Setup attribute, Value: List of input setup attributes)
+    
+    Returns a list of components, each a topologically sorted list of setup attributes
+    """
+    parent_per_setup_attribute = {setup_attribute: setup_attribute for setup_attribute in ordered_setup_attributes}
+    
+    def find_root(setup_attribute):
+        root = setup_attribute
+        
+        while parent_per_setup_attribute[root] != root:
+            root = parent_per_setup_attribute[root]
+            
+        # Point all visited setup attributes directly to the root to keep later searches short
+        while parent_per_setup_attribute[setup_attribute] != root:
+            parent_per_setup_attribute[setup_attribute], setup_attribute = root, parent_per_setup_attribute[setup_attribute]
+            
+        return root
+        
+    for setup_attribute in ordered_setup_attributes:
+        for input_setup_attribute in inputs_per_setup_attribute[setup_attribute]:
+            root, input_root = find_root(setup_attribute), find_root(input_setup_attribute)
+            
+            if root != input_root:
+                parent_per_setup_attribute[input_root] = root
+                
+    components = {} # Key: Root setup attribute, Value: List of setup attributes, in the same order as ordered_setup_attributes
+    
+    for setup_attribute in ordered_setup_attributes:
+        components.setdefault(find_root(setup_attribute), []).append(setup_attribute)
+        
+    return list(components.values())
+    
+def split_into_chunks(components, num_chunks):
+    """
+    Distributes components into at most the specified number of chunks with roughly the same number of setup attributes, sent to the processes one chunk at a time
+    
+    Returns a list of chunks, each a list of indices of components
+    """
+    chunks = [[] for _ in range(min(num_chunks, len(components)))]
+    chunk_sizes = [0] * len(chunks)
+    
+    # Place the largest components first, each in the currently smallest chunk
+    for i in sorted(range(len(components)), key=lambda i: len(components[i]), reverse=True):
+        smallest_chunk_index = chunk_sizes.index(min(chunk_sizes))
+        
+        chunks[smallest_chunk_index].append(i)
+        chunk_sizes[smallest_chunk_index] += len(components[i])
+        
+    return chunks
+    
+class ComponentAttribute:
+    """
+    Copy of a setup attribute containing everything required to calculate its value in another process, without referencing other setup classes or configuration classes that would otherwise be copied as well
+    Has the methods of setup attributes and configuration attributes that are used when combining values, so that it can be used in their place
+    """
+    def __init__(self, setup_attribute, input_indices, setup_input_scalars_per_attribute, is_calculated, sampler):
+        configuration_attribute = setup_attribute.get_configuration_attribute()
+        
+        self.__value_type = configuration_attribute.get_value_type()
+        self.__calculation_type = configuration_attribute.get_calculation_type()
+        self.__input_scalar = configuration_attribute.get_input_scalar()
+        self.__input_offset = configuration_attribute.get_input_offset()
+        self.__value = setup_attribute.get_attribute_value()
+        self.__override_value = setup_attribute.get_override_attribute_value()
+        self.__sampling_error = None
+        self.__input_indices = input_indices # Indices of the input setup attributes in the same component
+        self.__setup_input_scalars_per_attribute = setup_input_scalars_per_attribute
+        self.__is_calculated = is_calculated # Whether the value is calculated from the input setup attributes, rather than kept
+        self.__is_correctly_connected = is_calculated and configuration_attribute.is_correctly_connected()
+        self.__kernel = configuration_attribute.get_kernel() if is_calculated else None
+        self.__sampler = sampler
+        self.__diagnostics_names = setup_attribute.get_diagnostics_names()
+        
+    def get_diagnostics_names(self):
+        return self.__diagnostics_names
+        
+    def get_value_type(self):
+        return self.__value_type
+        
+    def get_attribute_value(self):
+        return self.__value
+        
+    def get_current_attribute_value(self):
+        if self.__override_value is not None:
+            return self.__override_value
+            
+        return self.__value
+        
+    def get_input_scalar(self):
+        return self.__input_scalar
+        
+    def get_input_offset(self):
+        return self.__input_offset
+        
+    def get_sampling_error(self):
+        return self.__sampling_error
+        
+    def get_input_indices(self):
+        return self.__input_indices
+        
+    def is_calculated(self):
+        return self.__is_calculated
+        
+    def calculate_value(self, input_attributes):
+        """
+        Calculates the value in the same way as SetupAttribute.calculate_value_from_inputs
+        """
+        diagnostics.set_context(self)
+        
+        self.__value = self.__kernel.calculate(input_attributes, self.__setup_input_scalars_per_attribute, self.__sampler)
+        self.__sampling_error = self.__sampler.get_sampling_error()
+        
+    def calculate_samples(self, input_attributes, samples_per_input_attribute):
+        """
+        Calculates the value in the same way as EvaluationPlan.calculate_samples
+        
+        Returns a NumPy array of samples if the value is a triangle distribution, otherwise None
+        """
+        diagnostics.set_context(self)
+        samples = None
+        
+        if self.__is_calculated:
+            if self.__is_correctly_connected:
+                self.__value, samples = combine_values_monte_carlo(self.__value_type, \
+                                                                   self.__calculation_type, \
+                                                                   input_attributes, \
+                                                                   samples_per_input_attribute, \
+                                                                   self.__setup_input_scalars_per_attribute, \
+                                                                   self, \
+                                                                   self.__sampler)
+                self.__sampling_error = self.__sampler.get_sampling_error()
+            else:
+                self.__value = CONFIGURATION_ERROR_VALUE
+                
+        # Triangle distributions that were not calculated from samples, such as manually entered, overridden and default values, are sampled directly
+        if self.__value_type == ValueTypeTriangleDistribution and (samples is None or self.__override_value is not None):
+            samples = sample_triangle_distribution(self.get_current_attribute_value(), self.__sampler)
+            
+        return samples
+        
+def evaluate_components(components, uses_monte_carlo):
+    """
+    Calculates the values of the component attributes of several components, run in the processes of the pool
+    
+    components: List of components, each a topologically sorted list of component attributes
+    
+    Returns a tuple (list with a list of tuples (value, sampling error) for each component, counts of the warnings found in the format of Diagnostics.get_counts)
+    """
+    # The process may have calculated other chunks before
+    diagnostics.clear()
+    
+    results_per_component = [evaluate_component(component_attributes, uses_monte_carlo) for component_attributes in components]
+    
+    return results_per_component, diagnostics.get_counts()
+    
+def evaluate_component(component_attributes, uses_monte_carlo):
+    """
+    Calculates the values of a topologically sorted list of component attributes, which only take input from each other
+    """
+    samples_per_index = {} # Key: Index of component attribute, Value: NumPy array of samples, kept until all component attributes taking it as input have been calculated
+    num_remaining_dependents = [0] * len(component_attributes)
+    
+    for component_attribute in component_attributes:
+        for input_index in component_attribute.get_input_indices():
+            num_remaining_dependents[input_index] += 1
+            
+    for i, component_attribute in enumerate(component_attributes):
+        input_indices = component_attribute.get_input_indices()
+        input_attributes = [component_attributes[input_index] for input_index in input_indices]
+        
+        if uses_monte_carlo:
+            samples = component_attribute.calculate_samples(input_attributes, [samples_per_index.get(input_index) for input_index in input_indices])
+            
+            if samples is not None and num_remaining_dependents[i] > 0:
+                samples_per_index[i] = samples
+                
+            for input_index in input_indices:
+                num_remaining_dependents[input_index] -= 1
+                
+                if num_remaining_dependents[input_index] == 0:
+                    samples_per_index.pop(input_index, None)
+                    
+        elif component_attribute.is_calculated():
+            component_attribute.calculate_value(input_attributes)
+            
+    return [(component_attribute.get_attribute_value(), component_attribute.get_sampling_error()) for component_attribute in component_attributes]
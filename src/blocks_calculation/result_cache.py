@@ -0,0 +1,150 @@
+import os
+import pickle
+import hashlib
+from sampler import Sampler
+from attribute_value import AttributeValue
+from diagnostics import diagnostics, RESULT_CACHE_FAILED
+from config import *
+
+def hash_description(description):
+    """
+    Returns a short digest of a tuple describing what a value depends on, where the tuple only contains numbers, strings, bytes, None and other such tuples
+    """
+    return hashlib.blake2b(repr(description).encode(), digest_size=16).digest()
+    
+def get_result_cache_path(saves_path):
+    """
+    Returns the path of the result cache of a save in the cache directory of the user, named by the save and a digest of its full path so that saves with the same name in different places are kept apart
+    """
+    saves_path = os.path.abspath(saves_path)
+    
+    return os.path.join(USER_CACHE_PATH, f"{os.path.basename(saves_path)}_{hashlib.blake2b(saves_path.encode(), digest_size=8).hexdigest()}.pickle")
+    
+def get_result_keys(evaluation_plan, sampler, uses_monte_carlo):
+    """
+    Finds the keys of the calculated values of all ordered setup attributes in the plan, where a key is a hash of everything the value depends on
+    The key of a setup attribute includes the keys of its input setup attributes, so that a changed value also changes the keys of all setup attributes depending on it
+    
+    Returns a dictionary (Key: Setup attribute, Value: Key of the calculated value, or None if the value is entered manually)
+    """
+    settings_key = hash_description((uses_monte_carlo, sampler.get_configuration()))
+    current_key_per_setup_attribute = {} # Key: Setup attribute, Value: Key of the value seen by the setup attributes taking it as input
+    result_key_per_setup_attribute = {}
+    
+    for setup_attribute in evaluation_plan.get_ordered_setup_attributes():
+        value_type_name = setup_attribute.get_value_type().__name__
+        result_key = None
+        
+        if not setup_attribute.takes_manual_input():
+            configuration_attribute = setup_attribute.get_configuration_attribute()
+            input_setup_attributes = evaluation_plan.get_inputs(setup_attribute)
+            
+            # The names identify the random stream of the setup attribute
+            result_key = hash_description((settings_key, \
+                                           value_type_name, \
+                                           configuration_attribute.get_calculation_type().__name__, \
+                                           configuration_attribute.is_correctly_connected(), \
+                                           configuration_attribute.get_input_scalar(), \
+                                           configuration_attribute.get_input_offset(), \
+                                           setup_attribute.get_diagnostics_names(), \
+                                           tuple((current_key_per_setup_attribute[input_setup_attribute], setup_attribute.get_setup_input_scalars(input_setup_attribute)) for input_setup_attribute in input_setup_attributes)))
+                                           
+        result_key_per_setup_attribute[setup_attribute] = result_key
+        
+        # Overridden and manually entered values are seen as they are, regardless of how they would be calculated
+        if setup_attribute.has_override_value():
+            current_key_per_setup_attribute[setup_attribute] = hash_description(("Override", value_type_name, setup_attribute.get_override_value()))
+        elif result_key == None:
+            current_key_per_setup_attribute[setup_attribute] = hash_description(("Manual", value_type_name, setup_attribute.get_value()))
+        else:
+            current_key_per_setup_attribute[setup_attribute] = result_key
+            
+    return result_key_per_setup_attribute
+    
+def add_warning(message):
+    """
+    Records a warning about the result cache, which is not caused by any specific setup attribute
+    """
+    previous_context = diagnostics.set_context(None)
+    diagnostics.add(RESULT_CACHE_FAILED, message)
+    diagnostics.set_context(previous_context)
+    
+class ResultCache:
+    """
+    Calculated values of setup attributes kept in a file in the cache directory of the user, so that a restored save does not need to recalculate the values that have not changed since it was saved
+    Each value is stored under a key that is a hash of its input values, calculation type, scalars, offset and sampling settings, so that a value is only used if it would be calculated the same way again
+    """
+    def __init__(self, file_path):
+        self.__file_path = file_path
+        self.__values_per_key = {} # Key: Result key, Value: Tuple (value as a tuple, sampling error)
+        self.__read_warning = None # Warning telling why the file could not be read, recorded when applied so that it is part of the diagnostics of the first calculation
+        
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, "rb") as file_cache:
+                    self.__values_per_key = pickle.load(file_cache)
+            except (OSError, EOFError, pickle.UnpicklingError) as e:
+                self.__read_warning = f"Warning: Could not read the result cache {file_path}, all values will be calculated: {e}"
+                
+    def apply(self, evaluation_plan):
+        """
+        Sets the values of all calculated setup attributes in the plan whose key is found in the cache, and marks them and all manually entered setup attributes as no longer dirty
+        The next evaluation of the plan then only calculates the setup attributes not found in the cache, together with those depending on them
+        
+        Nothing is applied when sampling is enabled in the settings, since all setup attributes are then calculated in every evaluation
+        
+        Returns a list of the setup attributes given values, so that they can be displayed
+        """
+        if self.__read_warning != None:
+            add_warning(self.__read_warning)
+            self.__read_warning = None
+            
+        if len(self.__values_per_key) == 0 or settings.uses_monte_carlo():
+            return []
+            
+        sampler = Sampler.from_settings(settings)
+        applied_setup_attributes = []
+        
+        # Setup attributes without inputs or a manually entered value are calculated first, since the keys depend on the values they get
+        for setup_attribute in evaluation_plan.get_ordered_setup_attributes():
+            if setup_attribute.get_attribute_value() is None and len(evaluation_plan.get_inputs(setup_attribute)) == 0:
+                evaluation_plan.calculate_value(setup_attribute, sampler)
+                applied_setup_attributes.append(setup_attribute)
+                
+        for setup_attribute, result_key in get_result_keys(evaluation_plan, sampler, False).items():
+            if result_key == None:
+                if setup_attribute.get_attribute_value() is not None:
+                    setup_attribute.clear_dirty()
+                    
+            elif result_key in self.__values_per_key:
+                value, sampling_error = self.__values_per_key[result_key]
+                
+                setup_attribute.set_calculated_value(AttributeValue.from_tuple(value), sampling_error)
+                setup_attribute.clear_dirty()
+                applied_setup_attributes.append(setup_attribute)
+                
+        evaluation_plan.mark_evaluated()
+        
+        return applied_setup_attributes
+        
+    def update(self, evaluation_plan):
+        """
+        Replaces the content of the cache with the current values of the calculated setup attributes in the plan, which should have been evaluated
+        """
+        self.__values_per_key = {}
+        
+        for setup_attribute, result_key in get_result_keys(evaluation_plan, Sampler.from_settings(settings), settings.uses_monte_carlo()).items():
+            if result_key != None and setup_attribute.get_attribute_value() is not None:
+                self.__values_per_key[result_key] = (setup_attribute.get_value(), setup_attribute.get_sampling_error())
+                
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.__file_path), exist_ok=True)
+            
+            with open(self.__file_path, "wb") as file_cache:
+                pickle.dump(self.__values_per_key, file_cache)
+        except OSError as e:
+            add_warning(f"Warning: Could not write the result cache {self.__file_path}, all values will be calculated when the save is next opened: {e}")
+            
+    def get_num_values(self):
+        return len(self.__values_per_key)
@@ -0,0 +1,166 @@
+import zlib
+import numpy as np
+
+# Ways of drawing samples, where all but random sampling draw uniform samples that are transformed into samples of the distribution
+# Random: Independent samples
+# Latin hypercube: One uniform sample in each of equally wide strata of [0, 1), in random order
+# Antithetic: Half of the uniform samples are independent, the other half are one minus those, only used where the estimated statistic is known to move in the same direction for all samples, otherwise the samples are independent
+# All strategies give common random numbers between calculations, as each setup attribute always draws from the same random stream for the same seed
+SAMPLING_STRATEGIES = ("Random", "Latin hypercube", "Antithetic")
+
+class Sampler:
+    """
+    Draws the samples used by calculation types and decides how distributions are compared
+    
+    The samples come from a seeded random stream, where each setup attribute gets its own stream that only depends on the seed and the names identifying the setup attribute
+    This gives the same samples every time the same setup is calculated
+    """
+    def __init__(self, num_samples, exact_triangle_comparison=False, seed=0, stream_key=(), *, sampling_tolerance=None, min_samples=1, sampling_strategy="Random"):
+        self.__num_samples = num_samples # Number of samples, or the maximum number of samples when sampling adaptively
+        self.__exact_triangle_comparison = exact_triangle_comparison # Whether two triangle distributions are compared analytically instead of by sampling
+        self.__seed = seed
+        self.__stream_key = stream_key # Tuple of integers identifying the random stream together with the seed
+        self.__sampling_tolerance = sampling_tolerance # Standard error at which to stop sampling, None to always draw all samples
+        self.__min_samples = min(min_samples, num_samples) # Minimum number of samples when sampling adaptively, which also is the number of samples drawn in each step
+        self.__sampling_strategy = sampling_strategy # Any of SAMPLING_STRATEGIES
+        self.__generator = None # Created when first sampling, as most setup attributes never sample
+        self.__sampling_error = None # Standard error of the last estimated ratio
+        
+    @staticmethod
+    def from_settings(settings):
+        """
+        Returns a sampler according to the specified general settings
+        """
+        sampling_tolerance = settings.get_sampling_tolerance() if settings.uses_adaptive_sampling() else None
+        sampling_strategy = settings.get_sampling_strategy()
+        
+        # Strategies that are no longer available, such as in older settings files, are replaced by random sampling
+        if sampling_strategy not in SAMPLING_STRATEGIES:
+            sampling_strategy = "Random"
+            
+        return Sampler(settings.get_num_samples(), \
+                       settings.uses_exact_triangle_comparison(), \
+                       settings.get_seed(), \
+                       sampling_tolerance=sampling_tolerance, \
+                       min_samples=settings.get_min_samples(), \
+                       sampling_strategy=sampling_strategy)
+                       
+    def get_configuration(self):
+        """
+        Returns a tuple of everything that affects the calculated values, not including the random stream
+        """
+        return (self.__num_samples, self.__exact_triangle_comparison, self.__seed, self.__sampling_tolerance, self.__min_samples, self.__sampling_strategy)
+        
+    def get_num_samples(self):
+        return self.__num_samples
+        
+    def uses_exact_triangle_comparison(self):
+        return self.__exact_triangle_comparison
+        
+    def for_setup_attribute(self, setup_attribute):
+        """
+        Returns a sampler with the same settings, but with a random stream identified by the class type, class instance and attribute names of the specified setup attribute
+        Every calculation of the setup attribute, such as in other scenarios, draws from the same stream, while the streams of different setup attributes are independent
+        """
+        setup_class = setup_attribute.get_setup_class()
+        stream_key = tuple(zlib.crc32(name.encode()) for name in (setup_class.get_configuration_name(), setup_class.get_instance_name(), setup_attribute.get_name()))
+        
+        return Sampler(self.__num_samples, \
+                       self.__exact_triangle_comparison, \
+                       self.__seed, \
+                       stream_key, \
+                       sampling_tolerance=self.__sampling_tolerance, \
+                       min_samples=self.__min_samples, \
+                       sampling_strategy=self.__sampling_strategy)
+        
+    def get_generator(self):
+        if self.__generator == None:
+            self.__generator = np.random.default_rng(np.random.SeedSequence((self.__seed,) + self.__stream_key))
+            
+        return self.__generator
+        
+    def sample_triangle(self, a, b, c, num_samples=None, direction=None):
+        """
+        Returns a NumPy array of samples from the triangle distribution (a, b, c)
+        
+        direction: 1 if the estimated statistic increases with the samples and -1 if it decreases, or None if not known, see draw_uniform_samples
+        """
+        if num_samples == None:
+            num_samples = self.__num_samples
+            
+        if self.__sampling_strategy == "Random":
+            return self.get_generator().triangular(a, b, c, num_samples)
+            
+        return calculate_triangle_inverse_cdf(self.draw_uniform_samples(num_samples, direction), a, b, c)
+        
+    def draw_uniform_samples(self, num_samples, direction=None):
+        """
+        Returns a NumPy array of samples in [0, 1) drawn according to the sampling strategy
+        
+        direction: 1 if the estimated statistic increases with the samples and -1 if it decreases, or None if not known
+        Antithetic samples only reduce the variance when the statistic moves in the same direction for every pair of samples, so they are reversed when the statistic decreases and replaced by independent samples when the direction is not known
+        """
+        generator = self.get_generator()
+        
+        if self.__sampling_strategy == "Latin hypercube":
+            return (generator.permutation(num_samples) + generator.random(num_samples)) / num_samples
+            
+        elif self.__sampling_strategy == "Antithetic" and direction != None:
+            uniform_samples = generator.random((num_samples + 1) // 2)
+            uniform_samples = np.concatenate((uniform_samples, 1 - uniform_samples))[:num_samples]
+            
+            return uniform_samples if direction > 0 else 1 - uniform_samples
+            
+        return generator.random(num_samples)
+        
+    def estimate_ratio(self, draw_comparisons):
+        """
+        Estimates the ratio of samples where a comparison is true
+        
+        draw_comparisons: Function taking a number of samples to draw, which returns a NumPy array of booleans with the result of comparing each sample
+        
+        When sampling adaptively, samples are drawn in steps until the standard error of the ratio is below the tolerance or the maximum number of samples is reached
+        """
+        if self.__sampling_tolerance == None:
+            comparisons = draw_comparisons(self.__num_samples)
+            num_true, num_drawn = np.sum(comparisons), len(comparisons)
+        else:
+            num_true, num_drawn = 0, 0
+            
+            while num_drawn < self.__num_samples:
+                comparisons = draw_comparisons(min(self.__min_samples, self.__num_samples - num_drawn))
+                num_true, num_drawn = num_true + np.sum(comparisons), num_drawn + len(comparisons)
+                
+                if calculate_standard_error(num_true, num_drawn) <= self.__sampling_tolerance:
+                    break
+                    
+        self.__sampling_error = calculate_standard_error(num_true, num_drawn)
+        
+        return num_true / num_drawn
+        
+    def set_sampling_error(self, sampling_error):
+        self.__sampling_error = sampling_error
+        
+    def get_sampling_error(self):
+        """
+        Returns the standard error of the last ratio estimated by sampling, None if nothing has been estimated
+        """
+        return self.__sampling_error
+        
+def calculate_triangle_inverse_cdf(uniform_samples, a, b, c):
+    """
+    Transforms samples in [0, 1) into samples of the triangle distribution (a, b, c), where a < c
+    """
+    is_left = uniform_samples < (b - a) / (c - a)
+    
+    return np.where(is_left, \
+                    a + np.sqrt(uniform_samples * (c - a) * (b - a)), \
+                    c - np.sqrt((1 - uniform_samples) * (c - a) * (c - b)))
+                    
+def calculate_standard_error(num_true, num_samples):
+    """
+    Returns the standard error of the ratio num_true / num_samples
+    The ratio is adjusted towards 0.5 (rule of succession) so that the error is not zero when no or all comparisons are true
+    """
+    adjusted_ratio = (num_true + 1) / (num_samples + 2)
+    return float(np.sqrt(adjusted_ratio * (1 - adjusted_ratio) / num_samples))
@@ -0,0 +1,267 @@
+import numpy as np
+from general_calculations import apply_setup_input_scalars
+from diagnostics import diagnostics
+from config import *
+
+class ScenarioValues:
+    """
+    Values of a setup attribute in several scenarios, where the numeric values are rows of a NumPy array with the scenario as the leading dimension
+    Only the scenarios where the value might differ from the base value have rows, so that a value affected by few scenarios stays small
+    Values that are not numeric values of the value type, such as ("-",) or text, are instead kept as tuples for the scenarios they appear in
+    """
+    def __init__(self, value_type, base_value, num_scenarios, scenario_indices=None, rows=None, exceptions=None):
+        self.__value_type = value_type
+        self.__base_value = base_value # Tuple of the value in all scenarios without a row
+        self.__num_scenarios = num_scenarios
+        self.__scenario_indices = scenario_indices if scenario_indices is not None else np.zeros(0, dtype=int) # Sorted NumPy array of the scenarios with a row
+        self.__rows = rows # 2D NumPy array (scenario, value) in the same order as the scenario indices, None if all of them are exceptions
+        self.__exceptions = exceptions if exceptions != None else {} # Key: Index of scenario with a row, Value: Tuple of the value in that scenario, whose row is not used
+        self.__width = None if value_type == ValueTypeString else len(value_type.default_value())
+        
+    def get_num_scenarios(self):
+        return self.__num_scenarios
+        
+    def get_base_value(self):
+        return self.__base_value
+        
+    def get_scenario_indices(self):
+        """
+        Returns a sorted NumPy array of the scenarios where the value might differ from the base value
+        """
+        return self.__scenario_indices
+        
+    def get_rows(self, scenario_indices):
+        """
+        Returns a 2D NumPy array (scenario, value) with the numeric values in the specified sorted scenarios, None if the value type is not numeric
+        The rows of scenarios with exceptions should not be used
+        """
+        if self.__width == None:
+            return None
+            
+        if is_numeric_value(self.__value_type, self.__base_value):
+            rows = np.tile(np.array(self.__base_value, dtype=float), (len(scenario_indices), 1))
+        else:
+            rows = np.zeros((len(scenario_indices), self.__width))
+            
+        if self.__rows is not None and len(self.__scenario_indices) > 0:
+            positions = np.minimum(np.searchsorted(self.__scenario_indices, scenario_indices), len(self.__scenario_indices) - 1)
+            has_row = self.__scenario_indices[positions] == scenario_indices
+            rows[has_row] = self.__rows[positions[has_row]]
+            
+        return rows
+        
+    def get_exceptions(self, scenario_indices):
+        """
+        Returns a dictionary (Key: Scenario index, Value: Tuple) with the values in the specified sorted scenarios that are not numeric values
+        """
+        exceptions = {}
+        
+        if not is_numeric_value(self.__value_type, self.__base_value):
+            own_scenario_indices = set(self.__scenario_indices.tolist())
+            exceptions = {i: self.__base_value for i in scenario_indices.tolist() if i not in own_scenario_indices}
+            
+        if len(self.__exceptions) > 0:
+            scenario_index_set = set(scenario_indices.tolist())
+            exceptions.update({i: value for i, value in self.__exceptions.items() if i in scenario_index_set})
+            
+        return exceptions
+        
+    def set_values(self, value_per_scenario):
+        """
+        Sets the values in some of the scenarios, for example to override values
+        
+        value_per_scenario: Dictionary (Key: Scenario index, Value: Tuple)
+        """
+        set_scenario_indices = np.array(sorted(value_per_scenario), dtype=int)
+        scenario_indices = np.union1d(self.__scenario_indices, set_scenario_indices)
+        rows = self.get_rows(scenario_indices)
+        exceptions = self.get_exceptions(scenario_indices)
+        
+        for position, i in zip(np.searchsorted(scenario_indices, set_scenario_indices), set_scenario_indices.tolist()):
+            value = value_per_scenario[i]
+            
+            if rows is not None and is_numeric_value(self.__value_type, value) and len(value) == self.__width:
+                rows[position] = value
+                exceptions.pop(i, None)
+            else:
+                exceptions[i] = value
+                
+        self.__scenario_indices = scenario_indices
+        self.__rows = rows
+        self.__exceptions = exceptions
+        
+    def get_value(self, scenario_index):
+        """
+        Returns the tuple value in the specified scenario, in the same format as setup attribute values
+        """
+        if scenario_index in self.__exceptions:
+            return self.__exceptions[scenario_index]
+            
+        position = np.searchsorted(self.__scenario_indices, scenario_index)
+        
+        if position < len(self.__scenario_indices) and self.__scenario_indices[position] == scenario_index:
+            return tuple(self.__rows[position])
+            
+        return self.__base_value
+        
+    def get_values(self):
+        """
+        Returns a list with the tuple value in each scenario
+        """
+        return [self.get_value(i) for i in range(self.__num_scenarios)]
+        
+def is_numeric_value(value_type, value):
+    """
+    Returns whether a value can be represented as a row of numbers for the specified value type
+    Only the number of elements and their types are checked, as is_correct_input_value of the value type records a warning for every value that is not correct
+    """
+    if value_type == ValueTypeString or value in (None, ("-",), ("SETUP ERROR",), ("CONFIGURATION ERROR",)):
+        return False
+        
+    return len(value) == len(value_type.default_value()) and all(isinstance(element, (float, int, np.number)) and not isinstance(element, bool) for element in value)
+    
+def evaluate_scenarios(evaluation_plan, override_values_per_scenario, setup_attributes, sampler):
+    """
+    Calculates the values of setup attributes in several scenarios in one pass, where the values of all scenarios are calculated together as NumPy operations along the scenario dimension
+    Only setup attributes that are affected by an override value and that the specified setup attributes depend on are calculated, and only in the scenarios affecting them
+    The values of all other setup attributes are those from the last evaluation of the plan
+    
+    evaluation_plan: Already evaluated plan containing the setup attributes
+    override_values_per_scenario: List of scenarios, each a dictionary (Key: Setup attribute, Value: Override value as a tuple)
+    setup_attributes: List of setup attributes whose values should be returned
+    sampler: Sampler drawing samples, where each scenario draws the same samples so that differences between scenarios are not hidden by sampling noise
+    
+    Returns a list of ScenarioValues, one for each of the specified setup attributes
+    """
+    num_scenarios = len(override_values_per_scenario)
+    override_values_per_setup_attribute = {} # Key: Setup attribute, Value: Dictionary (Key: Scenario index, Value: Override value)
+    
+    for i, override_values in enumerate(override_values_per_scenario):
+        for setup_attribute, override_value in override_values.items():
+            override_values_per_setup_attribute.setdefault(setup_attribute, {})[i] = override_value
+            
+    # Only setup attributes that the returned values depend on need to be calculated
+    planned_setup_attributes = set(evaluation_plan.get_ordered_setup_attributes())
+    relevant_setup_attributes = set()
+    to_visit = [setup_attribute for setup_attribute in setup_attributes if setup_attribute in planned_setup_attributes]
+    
+    while len(to_visit) > 0:
+        setup_attribute = to_visit.pop()
+        
+        if setup_attribute not in relevant_setup_attributes:
+            relevant_setup_attributes.add(setup_attribute)
+            to_visit.extend(evaluation_plan.get_inputs(setup_attribute))
+            
+    affected_values_per_setup_attribute = {} # Key: Setup attribute affected by any override value, Value: ScenarioValues, kept until no longer needed
+    returned_setup_attributes = set(setup_attributes)
+    num_remaining_dependents = {}
+    
+    for setup_attribute in relevant_setup_attributes:
+        for input_setup_attribute in evaluation_plan.get_inputs(setup_attribute):
+            num_remaining_dependents[input_setup_attribute] = num_remaining_dependents.get(input_setup_attribute, 0) + 1
+            
+    def get_scenario_values(setup_attribute):
+        if setup_attribute in affected_values_per_setup_attribute:
+            return affected_values_per_setup_attribute[setup_attribute]
+            
+        return ScenarioValues(setup_attribute.get_value_type(), setup_attribute.get_current_value(), num_scenarios)
+        
+    for setup_attribute in evaluation_plan.get_ordered_setup_attributes():
+        if setup_attribute not in relevant_setup_attributes:
+            continue
+            
+        input_setup_attributes = evaluation_plan.get_inputs(setup_attribute)
+        affected_input_setup_attributes = [input_setup_attribute for input_setup_attribute in input_setup_attributes if input_setup_attribute in affected_values_per_setup_attribute]
+        
+        if setup_attribute in override_values_per_setup_attribute or len(affected_input_setup_attributes) > 0:
+            # Manually entered and overridden values are the same as before in all scenarios, unless overridden by the scenario
+            if setup_attribute.takes_manual_input() or setup_attribute.has_override_value() or len(affected_input_setup_attributes) == 0:
+                scenario_values = ScenarioValues(setup_attribute.get_value_type(), setup_attribute.get_current_value(), num_scenarios)
+            else:
+                # Only the scenarios affecting any input value need to be calculated
+                scenario_indices = np.unique(np.concatenate([affected_values_per_setup_attribute[input_setup_attribute].get_scenario_indices() for input_setup_attribute in affected_input_setup_attributes]))
+                
+                scenario_values = calculate_scenario_values(setup_attribute, \
+                                                            input_setup_attributes, \
+                                                            [get_scenario_values(input_setup_attribute) for input_setup_attribute in input_setup_attributes], \
+                                                            scenario_indices, \
+                                                            sampler)
+                                                            
+            if setup_attribute in override_values_per_setup_attribute:
+                scenario_values.set_values(override_values_per_setup_attribute[setup_attribute])
+                
+            affected_values_per_setup_attribute[setup_attribute] = scenario_values
+            
+        # Release the values of input setup attributes that no other setup attribute needs
+        for input_setup_attribute in input_setup_attributes:
+            num_remaining_dependents[input_setup_attribute] -= 1
+            
+            if num_remaining_dependents[input_setup_attribute] == 0 and input_setup_attribute not in returned_setup_attributes:
+                affected_values_per_setup_attribute.pop(input_setup_attribute, None)
+                
+    return [get_scenario_values(setup_attribute) for setup_attribute in setup_attributes]
+    
+def calculate_scenario_values(setup_attribute, input_setup_attributes, input_scenario_values, scenario_indices, sampler):
+    """
+    Calculates the values of a setup attribute in the specified scenarios, giving the same value in each scenario as the calculation kernel of the configuration attribute would with the input values of that scenario
+    
+    scenario_indices: Sorted NumPy array of the scenarios affecting any input value
+    
+    Returns ScenarioValues
+    """
+    configuration_attribute = setup_attribute.get_configuration_attribute()
+    value_type = configuration_attribute.get_value_type()
+    calculation_type = configuration_attribute.get_calculation_type()
+    base_value = setup_attribute.get_current_value()
+    num_scenarios = input_scenario_values[0].get_num_scenarios()
+    diagnostics.set_context(setup_attribute)
+    
+    if not configuration_attribute.is_correctly_connected():
+        return ScenarioValues(value_type, base_value, num_scenarios, scenario_indices, None, {i: ("CONFIGURATION ERROR",) for i in scenario_indices.tolist()})
+        
+    number_of_inputs = calculation_type.number_of_inputs()
+    
+    # Missing connected setup attributes for the given calculation type to be correctly calculated
+    if number_of_inputs != None and len(input_setup_attributes) != number_of_inputs:
+        return ScenarioValues(value_type, base_value, num_scenarios, scenario_indices, None, {i: ("-",) for i in scenario_indices.tolist()})
+        
+    # The first input in each scenario that could not be used decides the value of that scenario
+    exceptions = {}
+    
+    for scenario_values in input_scenario_values:
+        for i, input_value in scenario_values.get_exceptions(scenario_indices).items():
+            if i not in exceptions:
+                # If an input value could not previously be calculated, this value cannot be calculated either
+                if input_value in (("-",), ("SETUP ERROR",)):
+                    exceptions[i] = input_value
+                else:
+                    exceptions[i] = ("SETUP ERROR",)
+                    
+    if len(exceptions) == len(scenario_indices):
+        return ScenarioValues(value_type, base_value, num_scenarios, scenario_indices, None, exceptions)
+        
+    input_rows_per_attribute = []
+    
+    for input_setup_attribute, scenario_values in zip(input_setup_attributes, input_scenario_values):
+        input_rows = scenario_values.get_rows(scenario_indices)
+        setup_input_scalars = setup_attribute.get_setup_input_scalars(input_setup_attribute)
+        
+        # Apply input scalars
+        if setup_input_scalars != None:
+            input_rows = apply_setup_input_scalars(input_rows, np.array(setup_input_scalars), input_setup_attribute.get_value_type().allowed_number_of_scalars())
+            
+        input_rows_per_attribute.append(input_rows)
+        
+    # All scenarios are calculated as one batch, where each scenario has the same number of inputs
+    if calculation_type.supports_batches() and len(set(input_rows.shape[1] for input_rows in input_rows_per_attribute)) == 1:
+        output_rows = calculation_type.calculate_output_values_batch(np.stack(input_rows_per_attribute, axis=1), np.full(len(scenario_indices), len(input_rows_per_attribute)))
+    else:
+        output_rows = np.zeros((len(scenario_indices), len(value_type.default_value())))
+        
+        for position, i in enumerate(scenario_indices.tolist()):
+            if i not in exceptions:
+                output_rows[position] = calculation_type.calculate_output_value([input_rows[position] for input_rows in input_rows_per_attribute], sampler.for_setup_attribute(setup_attribute))
+                
+    output_rows = value_type.adjust_rows_to_range(output_rows * configuration_attribute.get_input_scalar() + configuration_attribute.get_input_offset())
+
+    return ScenarioValues(value_type, base_value, num_scenarios, scenario_indices, output_rows, exceptions)
@@ -0,0 +1,72 @@
+import numpy as np
+from scenario_evaluation import is_numeric_value
+from config import *
+
+def analyze_sensitivity(evaluation_plan, output_setup_attribute, relative_change=0.1, low_high_values_per_attribute=None):
+    """
+    Finds how much each manually entered setup attribute affects the value of an output setup attribute, by calculating the output value when each of them is set to a low and a high value
+    All low and high values are calculated together as scenarios of the evaluation plan, where each scenario only calculates the setup attributes between the changed setup attribute and the output
+    
+    output_setup_attribute: Setup attribute whose value is compared
+    relative_change: Fraction that the manually entered values are decreased and increased by to get the low and high values
+    low_high_values_per_attribute: Dictionary (Key: Setup attribute, Value: Tuple (low value, high value)) used instead of the relative change, where only these setup attributes are changed
+    
+    Returns a list of tuples (setup attribute, low output value, high output value, effect), sorted with the largest effect first
+    The effect is the difference between the means of the high and low output values, or None if any of them is not a numeric value
+    """
+    if low_high_values_per_attribute == None:
+        low_high_values_per_attribute = {}
+        
+        for setup_attribute in get_manual_input_setup_attributes(evaluation_plan, output_setup_attribute):
+            value_type = setup_attribute.get_value_type()
+            value = np.array(setup_attribute.get_current_value(), dtype=float)
+            
+            low_high_values_per_attribute[setup_attribute] = (tuple(float(element) for element in value_type.adjust_to_range(value * (1 - relative_change))), \
+                                                              tuple(float(element) for element in value_type.adjust_to_range(value * (1 + relative_change))))
+                                                              
+    changed_setup_attributes = list(low_high_values_per_attribute.keys())
+    override_values_per_scenario = []
+    
+    # Two scenarios per changed setup attribute, first with the low value and then with the high value
+    for setup_attribute in changed_setup_attributes:
+        low_value, high_value = low_high_values_per_attribute[setup_attribute]
+        override_values_per_scenario += [{setup_attribute: low_value}, {setup_attribute: high_value}]
+        
+    output_values = evaluation_plan.evaluate_scenarios(override_values_per_scenario, [output_setup_attribute])[0]
+    output_value_type = output_setup_attribute.get_value_type()
+    sensitivities = []
+    
+    for i, setup_attribute in enumerate(changed_setup_attributes):
+        low_output_value, high_output_value = output_values.get_value(2 * i), output_values.get_value(2 * i + 1)
+        effect = None
+        
+        if is_numeric_value(output_value_type, low_output_value) and is_numeric_value(output_value_type, high_output_value):
+            effect = float(np.mean(high_output_value) - np.mean(low_output_value))
+            
+        sensitivities.append((setup_attribute, low_output_value, high_output_value, effect))
+        
+    # Largest absolute effect first, with those without an effect last
+    sensitivities.sort(key=lambda sensitivity: -1 if sensitivity[3] == None else abs(sensitivity[3]), reverse=True)
+    
+    return sensitivities
+    
+def get_manual_input_setup_attributes(evaluation_plan, output_setup_attribute):
+    """
+    Returns a list of the setup attributes with manually entered numeric values that the output setup attribute depends on, in the order of the evaluation plan
+    """
+    upstream_setup_attributes = set()
+    to_visit = [output_setup_attribute]
+    
+    while len(to_visit) > 0:
+        setup_attribute = to_visit.pop()
+        
+        if setup_attribute not in upstream_setup_attributes:
+            upstream_setup_attributes.add(setup_attribute)
+            to_visit.extend(evaluation_plan.get_inputs(setup_attribute))
+            
+    upstream_setup_attributes.discard(output_setup_attribute)
+    
+    return [setup_attribute for setup_attribute in evaluation_plan.get_ordered_setup_attributes() \
+            if setup_attribute in upstream_setup_attributes and \
+               setup_attribute.takes_manual_input() and \
+               is_numeric_value(setup_attribute.get_value_type(), setup_attribute.get_current_value())]
@@ -1,88 +1,212 @@
-from general_calculations import combine_values
+import weakref
+from general_calculations import combine_values_monte_carlo
+from evaluation_plan import EvaluationPlan, get_structure_version
+from diagnostics import diagnostics
+from attribute_value import CONFIGURATION_ERROR_VALUE, to_attribute_value
+from attribute_value_store import attribute_value_store, VALUE, OVERRIDE_VALUE
 from config import *
 
 class SetupAttribute:
     def __init__(self, setup_class, configuration_attribute):
         self.__setup_class = setup_class
         self.__configuration_attribute = configuration_attribute
-        self.__value = None # None or a tuple
-        self.__override_value = None # None or a tuple
+        self.__attribute_id = attribute_value_store.add() # Row in the store holding the value, override value, sampling error and whether the value is dirty
+        self.__connected_setup_attributes = None # Cached result of get_connected_setup_attributes, None if not yet resolved
+        self.__connected_setup_attributes_version = None # Structure version when the connected setup attributes were resolved
+        self.__evaluation_plan = None # Plan for calculating this setup attribute and its inputs, reused until the structure of the setup changes
+        
+        # The row can be reused once this setup attribute no longer exists
+        weakref.finalize(self, attribute_value_store.release, self.__attribute_id)
+        
+    def get_attribute_id(self):
+        """
+        Returns the id of the row in the attribute value store that holds the values of this setup attribute
+        """
+        return self.__attribute_id
         
     def has_setup_class(self, setup_class):
         return self.__setup_class == setup_class
         
+    def get_setup_class(self):
+        return self.__setup_class
+        
     def get_attribute_index(self):
         return self.__setup_class.get_setup_attributes().index(self)
         
     def get_value(self):
-        return self.__value
+        """
+        Returns the value as a tuple, or None if there is no value
+        """
+        value = attribute_value_store.get(VALUE, self.__attribute_id)
+        
+        if value is None:
+            return None
+            
+        return value.to_tuple()
+        
+    def get_attribute_value(self):
+        return attribute_value_store.get(VALUE, self.__attribute_id)
         
     def set_value(self, value):
-        self.__value = value
+        """
+        value: None, a tuple or an AttributeValue
+        """
+        value = to_attribute_value(value)
         
+        if value != self.get_attribute_value():
+            attribute_value_store.set(VALUE, self.__attribute_id, value)
+            attribute_value_store.set_sampling_error(self.__attribute_id, None)
+            self.mark_dirty()
+            
     def clear_value(self):
-        self.__value = None
+        self.set_value(None)
         
-    def attempt_to_reset_value(self):
+    def get_sampling_error(self):
         """
-        Reset value so that the program knows it should calculate a new one, but only if there is no override value and there are input attributes as this attribute otherwise should take a manual input
+        Returns the standard error of the calculated value if it was estimated by sampling, otherwise None
         """
-        if not self.has_override_value():
-            self.clear_value()
-            
+        return attribute_value_store.get_sampling_error(self.__attribute_id)
+        
     def get_override_value(self):
-        return self.__override_value
+        """
+        Returns the override value as a tuple, or None if there is no override value
+        """
+        override_value = attribute_value_store.get(OVERRIDE_VALUE, self.__attribute_id)
+        
+        if override_value is None:
+            return None
+            
+        return override_value.to_tuple()
+        
+    def get_override_attribute_value(self):
+        return attribute_value_store.get(OVERRIDE_VALUE, self.__attribute_id)
         
     def set_override_value(self, override_value):
-        self.__override_value = override_value
+        """
+        override_value: None, a tuple or an AttributeValue
+        """
+        override_value = to_attribute_value(override_value)
         
+        if override_value != self.get_override_attribute_value():
+            attribute_value_store.set(OVERRIDE_VALUE, self.__attribute_id, override_value)
+            self.mark_dirty()
+            
     def has_override_value(self):
-        return self.__override_value != None
+        return attribute_value_store.has(OVERRIDE_VALUE, self.__attribute_id)
         
     def reset_override_value(self):
-        self.__override_value = None
+        self.set_override_value(None)
         
     def get_current_value(self):
+        """
+        Returns the override value if there is one, otherwise the value, as a tuple or None
+        """
         if self.has_override_value():
-            return self.__override_value
+            return self.get_override_value()
             
-        return self.__value
+        return self.get_value()
+        
+    def get_current_attribute_value(self):
+        """
+        Same as get_current_value, but returns an AttributeValue that calculations can use without converting it
+        """
+        if attribute_value_store.has(OVERRIDE_VALUE, self.__attribute_id):
+            return attribute_value_store.get(OVERRIDE_VALUE, self.__attribute_id)
+            
+        return attribute_value_store.get(VALUE, self.__attribute_id)
+        
+    def is_dirty(self):
+        return attribute_value_store.is_dirty(self.__attribute_id)
+        
+    def mark_dirty(self):
+        """
+        Marks that the attributes taking this attribute as input need to be recalculated
+        """
+        attribute_value_store.set_dirty(self.__attribute_id, True)
+        
+    def clear_dirty(self):
+        attribute_value_store.set_dirty(self.__attribute_id, False)
         
     def has_connected_setup_attributes(self):
         return len(self.get_connected_setup_attributes()) > 0
         
-    def calculate_value(self):
+    def takes_manual_input(self):
         """
-        Calculates the value based on input attributes
+        Returns whether the value is entered manually rather than calculated from connected input attributes
         """
-        if self.__value != None:
-            return
+        return not self.has_connected_setup_attributes() or self.__configuration_attribute.get_calculation_type() == CalculationTypeQualitative
+        
+    def get_setup_input_scalars(self, input_setup_attribute):
+        """
+        Returns the input scalars applied to the value of a connected input setup attribute, None if connected internally within the same setup class
+        """
+        if input_setup_attribute.has_setup_class(self.__setup_class):
+            return None
             
-        connected_setup_attributes = []
-        setup_input_scalars_per_attribute = []
+        return self.__setup_class.get_input_setup_classes().get(input_setup_attribute.get_setup_class())
         
-        # First calculate any dependent connected setup attributes
-        for connected_setup_attribute, input_setup_scalars in self.get_connected_setup_attributes().items():
-            connected_setup_attributes.append(connected_setup_attribute)
-            setup_input_scalars_per_attribute.append(input_setup_scalars)
+    def calculate_value(self):
+        """
+        Calculates the value based on input attributes, first calculating any input attributes that lack a value
+        """
+        if attribute_value_store.has(VALUE, self.__attribute_id):
+            return
             
-            connected_setup_attribute.calculate_value()
+        if self.__evaluation_plan == None or self.__evaluation_plan.is_outdated():
+            self.__evaluation_plan = EvaluationPlan([self])
             
-        # Then calculate the value of this setup attribute considering all dependent connected setup attributes
-        input_configuration_attributes = list(self.__configuration_attribute.get_input_configuration_attributes().keys())
+        self.__evaluation_plan.evaluate()
+        
+    def set_calculated_value(self, value, sampling_error=None):
+        """
+        Sets a value calculated outside of this setup attribute, for example when calculated together with other setup attributes or in another process
+        
+        value: AttributeValue
+        """
+        attribute_value_store.set(VALUE, self.__attribute_id, value)
+        attribute_value_store.set_sampling_error(self.__attribute_id, sampling_error)
+        
+    def calculate_value_from_inputs(self, input_setup_attributes, setup_input_scalars_per_attribute, sampler):
+        """
+        Calculates the value based on input attributes whose values already have been calculated
+        
+        input_setup_attributes: List of connected setup attributes that this setup attribute takes input from
+        setup_input_scalars_per_attribute: List of input scalars for each input setup attribute
+        sampler: Sampler drawing samples, if applicable to the calculation type
+        """
+        diagnostics.set_context(self)
+        
+        self.set_calculated_value(self.__configuration_attribute.get_kernel().calculate(input_setup_attributes, setup_input_scalars_per_attribute, sampler), sampler.get_sampling_error())
+        
+    def calculate_value_from_samples(self, input_setup_attributes, samples_per_input_attribute, setup_input_scalars_per_attribute, sampler):
+        """
+        Calculates the value based on input attributes whose values already have been calculated, where triangle distributions are represented by samples
+        
+        samples_per_input_attribute: List of samples for each input setup attribute, None for input setup attributes that are not triangle distributions
+        
+        Returns a NumPy array of samples if the calculated value is a triangle distribution, otherwise None
+        """
         value_type = self.__configuration_attribute.get_value_type()
         calculation_type = self.__configuration_attribute.get_calculation_type()
+        diagnostics.set_context(self)
         
-        if value_type.correctly_connected(calculation_type, input_configuration_attributes):
-            self.__value = combine_values(value_type, \
-                                          calculation_type, \
-                                          connected_setup_attributes, \
-                                          setup_input_scalars_per_attribute, \
-                                          self.__configuration_attribute, \
-                                          settings.get_num_samples())
-        else:
-            self.__value = ("CONFIGURATION ERROR",)
+        if self.__configuration_attribute.is_correctly_connected():
+            value, samples = combine_values_monte_carlo(value_type, \
+                                                        calculation_type, \
+                                                        input_setup_attributes, \
+                                                        samples_per_input_attribute, \
+                                                        setup_input_scalars_per_attribute, \
+                                                        self.__configuration_attribute, \
+                                                        sampler)
+            self.set_calculated_value(value, sampler.get_sampling_error())
+            return samples
             
+        self.set_calculated_value(CONFIGURATION_ERROR_VALUE)
+        return None
+        
+    def get_configuration_attribute(self):
+        return self.__configuration_attribute
+        
     def get_value_type(self):
         return self.__configuration_attribute.get_value_type()
         
@@ -92,28 +216,52 @@ class SetupAttribute:
     def get_name(self):
         return self.__configuration_attribute.get_name()
         
+    def get_diagnostics_names(self):
+        """
+        Returns a tuple (class type, class instance, attribute) identifying this attribute in diagnostics
+        """
+        return (self.__setup_class.get_configuration_name(), self.__setup_class.get_instance_name(), self.get_name())
+        
     def is_hidden(self):
         return self.__configuration_attribute.is_hidden()
         
     def get_connected_setup_attributes(self):
         """
         Returns all setup classes that are connected through connected setup classes, considering the connections between specific attributes made in the configuration
+        The result is cached until the connections between setup classes or configuration attributes change
+        """
+        if self.__connected_setup_attributes == None or self.__connected_setup_attributes_version != get_structure_version():
+            self.__connected_setup_attributes = self.resolve_connected_setup_attributes()
+            self.__connected_setup_attributes_version = get_structure_version()
+            
+        return self.__connected_setup_attributes
+        
+    def clear_connected_setup_attributes_cache(self):
+        self.__connected_setup_attributes = None
+        
+    def resolve_connected_setup_attributes(self):
+        """
+        Finds the connected setup attributes that this setup attribute takes input from, using the setup attribute of each connected setup class that corresponds to each input configuration attribute
         """
         filtered_connected_setup_attributes = {}
-        connected_setup_classes = self.__setup_class.get_input_setup_classes() | {self.__setup_class: None}
+        input_setup_classes = self.__setup_class.get_input_setup_classes()
         
         # Go through all connected configuration attributes
         for connected_configuration_attribute, is_internal in self.__configuration_attribute.get_input_configuration_attributes().items():
-            # Go through all connected setup classes
-            for connected_setup_class, input_scalars in connected_setup_classes.items():
-                found_internal_connection = is_internal and connected_setup_class == self.__setup_class
-                found_external_connection = not is_internal and connected_setup_class != self.__setup_class
+            # Connected within the same setup class
+            if is_internal:
+                connected_setup_attribute = self.__setup_class.get_setup_attribute(connected_configuration_attribute)
                 
-                # If a setup class corresponding to the configuration class with the connected configuration attribute is currently connected
-                if found_internal_connection or found_external_connection:
-                    # Go through all setup attributes of the connected setup class to find the one with the correct configuration attribute
-                    for connected_setup_attribute in connected_setup_class.get_setup_attributes():
-                        if connected_setup_attribute.has_configuration_attribute(connected_configuration_attribute):
+                if connected_setup_attribute != None:
+                    filtered_connected_setup_attributes[connected_setup_attribute] = None
+                    
+            # Connected through any of the currently connected setup classes
+            else:
+                for connected_setup_class, input_scalars in input_setup_classes.items():
+                    if connected_setup_class != self.__setup_class:
+                        connected_setup_attribute = connected_setup_class.get_setup_attribute(connected_configuration_attribute)
+                        
+                        if connected_setup_attribute != None:
                             filtered_connected_setup_attributes[connected_setup_attribute] = input_scalars
                             
         return filtered_connected_setup_attributes
@@ -1,4 +1,5 @@
 from setup_attribute_calculation import SetupAttribute
+from evaluation_plan import EvaluationPlan, mark_structure_changed
 from config import *
 
 class SetupClass:
@@ -6,7 +7,9 @@ class SetupClass:
         self.__instance_name = instance_name
         self.__configuration_class = configuration_class
         self.__setup_attributes = []
+        self.__setup_attributes_per_configuration_attribute = {} # Key: Configuration attribute, Value: Setup attribute
         self.__input_setup_classes = {} # Key: Setup class, Value: List of input scalars
+        self.__evaluation_plan = None # Plan for calculating the setup attributes, reused until the structure of the setup changes
         
         # Create setup versions of each configuration attribute in the specified configuration class
         for configuration_attribute in configuration_class.get_configuration_attributes():
@@ -25,18 +28,28 @@ class SetupClass:
         """
         Calculate the final value of all setup attributes of this setup class
         """
-        for attribute in self.__setup_attributes:
-            attribute.calculate_value()
+        if self.__evaluation_plan == None or self.__evaluation_plan.is_outdated():
+            self.__evaluation_plan = EvaluationPlan(self.__setup_attributes)
             
+        self.__evaluation_plan.evaluate()
+        
     def get_setup_attributes(self):
         return self.__setup_attributes
         
+    def get_setup_attribute(self, configuration_attribute):
+        """
+        Returns the setup attribute corresponding to the specified configuration attribute, None if there is no such setup attribute
+        """
+        return self.__setup_attributes_per_configuration_attribute.get(configuration_attribute)
+        
     def create_setup_attribute(self, configuration_attribute):
         """
         Creates a setup version of a configuration attribute
         """
         setup_attribute = SetupAttribute(self, configuration_attribute)
         self.__setup_attributes.append(setup_attribute)
+        self.__setup_attributes_per_configuration_attribute[configuration_attribute] = setup_attribute
+        mark_structure_changed()
         
         return setup_attribute
         
@@ -44,10 +57,11 @@ class SetupClass:
         """
         Removes a setup attribute based on its configuration attribute
         """
-        for setup_attribute in self.__setup_attributes:
-            if setup_attribute.has_configuration_attribute(configuration_attribute):
-                self.__setup_attributes.remove(setup_attribute)
-                break
+        setup_attribute = self.__setup_attributes_per_configuration_attribute.pop(configuration_attribute, None)
+        
+        if setup_attribute != None:
+            self.__setup_attributes.remove(setup_attribute)
+            mark_structure_changed()
         
     def get_input_setup_classes(self):
         return self.__input_setup_classes
@@ -62,8 +76,19 @@ class SetupClass:
         if input_setup_class_scalars == None:
             input_setup_class_scalars = [1]
             
-        self.__input_setup_classes[input_class] = input_setup_class_scalars
+        # Only the input scalars changed, so the connections between attributes remain the same
+        if input_class in self.__input_setup_classes:
+            self.__input_setup_classes[input_class] = input_setup_class_scalars
+            
+            for setup_attribute in self.__setup_attributes:
+                setup_attribute.clear_connected_setup_attributes_cache()
+                setup_attribute.mark_dirty()
+                
+        else:
+            self.__input_setup_classes[input_class] = input_setup_class_scalars
+            mark_structure_changed()
         
     def remove_input_setup_class(self, input_class):
         if input_class in self.__input_setup_classes:
             self.__input_setup_classes.pop(input_class)
+            mark_structure_changed()
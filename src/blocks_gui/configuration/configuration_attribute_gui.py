@@ -142,6 +142,9 @@ class GUIConfigurationAttribute(GUIModelingBlock):
                         
                 setup_class_gui.update_setup_attribute_gui_order()
                 
+        # Setup attributes were created or deleted
+        self.get_model().mark_changed()
+        
     def get_setup_attributes_gui(self):
         return self.__setup_attributes_gui
         
@@ -160,6 +163,7 @@ class GUIConfigurationAttribute(GUIModelingBlock):
         """
         self.__configuration_attribute.set_name(name)
         self.update_text()
+        self.get_model().mark_changed()
         
     def get_value_type(self):
         return self.__configuration_attribute.get_value_type()
@@ -163,6 +163,7 @@ class GUIConfigurationClass(GUIClass):
         """
         self.__configuration_class.set_name(name)
         self.set_text(name)
+        self.get_model().mark_changed()
         
         # Update linked GUI configuration classes
         for linked_configuration_class_gui in self.get_model().get_linked_configuration_classes_gui(self):
@@ -1,8 +1,7 @@
 import tkinter as tk
 import tkinter.font as tkfont
-import numpy as np
 from circle_indicator_gui import GUICircleIndicator
-from helper_functions_general import convert_grid_coordinate_to_actual, convert_actual_coordinate_to_grid, get_actual_coordinates_after_scale, distance_to_closest_grid_intersection, get_font, get_text_that_fits, delete_all
+from helper_functions_general import convert_grid_coordinate_to_actual, convert_actual_coordinate_to_grid, get_actual_coordinates_after_scale, distance_to_closest_grid_intersection, get_adjacent_direction, get_font, get_text_that_fits, delete_all
 from default_coordinate_functions import get_block_start_coordinates
 from config import *
 
@@ -419,20 +418,9 @@ class GUIModelingBlock(GUIBlock):
         """
         Returns whether any of the specified grid coordinates are considered adjacent to this block, and in such cases which direction goes out from the block
         """
-        for coordinate in coordinates:
-            coordinate_to_check = np.array(coordinate)
-            
-            for i in range(self.get_height()):
-                coordinate_left = np.array((self.get_x() - 1, self.get_y() + i))
-                coordinate_right = np.array((self.get_x() + self.get_width(), self.get_y() + i))
-                
-                if np.linalg.norm(coordinate_to_check - coordinate_left) < 0.5:
-                    return True, "LEFT"
-                    
-                elif np.linalg.norm(coordinate_to_check - coordinate_right) < 0.5:
-                    return True, "RIGHT"
-                    
-        return False, ""
+        direction = get_adjacent_direction(coordinates, self.get_x(), self.get_y(), self.get_width(), self.get_height())
+        
+        return direction != "", direction
         
     def get_text(self):
         """
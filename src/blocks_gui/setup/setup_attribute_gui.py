@@ -83,11 +83,8 @@ class GUISetupAttribute(GUIModelingBlock):
         """
         Update the input value type (manual entry field or calculated value) of this setup attribute based on whether there are connected input attributes
         """
-        has_currently_connected_inputs = self.__setup_attribute.has_connected_setup_attributes()
-        
         # No manual entry as it takes input from connected attributes
-        if has_currently_connected_inputs and \
-           self.__configuration_attribute_gui.get_configuration_attribute().get_calculation_type() != CalculationTypeQualitative:
+        if not self.__setup_attribute.takes_manual_input():
             self.switch_to_value_label(clear_value)
         else:
             self.switch_to_value_entry(clear_value)
@@ -171,9 +168,9 @@ class GUISetupAttribute(GUIModelingBlock):
         """
         if self.__setup_attribute.has_override_value():
             self.switch_to_value_label(False)
-            self.set_displayed_value(convert_value_to_string(self.__setup_attribute.get_override_value()), "red")
+            self.set_displayed_value(convert_value_to_string(self.__setup_attribute.get_override_attribute_value()), "red")
         else:
-            self.set_displayed_value(convert_value_to_string(self.__setup_attribute.get_value()))
+            self.set_displayed_value(convert_value_to_string(self.__setup_attribute.get_attribute_value()))
             
     def attempt_to_reset_override_value(self):
         """
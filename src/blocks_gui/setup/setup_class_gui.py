@@ -1,9 +1,9 @@
 import tkinter as tk
-import numpy as np
 from general_gui import GUIClass
 from setup_attribute_gui import GUISetupAttribute
 from circle_indicator_gui import GUICircleIndicator
 from options import Options
+from helper_functions_general import get_adjacent_direction
 from config import *
 
 class GUISetupClass(GUIClass):
@@ -60,42 +60,12 @@ class GUISetupClass(GUIClass):
     def is_adjacent(self, coordinates):
         """
         Returns whether any of the specified grid coordinates are adjacent to this block, and in such cases returns the direction which the adjacent coordinates goes out from the block
+        The setup attributes are placed directly below the class, so they are checked together with the class as one block
         """
-        # Above or below
-        for coordinate in coordinates:
-            coordinate_to_check = np.array(coordinate)
-            
-            for i in range(self.get_width()):
-                coordinate_up = np.array((self.get_x() + i, self.get_y() - 1))
-                
-                # Above class
-                if np.linalg.norm(coordinate_to_check - coordinate_up) < 0.5:
-                    return True, "UP"
-                    
-                if len(self.__setup_attributes_gui) == 0:
-                    coordinate_down = np.array((self.get_x() + i, self.get_y() + self.get_height()))
-                else:
-                    last_attribute = self.__setup_attributes_gui[-1]
-                    coordinate_down = np.array((last_attribute.get_x() + i, last_attribute.get_y() + last_attribute.get_height()))
-                    
-                # Below last attribute
-                if np.linalg.norm(coordinate_to_check - coordinate_down) < 0.5:
-                    return True, "DOWN"
-                    
-        # Sides of class
-        is_adjacent_side, direction = super().is_adjacent(coordinates)
-        
-        if is_adjacent_side:
-            return True, direction 
-            
-        for i, attribute in enumerate(self.__setup_attributes_gui):
-            # Sides of attribute
-            is_adjacent_side, direction = attribute.is_adjacent(coordinates)
-            
-            if is_adjacent_side:
-                return True, direction
-                
-        return False, ""
+        height = self.get_height() + sum(setup_attribute_gui.get_height() for setup_attribute_gui in self.__setup_attributes_gui)
+        direction = get_adjacent_direction(coordinates, self.get_x(), self.get_y(), self.get_width(), height, includes_up_and_down=True)
+        
+        return direction != "", direction
         
     def create_setup_attribute_gui(self, setup_attribute, configuration_attribute_gui):
         """
@@ -109,6 +79,7 @@ class GUISetupClass(GUIClass):
         
         self.__setup_attributes_gui.append(setup_attribute_gui)
         self.add_attached_block(setup_attribute_gui)
+        self.get_model().mark_changed()
         
         return setup_attribute_gui
         
@@ -133,21 +104,25 @@ class GUISetupClass(GUIClass):
         Returns all GUI setup attributes that the specified setup attribute currently takes as input
         """
         connected_setup_attributes_gui = []
+        connected_setup_classes_gui = {connected_setup_class_gui.get_setup_class(): connected_setup_class_gui for connected_setup_class_gui in self.get_connected_setup_classes_gui() + [self]}
         
         for connected_setup_attribute in setup_attribute.get_connected_setup_attributes():
-            for connected_setup_class_gui in self.get_connected_setup_classes_gui() + [self]:
-                # Found the setup class that has the currently sought connected setup attribute
-                if connected_setup_attribute.has_setup_class(connected_setup_class_gui.get_setup_class()):
-                    if not connected_setup_attribute.is_hidden():
-                        for i, setup_attribute_gui in enumerate(connected_setup_class_gui.get_setup_attributes_gui()):
-                            if setup_attribute_gui.get_setup_attribute() == connected_setup_attribute:
-                                connected_setup_attributes_gui.append(connected_setup_class_gui.get_setup_attributes_gui()[i])
-                                break
-                                
-                    # Adds the attributes connected to the hidden one
-                    else:
-                        connected_setup_attributes_gui += connected_setup_class_gui.get_connected_setup_attributes_gui(connected_setup_attribute)
+            # Find the setup class that has the currently sought connected setup attribute
+            connected_setup_class_gui = connected_setup_classes_gui.get(connected_setup_attribute.get_setup_class())
+            
+            if connected_setup_class_gui == None:
+                continue
+                
+            if not connected_setup_attribute.is_hidden():
+                for setup_attribute_gui in connected_setup_class_gui.get_setup_attributes_gui():
+                    if setup_attribute_gui.get_setup_attribute() == connected_setup_attribute:
+                        connected_setup_attributes_gui.append(setup_attribute_gui)
+                        break
                         
+            # Adds the attributes connected to the hidden one
+            else:
+                connected_setup_attributes_gui += connected_setup_class_gui.get_connected_setup_attributes_gui(connected_setup_attribute)
+                
         return connected_setup_attributes_gui
         
     def get_setup_class(self):
@@ -163,6 +138,7 @@ class GUISetupClass(GUIClass):
         index_first_move_up = self.__setup_attributes_gui.index(setup_attribute_gui_to_remove)
         self.__setup_attributes_gui.remove(setup_attribute_gui_to_remove)
         self.remove_attached_block(setup_attribute_gui_to_remove)
+        self.get_model().mark_changed()
         
         # Move up all GUI setup attributes after the removed one
         for setup_attribute_gui in self.__setup_attributes_gui[index_first_move_up:]:
@@ -236,24 +212,20 @@ class GUISetupClass(GUIClass):
             for linked_setup_class_gui in self.get_model().get_linked_setup_classes_gui(self):
                 linked_setup_class_gui.update_value_input_types(specific_attribute_index=specific_attribute_index, update_linked=False)
                 
-    def calculate_values(self):
+    def display_calculated_values(self, setup_attributes=None):
         """
-        Calculates and shows the values of all setup attributes of this setup class
-        """
-        self.__setup_class.calculate_values()
+        Shows the already calculated values of the setup attributes of this setup class
         
+        setup_attributes: Set of setup attributes whose values should be shown, or None to show the values of all setup attributes
+        """
         for setup_attribute_gui in self.__setup_attributes_gui:
-            setup_attribute_gui.display_calculated_value()
-            
-    def reset_calculated_values(self):
+            if setup_attributes == None or setup_attribute_gui.get_setup_attribute() in setup_attributes:
+                setup_attribute_gui.display_calculated_value()
+                
+    def add_entered_values_to_attributes(self):
         """
-        Resets the calculated value of all setup attributes so that the program knows which ones should be recalculated later
+        Sets the value of setup attributes to that of their manual entry fields where there is one, so that the program knows which values have changed
         """
-        # Reset values
-        for setup_attribute in self.__setup_class.get_setup_attributes():
-            setup_attribute.attempt_to_reset_value()
-            
-        # Sets the value to that of the manual entry field where there is one
         for setup_attribute_gui in self.__setup_attributes_gui:
             if setup_attribute_gui.has_manually_entered_value():
                 setup_attribute_gui.add_entered_value_to_attribute()
@@ -276,12 +248,14 @@ class GUISetupClass(GUIClass):
         """
         self.__setup_class.set_instance_name(name)
         self.update_text()
+        self.get_model().mark_changed()
         
     def update_text(self, update_linked=True):
         """
         Updates the displayed text according to the set configuration class and setup class names
         """
         self.set_text(f"{self.__configuration_class_gui.get_name()}: {self.__setup_class.get_instance_name()}")
+        self.get_model().get_name_index().update_names(self)
         
         if update_linked:
             for linked_setup_class_gui in self.get_model().get_linked_setup_classes_gui(self):
@@ -0,0 +1,481 @@
+import os
+import json
+import pickle
+import numpy as np
+from config import * # Imported before the calculation blocks, as config in turn imports the value and calculation types from general_calculations
+from configuration_class_calculation import ConfigurationClass
+from evaluation_plan import EvaluationPlan, get_structure_version
+from result_cache import ResultCache, get_result_cache_path
+from diagnostics import diagnostics
+from helper_functions_general import convert_value_to_string, convert_string_to_value, get_adjacent_direction
+from name_index import NameIndex
+
+class HeadlessModel:
+    """
+    Restores the calculation blocks of a save without creating any views or GUI blocks, such that values can be calculated without a display
+    
+    The GUI versions of the blocks are replaced by dictionaries only keeping what the restored save needs, such as the grid position of each block, as blocks are attached to each other by being adjacent in the grid
+    Setup views, setup classes and setup attributes are instead replaced by headless versions with the same methods as used by the ScriptInterface, so that scripts can be run without a display
+    """
+    def __init__(self, saves_path=SAVES_PATH):
+        self.__saves_path = saves_path
+        self.__setup_views = [] # HeadlessSetupViews
+        self.__linked_setup_groups_per_number = {} # Key: Group number, Value: List of headless setup classes that are linked copies
+        self.__name_index = NameIndex() # Setup classes of each setup view by class type and class instance name
+        self.__evaluation_plan = None
+        self.__evaluation_plan_setup_classes = None # Setup classes the evaluation plan was built from
+        self.__has_calculated = False
+        self.__result_cache = ResultCache(get_result_cache_path(saves_path)) # Values calculated when the save was made, applied before the first calculation
+        
+        linked_configuration_groups_per_number = {} # Key: Group number, Value: Configuration class
+        linked_setup_groups_per_number = {} # Key: Group number, Value: Setup class
+        mapping_configuration_class = {} # Maps IDs of GUI configuration classes from the save to the restored configuration classes
+        
+        with open(os.path.join(saves_path, os.path.basename(FILE_PATHS_SAVES_PATH)), "r") as file_with_paths:
+            for line in file_with_paths:
+                file_path = line.strip()
+                view_directory, view_name = os.path.split(file_path)
+                view_name = view_name.replace(".pickle", "")
+                
+                view_directory = os.path.split(view_directory)[1]
+                
+                if view_directory == CONFIGURATION_SAVES_DIRECTORY:
+                    mapping_configuration_class.update(self.restore_configuration_view(file_path, linked_configuration_groups_per_number))
+                    
+                elif view_directory == SETUP_SAVES_DIRECTORY:
+                    self.restore_setup_view(file_path, view_name, mapping_configuration_class, linked_setup_groups_per_number)
+                    
+        self.add_saved_values_to_attributes()
+        
+    def restore_configuration_view(self, file_path, linked_groups_per_number):
+        """
+        Restores the configuration classes of a saved configuration view, including the inputs and connections of their configuration attributes
+        
+        Returns mapping between IDs of GUI configuration classes from the save to the restored configuration classes
+        """
+        try:
+            with open(os.path.join(self.__saves_path, file_path), "rb") as file_pickle:
+                grid_offset, saved_states_configuration_classes_gui, saved_states_configuration_inputs_gui = pickle.load(file_pickle)
+        except FileNotFoundError as e:
+            print(f"Could not find configuration view {file_path}: {e}")
+            return {}
+            
+        mapping_configuration_class = {}
+        configuration_attributes_gui = [] # In the order they are searched when attaching inputs
+        mapping_configuration_attribute_gui = {} # Maps IDs of GUI configuration attributes from the save to the restored ones
+        
+        for saved_states_configuration_class_gui in saved_states_configuration_classes_gui:
+            linked_group_number = saved_states_configuration_class_gui["linked_group_number"]
+            
+            # Linked copies share the same configuration class
+            if linked_group_number != None and linked_group_number in linked_groups_per_number:
+                configuration_class = linked_groups_per_number[linked_group_number]
+            else:
+                configuration_class = ConfigurationClass(saved_states_configuration_class_gui["name"])
+                
+                if linked_group_number != None:
+                    linked_groups_per_number[linked_group_number] = configuration_class
+                    
+                for saved_states_configuration_attribute_gui in saved_states_configuration_class_gui["configuration_attributes_gui"]:
+                    configuration_attribute = configuration_class.create_attribute(saved_states_configuration_attribute_gui["name"])
+                    configuration_attribute.set_value_type(saved_states_configuration_attribute_gui["value_type"])
+                    configuration_attribute.set_input_scalar(saved_states_configuration_attribute_gui["input_scalar"])
+                    configuration_attribute.set_input_offset(saved_states_configuration_attribute_gui["input_offset"])
+                    configuration_attribute.set_hidden(saved_states_configuration_attribute_gui["is_hidden"])
+                    
+            mapping_configuration_class[saved_states_configuration_class_gui["configuration_class_gui"]] = configuration_class
+            
+            # Each copy of a configuration class has its own GUI configuration attributes, placed below the class
+            configuration_class_gui = {"x": saved_states_configuration_class_gui["x"], "y": saved_states_configuration_class_gui["y"]}
+            
+            for i, configuration_attribute in enumerate(configuration_class.get_configuration_attributes()):
+                configuration_attribute_gui = {"configuration_attribute": configuration_attribute, \
+                                               "configuration_class_gui": configuration_class_gui, \
+                                               "x": configuration_class_gui["x"], \
+                                               "y": configuration_class_gui["y"] + CLASS_HEIGHT + i * ATTRIBUTE_HEIGHT, \
+                                               "has_configuration_input": False}
+                configuration_attributes_gui.append(configuration_attribute_gui)
+                
+            for saved_states_configuration_attribute_gui, configuration_attribute_gui in zip(saved_states_configuration_class_gui["configuration_attributes_gui"], configuration_attributes_gui[-len(configuration_class.get_configuration_attributes()):]):
+                mapping_configuration_attribute_gui[saved_states_configuration_attribute_gui["configuration_attribute_gui"]] = configuration_attribute_gui
+                
+        for saved_states_configuration_input_gui in saved_states_configuration_inputs_gui:
+            input_coordinate = (saved_states_configuration_input_gui["x"], saved_states_configuration_input_gui["y"])
+            attached_configuration_attribute_gui = None
+            
+            # Attach to the first adjacent GUI configuration attribute without an input
+            for configuration_attribute_gui in configuration_attributes_gui:
+                if not configuration_attribute_gui["has_configuration_input"] and \
+                   get_adjacent_direction([input_coordinate], configuration_attribute_gui["x"], configuration_attribute_gui["y"], ATTRIBUTE_WIDTH, ATTRIBUTE_HEIGHT) != "":
+                    attached_configuration_attribute_gui = configuration_attribute_gui
+                    attached_configuration_attribute_gui["has_configuration_input"] = True
+                    break
+                    
+            # Inputs that are not attached do not affect any calculations
+            if attached_configuration_attribute_gui == None:
+                continue
+                
+            configuration_attribute = attached_configuration_attribute_gui["configuration_attribute"]
+            calculation_type = saved_states_configuration_input_gui["calculation_type"]
+            
+            if calculation_type != "":
+                configuration_attribute.set_calculation_type(calculation_type)
+                
+            for saved_states_connection in saved_states_configuration_input_gui["connections"]:
+                start_configuration_attribute_gui = mapping_configuration_attribute_gui[saved_states_connection["start_block"]]
+                is_internal = start_configuration_attribute_gui["configuration_class_gui"] is attached_configuration_attribute_gui["configuration_class_gui"] and \
+                              not saved_states_connection["is_external"]
+                              
+                configuration_attribute.add_input_configuration_attribute(start_configuration_attribute_gui["configuration_attribute"], is_internal)
+                
+        return mapping_configuration_class
+        
+    def restore_setup_view(self, file_path, view_name, mapping_configuration_class, linked_groups_per_number):
+        """
+        Restores the setup classes of a saved setup view, including the directional connections between them
+        """
+        try:
+            with open(os.path.join(self.__saves_path, file_path), "rb") as file_pickle:
+                grid_offset, is_excluded, saved_states_setup_classes_gui, saved_states_connections_with_blocks = pickle.load(file_pickle)
+        except FileNotFoundError as e:
+            print(f"Could not find setup view {file_path}: {e}")
+            return
+            
+        setup_view = HeadlessSetupView(view_name, is_excluded)
+        
+        for saved_states_setup_class_gui in saved_states_setup_classes_gui:
+            linked_group_number = saved_states_setup_class_gui["linked_group_number"]
+            
+            # Linked copies share the same setup class
+            if linked_group_number != None and linked_group_number in linked_groups_per_number:
+                setup_class = linked_groups_per_number[linked_group_number]
+            else:
+                setup_class = mapping_configuration_class[saved_states_setup_class_gui["configuration_class_gui"]].create_setup_version()
+                
+                if linked_group_number != None:
+                    linked_groups_per_number[linked_group_number] = setup_class
+                    
+            setup_class.set_instance_name(saved_states_setup_class_gui["name"])
+            
+            setup_class_gui = HeadlessSetupClass(self, \
+                                                 setup_view, \
+                                                 setup_class, \
+                                                 saved_states_setup_class_gui["x"], \
+                                                 saved_states_setup_class_gui["y"], \
+                                                 [saved_states_setup_attribute_gui["value"] for saved_states_setup_attribute_gui in saved_states_setup_class_gui["setup_attributes_gui"]], \
+                                                 linked_group_number)
+                                                 
+            setup_view.add_setup_class_gui(setup_class_gui)
+            self.__name_index.add(setup_view, setup_class_gui)
+            
+            if linked_group_number != None:
+                self.__linked_setup_groups_per_number.setdefault(linked_group_number, []).append(setup_class_gui)
+                
+        self.__setup_views.append(setup_view)
+        
+        # Connections in excluded setup views are not used for calculations
+        if is_excluded:
+            return
+            
+        for saved_states_connection_with_blocks in saved_states_connections_with_blocks:
+            start_setup_class = self.get_adjacent_setup_class(setup_view.get_setup_classes_gui(), saved_states_connection_with_blocks["start_block"])
+            end_setup_class = self.get_adjacent_setup_class(setup_view.get_setup_classes_gui(), saved_states_connection_with_blocks["end_block"])
+            
+            # Redundant connections, where another already exists between the same two setup classes, are not kept
+            if start_setup_class == None or end_setup_class == None or start_setup_class in end_setup_class.get_input_setup_classes():
+                continue
+                
+            end_setup_class.set_input_setup_class(start_setup_class, saved_states_connection_with_blocks["input_scalars"])
+            
+    def get_adjacent_setup_class(self, setup_classes_gui, saved_states_block):
+        """
+        Returns the setup class that a triangle block of a directional connection is attached to, None if not attached to any
+        """
+        coordinate = (saved_states_block["x"], saved_states_block["y"])
+        setup_width = CLASS_WIDTH + SETUP_WIDTH_ADDITION
+        
+        for setup_class_gui in setup_classes_gui:
+            height = CLASS_HEIGHT + len(setup_class_gui.get_setup_attributes_gui()) * ATTRIBUTE_HEIGHT
+            
+            # The class together with its attributes, in the same way as GUISetupClass.is_adjacent
+            if get_adjacent_direction([coordinate], setup_class_gui.get_x(), setup_class_gui.get_y(), setup_width, height, includes_up_and_down=True) != "":
+                return setup_class_gui.get_setup_class()
+                
+        return None
+        
+    def add_saved_values_to_attributes(self):
+        """
+        Sets the value of setup attributes taking manual input to their saved value, rounded as when shown in a manual entry field
+        """
+        for setup_view in self.__setup_views:
+            if not setup_view.is_excluded():
+                for setup_class_gui in setup_view.get_setup_classes_gui():
+                    for setup_attribute_gui, saved_value in zip(setup_class_gui.get_setup_attributes_gui(), setup_class_gui.get_saved_values()):
+                        setup_attribute = setup_attribute_gui.get_setup_attribute()
+                        
+                        if setup_attribute.takes_manual_input():
+                            text = convert_value_to_string(saved_value)
+                            
+                            if text == None:
+                                text = "ERROR"
+                                
+                            setup_attribute.set_value(convert_string_to_value(text))
+                            
+    def get_setup_classes(self):
+        """
+        Returns all setup classes in setup views not excluded from calculations, where linked copies only are included once
+        """
+        setup_classes = []
+        seen_setup_classes = set()
+        
+        for setup_view in self.__setup_views:
+            if not setup_view.is_excluded():
+                for setup_class_gui in setup_view.get_setup_classes_gui():
+                    setup_class = setup_class_gui.get_setup_class()
+                    
+                    if setup_class not in seen_setup_classes:
+                        setup_classes.append(setup_class)
+                        seen_setup_classes.add(setup_class)
+                        
+        return setup_classes
+        
+    def calculate_values(self):
+        """
+        Calculates the values of setup attributes, only recalculating those affected by values changed since the last calculation
+        """
+        # Only the warnings of this calculation are kept
+        diagnostics.clear()
+        
+        evaluation_plan = self.get_evaluation_plan()
+        
+        # Later calculations only recalculate what changed, so the cached values are only needed the first time
+        if not self.__has_calculated:
+            self.__result_cache.apply(evaluation_plan)
+            self.__has_calculated = True
+            
+        return evaluation_plan.evaluate()
+        
+    def get_evaluation_plan(self):
+        """
+        Returns the plan for calculating the setup attributes of all setup views not excluded from calculations, rebuilding it if the setup has changed since it was last built
+        """
+        setup_classes = self.get_setup_classes()
+        
+        if self.__evaluation_plan == None or self.__evaluation_plan.is_outdated() or setup_classes != self.__evaluation_plan_setup_classes:
+            setup_attributes = [setup_attribute for setup_class in setup_classes for setup_attribute in setup_class.get_setup_attributes()]
+            
+            self.__evaluation_plan = EvaluationPlan(setup_attributes)
+            self.__evaluation_plan_setup_classes = setup_classes
+            
+        return self.__evaluation_plan
+        
+    def reset_script_changes(self):
+        """
+        Resets any changes or additions made by scripts to all setup views
+        """
+        for setup_view in self.__setup_views:
+            for setup_class_gui in setup_view.get_setup_classes_gui():
+                setup_class_gui.reset_changes_by_scripts()
+                
+        self.calculate_values()
+        
+    def get_setup_views(self):
+        return self.__setup_views
+        
+    def get_current_view(self):
+        """
+        Returns None, as no view is shown
+        """
+        return None
+        
+    def get_name_index(self):
+        return self.__name_index
+        
+    def get_generation(self):
+        """
+        Returns a value that changes whenever classes, names, connections or views change, where only connections can change without a GUI
+        """
+        return (0, get_structure_version())
+        
+    def get_linked_setup_classes_gui(self, setup_class_gui):
+        """
+        Returns a list of all headless setup classes that are linked copies of the specified one
+        """
+        linked_group_number = setup_class_gui.get_linked_group_number()
+        
+        if linked_group_number == None:
+            return []
+            
+        return [linked_setup_class_gui for linked_setup_class_gui in self.__linked_setup_groups_per_number[linked_group_number] if linked_setup_class_gui is not setup_class_gui]
+        
+    def get_linked_setup_attributes_gui(self, setup_attribute_gui):
+        """
+        Returns a list of all headless setup attributes that are linked copies of the specified one
+        """
+        setup_class_gui = setup_attribute_gui.get_setup_class_gui()
+        attribute_index = setup_class_gui.get_setup_attributes_gui().index(setup_attribute_gui)
+        
+        return [linked_setup_class_gui.get_setup_attributes_gui()[attribute_index] for linked_setup_class_gui in self.get_linked_setup_classes_gui(setup_class_gui)]
+        
+    def get_script_markers(self):
+        """
+        Returns a list with a dictionary per marker added by scripts, containing the names identifying the marked class instance together with the value and color of the marker
+        """
+        script_markers = []
+        
+        for setup_view in self.__setup_views:
+            for setup_class_gui in setup_view.get_setup_classes_gui():
+                for value, color in setup_class_gui.get_script_markers():
+                    script_markers.append({"view": setup_view.get_name(), \
+                                           "class_type": setup_class_gui.get_configuration_name(), \
+                                           "class_instance": setup_class_gui.get_name(), \
+                                           "value": value, \
+                                           "color": color})
+                                           
+        return script_markers
+        
+    def get_results(self):
+        """
+        Returns a list with a dictionary per shown setup attribute in the setup views not excluded from calculations, containing the names identifying it and its displayed value, which is the override value if set by a script
+        """
+        results = []
+        
+        for setup_view in self.__setup_views:
+            if not setup_view.is_excluded():
+                for setup_class_gui in setup_view.get_setup_classes_gui():
+                    setup_class = setup_class_gui.get_setup_class()
+                    
+                    for setup_attribute_gui in setup_class_gui.get_setup_attributes_gui():
+                        setup_attribute = setup_attribute_gui.get_setup_attribute()
+                        value = setup_attribute.get_current_value()
+                        
+                        if value != None:
+                            value = [float(element) if isinstance(element, (float, np.floating)) else element for element in value]
+                            
+                        results.append({"view": setup_view.get_name(), \
+                                        "class_type": setup_class.get_configuration_name(), \
+                                        "class_instance": setup_class.get_instance_name(), \
+                                        "attribute": setup_attribute.get_name(), \
+                                        "value": value})
+                                        
+        return results
+        
+    def save_results(self, file_path):
+        """
+        Writes the results of the last calculation to a JSON file
+        """
+        with open(file_path, "w") as file_results:
+            json.dump(self.get_results(), file_results, indent=4)
+            
+class HeadlessSetupView:
+    """
+    Setup view of a restored save, keeping its headless setup classes in the order they were saved
+    """
+    def __init__(self, name, is_excluded):
+        self.__name = name
+        self.__is_excluded = is_excluded
+        self.__setup_classes_gui = []
+        
+    def get_name(self):
+        return self.__name
+        
+    def is_excluded(self):
+        return self.__is_excluded
+        
+    def add_setup_class_gui(self, setup_class_gui):
+        self.__setup_classes_gui.append(setup_class_gui)
+        
+    def get_setup_classes_gui(self):
+        return self.__setup_classes_gui
+        
+class HeadlessSetupClass:
+    """
+    Stands in for a GUI setup class, keeping its grid position and saved values, where markers added by scripts are recorded rather than drawn
+    """
+    def __init__(self, headless_model, setup_view, setup_class, x, y, saved_values, linked_group_number):
+        self.__headless_model = headless_model
+        self.__setup_view = setup_view
+        self.__setup_class = setup_class
+        self.__x = x
+        self.__y = y
+        self.__saved_values = saved_values # Saved value of each shown setup attribute
+        self.__linked_group_number = linked_group_number
+        self.__setup_attributes_gui = [HeadlessSetupAttribute(self, setup_attribute) for setup_attribute in setup_class.get_setup_attributes() if not setup_attribute.is_hidden()]
+        self.__script_markers = [] # Tuples (value, color)
+        
+    def get_view(self):
+        return self.__setup_view
+        
+    def get_setup_class(self):
+        return self.__setup_class
+        
+    def get_name(self):
+        return self.__setup_class.get_instance_name()
+        
+    def get_configuration_name(self):
+        return self.__setup_class.get_configuration_name()
+        
+    def get_x(self):
+        return self.__x
+        
+    def get_y(self):
+        return self.__y
+        
+    def get_saved_values(self):
+        return self.__saved_values
+        
+    def get_linked_group_number(self):
+        return self.__linked_group_number
+        
+    def get_setup_attributes_gui(self):
+        return self.__setup_attributes_gui
+        
+    def create_script_marker_indicator(self, text, color, update_linked=True):
+        self.__script_markers.append((text, color))
+        
+        # Add to linked copies
+        if update_linked:
+            for linked_setup_class_gui in self.__headless_model.get_linked_setup_classes_gui(self):
+                linked_setup_class_gui.create_script_marker_indicator(text, color, False)
+                
+    def get_script_markers(self):
+        return self.__script_markers
+        
+    def reset_changes_by_scripts(self):
+        for setup_attribute_gui in self.__setup_attributes_gui:
+            setup_attribute_gui.attempt_to_reset_override_value()
+            
+        self.__script_markers = []
+        
+class HeadlessSetupAttribute:
+    """
+    Stands in for a GUI setup attribute, where nothing needs to be displayed when its value changes
+    """
+    def __init__(self, setup_class_gui, setup_attribute):
+        self.__setup_class_gui = setup_class_gui
+        self.__setup_attribute = setup_attribute
+        
+    def get_setup_class_gui(self):
+        return self.__setup_class_gui
+        
+    def get_setup_attribute(self):
+        return self.__setup_attribute
+        
+    def get_name(self):
+        return self.__setup_attribute.get_name()
+        
+    def attempt_to_reset_override_value(self):
+        """
+        Remove the override value if it exists
+        """
+        if self.__setup_attribute.has_override_value():
+            self.__setup_attribute.reset_override_value()
+            return True
+            
+        return False
+        
+    def update_value_input_type(self, clear_value=True):
+        pass
+        
+    def display_calculated_value(self):
+        pass
@@ -1,12 +1,16 @@
 import numpy as np
-import tkinter.font as tkfont
+from attribute_value import AttributeValue
 
 def convert_value_to_string(value):
     """
-    Takes a NumPy array or list as input and converts it to a string
+    Takes a tuple or an AttributeValue as input and converts it to a string
     """
     from config import DECIMALS_WHEN_ROUNDING
     
+    # Attribute values are only converted where they are displayed
+    if isinstance(value, AttributeValue):
+        value = value.to_tuple()
+        
     if not isinstance(value, tuple):
         print(f"Error: Could not convert {value} to string, as it was not a tuple")
         return None
@@ -171,6 +175,41 @@ def convert_direction_to_vector(direction):
         
     print(f"Error: Did not recognize direction {direction}")
     
+def is_close_grid_coordinate(grid_coordinate, other_grid_coordinate):
+    """
+    Returns whether two grid coordinates are considered the same
+    """
+    return np.linalg.norm(np.array(grid_coordinate) - np.array(other_grid_coordinate)) < 0.5
+    
+def get_adjacent_direction(grid_coordinates, grid_x, grid_y, width, height, *, includes_up_and_down=False):
+    """
+    grid_coordinates: List of grid coordinates to check
+    grid_x, grid_y: Grid coordinate of the top left corner of the block
+    width, height: Size of the block in the grid
+    includes_up_and_down: Whether coordinates directly above or below the block also are adjacent, otherwise only coordinates to the left or right
+    
+    Returns the direction going out from the block towards the first grid coordinate adjacent to the block, or "" if none is adjacent
+    Shared by the GUI blocks and by the headless model, so that blocks are attached in the same way whether or not the GUI is used
+    """
+    if includes_up_and_down:
+        for grid_coordinate in grid_coordinates:
+            for i in range(width):
+                if is_close_grid_coordinate(grid_coordinate, (grid_x + i, grid_y - 1)):
+                    return "UP"
+                    
+                if is_close_grid_coordinate(grid_coordinate, (grid_x + i, grid_y + height)):
+                    return "DOWN"
+                    
+    for grid_coordinate in grid_coordinates:
+        for i in range(height):
+            if is_close_grid_coordinate(grid_coordinate, (grid_x - 1, grid_y + i)):
+                return "LEFT"
+                
+            elif is_close_grid_coordinate(grid_coordinate, (grid_x + width, grid_y + i)):
+                return "RIGHT"
+                
+    return ""
+    
 def get_font(length_unit, *, canvas_and_label=None, has_line_break=False):
     """
     canvas_and_label: Tuple (canvas, label)
@@ -211,6 +250,7 @@ def get_text_that_fits(canvas, label, text, text_width, is_bold, length_unit):
     """
     Returns the text and its corresponding font required for the specified text to fit within the specified grid text width
     """
+    import tkinter.font as tkfont # Imported here so that calculations can run without tkinter
     from config import OUTLINE_WIDTH
     
     actual_maximum_text_width = convert_grid_coordinate_to_actual(text_width, 0, length_unit)[0] - 2 * OUTLINE_WIDTH
@@ -4,6 +4,10 @@ from setup_view import SetupView
 from setup_attribute_gui import GUISetupAttribute
 from connection_gui import GUIConnection
 from helper_functions_general import delete_all
+from evaluation_plan import EvaluationPlan, get_structure_version
+from result_cache import ResultCache, get_result_cache_path
+from name_index import NameIndex
+from diagnostics import diagnostics, DUPLICATE_INSTANCE_NAME
 from config import *
 
 class Model:
@@ -21,6 +25,13 @@ class Model:
         self.__linked_configuration_groups_per_number = {}
         self.__linked_setup_groups_per_number = {}
         
+        self.__evaluation_plan = None # Reused between calculations as long as the setup does not change
+        self.__evaluation_plan_setup_classes = [] # Setup classes that the evaluation plan was built from
+        self.__result_cache = ResultCache(get_result_cache_path(SAVES_PATH)) # Values calculated in the session that saved, applied before the first calculation
+        self.__has_calculated = False
+        self.__generation = 0 # Incremented whenever classes, names or views change, so that cached lookups of them can tell that they are outdated
+        self.__name_index = NameIndex() # Setup classes of each setup view by class type and class instance name
+        
         self.__root.title("Canvas")
         self.__root.geometry(f"{settings.get_canvas_width()}x{settings.get_canvas_height()}")
         self.__root.rowconfigure(0, weight=1)
@@ -320,6 +331,7 @@ class Model:
                 view.move_change_view_button(views_to_consider_moving[view_to_swap_with_index], not move_up)
                 
             views_to_consider_moving[view_index], views_to_consider_moving[view_to_swap_with_index] = views_to_consider_moving[view_to_swap_with_index], views_to_consider_moving[view_index]
+            self.mark_changed()
             
     def update_add_to_setup_button_order(self):
         for setup_view in self.__setup_views:
@@ -366,6 +378,7 @@ class Model:
                         seen_configuration_classes.add(configuration_class_gui.get_configuration_class())
                         
         self.change_view(self.__current_view)
+        self.mark_changed()
         
         return new_view
         
@@ -379,6 +392,8 @@ class Model:
             return
             
         view_to_delete.delete()
+        self.__name_index.remove_view(view_to_delete)
+        self.mark_changed()
         
         # Remove button to change to the deleted view from all other views
         for view in self.__configuration_views + self.__setup_views:
@@ -415,6 +430,21 @@ class Model:
     def get_current_view(self):
         return self.__current_view
         
+    def mark_changed(self):
+        """
+        Marks that classes, names or views have changed, so that cached lookups of them are made again
+        """
+        self.__generation += 1
+        
+    def get_name_index(self):
+        return self.__name_index
+        
+    def get_generation(self):
+        """
+        Returns a value that changes whenever classes, names, connections or views change, where connections are tracked by the structure version of the calculation blocks
+        """
+        return (self.__generation, get_structure_version())
+        
     def change_view(self, view):
         """
         Moves the specified view to the top of all views so that it is shown
@@ -448,16 +478,20 @@ class Model:
         
     def calculate_values(self):
         """
-        Calculates the values of setup attributes
+        Calculates the values of setup attributes, only recalculating those affected by values changed since the last calculation
         """
         seen_instances = {} # Key: Instance name, Value: List of GUI setup classes
         seen_linked_groups = set()
         
-        # Reset all values that do not have a manual entry field
+        # Only the warnings of this calculation are kept
+        diagnostics.clear()
+        diagnostics.set_verbose(settings.uses_verbose_warnings())
+        
+        # Update the values of all attributes with a manual entry field, marking those that changed to be recalculated
         for setup_view in self.__setup_views:
             for setup_class_gui in setup_view.get_setup_classes_gui():
                 if not setup_view.is_excluded():
-                    setup_class_gui.reset_calculated_values()
+                    setup_class_gui.add_entered_values_to_attributes()
                     
                 # Used for finding duplicate names
                 if settings.warns_duplicate_names():
@@ -475,9 +509,9 @@ class Model:
                             
         for instance_name, setup_classes_gui in seen_instances.items():
             if len(setup_classes_gui) > 1:
-                print(f"Warning: Found duplicate of class instance name {instance_name} for class type {setup_classes_gui[0].get_configuration_name()} (not a problem, but might cause confusion)")
-                print("\tYou can turn off this warning in the settings")
-                print("\tFound duplicates in the following views:")
+                message = f"Warning: Found duplicate of class instance name {instance_name} for class type {setup_classes_gui[0].get_configuration_name()} (not a problem, but might cause confusion)"
+                message += "\n\tYou can turn off this warning in the settings"
+                message += "\n\tFound duplicates in the following views:"
                 
                 for setup_class_gui in setup_classes_gui:
                     text_linked_group = ""
@@ -485,14 +519,52 @@ class Model:
                     if setup_class_gui.get_linked_group_number() != None:
                         text_linked_group = f" (linked number identifier {setup_class_gui.get_linked_group_number()})"
                         
-                    print(f"\t\t{setup_class_gui.get_view().get_name()}{text_linked_group}")
+                    message += f"\n\t\t{setup_class_gui.get_view().get_name()}{text_linked_group}"
                     
-        # Calculates the values of any attribute that had its value reset
+                diagnostics.add_record((DUPLICATE_INSTANCE_NAME, message, setup_classes_gui[0].get_configuration_name(), instance_name, None), 1)
+                
+        evaluation_plan = self.get_evaluation_plan()
+        updated_setup_attributes = set()
+        
+        # Later calculations only recalculate what changed, so the cached values are only needed the first time
+        if not self.__has_calculated:
+            updated_setup_attributes.update(self.__result_cache.apply(evaluation_plan))
+            self.__has_calculated = True
+            
+        # Calculates the values of any attribute whose value is missing or depends on a changed value
+        updated_setup_attributes.update(evaluation_plan.evaluate())
+        
         for setup_view in self.__setup_views:
             for setup_class_gui in setup_view.get_setup_classes_gui():
                 if not setup_view.is_excluded():
-                    setup_class_gui.calculate_values()
+                    setup_class_gui.display_calculated_values(updated_setup_attributes)
+                    
+        diagnostics.print_summary()
+        
+    def get_evaluation_plan(self):
+        """
+        Returns the plan for calculating the setup attributes of all setup views not excluded from calculations, rebuilding it if the setup has changed since it was last built
+        """
+        setup_classes = []
+        seen_setup_classes = set() # Linked copies share the same setup class
+        
+        for setup_view in self.__setup_views:
+            if not setup_view.is_excluded():
+                for setup_class_gui in setup_view.get_setup_classes_gui():
+                    setup_class = setup_class_gui.get_setup_class()
                     
+                    if setup_class not in seen_setup_classes:
+                        setup_classes.append(setup_class)
+                        seen_setup_classes.add(setup_class)
+                        
+        if self.__evaluation_plan == None or self.__evaluation_plan.is_outdated() or setup_classes != self.__evaluation_plan_setup_classes:
+            setup_attributes = [setup_attribute for setup_class in setup_classes for setup_attribute in setup_class.get_setup_attributes()]
+            
+            self.__evaluation_plan = EvaluationPlan(setup_attributes)
+            self.__evaluation_plan_setup_classes = setup_classes
+            
+        return self.__evaluation_plan
+        
     """
     def get_setup_view_names(self):
         return [view.get_name() for view in self.__setup_views]
@@ -543,4 +615,7 @@ class Model:
                 file_path = setup_view.save()
                 file_with_paths.write(f"{file_path}\n")
                 
+        self.__result_cache.update(self.get_evaluation_plan())
+        self.__result_cache.save()
+        
         settings.save()
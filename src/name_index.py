@@ -0,0 +1,84 @@
+class NameIndex:
+    """
+    Hash indexes of the setup classes in each setup view by class type and class instance name, so that finding classes by name does not scan all views and classes
+    The indexes are updated when setup classes are added to or removed from a view and when their names change
+    
+    Setup classes are given an increasing number when added, which is kept when they are renamed, so that classes are found in the same order as they appear in their view
+    """
+    def __init__(self):
+        self.__setup_classes_per_view = {} # Key: Setup view, Value: Dictionary (Key: Tuple (class type, class instance) where either may be None to match all, Value: Dictionary (Key: Setup class, Value: Number))
+        self.__keys_per_setup_class = {} # Key: Setup class, Value: Tuple (setup view, number, class type, class instance) used when it was indexed
+        self.__unsorted_keys = set() # Tuples (setup view, class type, class instance) whose setup classes might not be in the order of their numbers
+        self.__next_number = 0
+        
+    def add(self, setup_view, setup_class):
+        """
+        setup_class: Any object with get_configuration_name and get_name, such as a GUI setup class
+        """
+        self.add_with_number(setup_view, setup_class, self.__next_number)
+        self.__next_number += 1
+        
+    def add_with_number(self, setup_view, setup_class, number):
+        class_type = setup_class.get_configuration_name()
+        class_instance = setup_class.get_name()
+        index = self.__setup_classes_per_view.setdefault(setup_view, {})
+        
+        for key in ((None, None), (class_type, None), (None, class_instance), (class_type, class_instance)):
+            index.setdefault(key, {})[setup_class] = number
+            
+            # Classes added earlier than the last one are sorted when next found
+            if number != self.__next_number:
+                self.__unsorted_keys.add((setup_view,) + key)
+                
+        self.__keys_per_setup_class[setup_class] = (setup_view, number, class_type, class_instance)
+        
+    def remove(self, setup_class):
+        """
+        Removes a setup class from the indexes, returning the number it was indexed with, or None if it was not indexed
+        """
+        if setup_class not in self.__keys_per_setup_class:
+            return None
+            
+        setup_view, number, class_type, class_instance = self.__keys_per_setup_class.pop(setup_class)
+        index = self.__setup_classes_per_view[setup_view]
+        
+        for key in ((None, None), (class_type, None), (None, class_instance), (class_type, class_instance)):
+            number_per_setup_class = index[key]
+            number_per_setup_class.pop(setup_class)
+            
+            if len(number_per_setup_class) == 0:
+                index.pop(key)
+                
+        return number
+        
+    def update_names(self, setup_class):
+        """
+        Indexes a setup class again after its class type or class instance name changed, keeping its place in the order of its view
+        """
+        if setup_class not in self.__keys_per_setup_class:
+            return
+            
+        setup_view, _, class_type, class_instance = self.__keys_per_setup_class[setup_class]
+        
+        if (class_type, class_instance) != (setup_class.get_configuration_name(), setup_class.get_name()):
+            self.add_with_number(setup_view, setup_class, self.remove(setup_class))
+            
+    def remove_view(self, setup_view):
+        for setup_class in self.__setup_classes_per_view.pop(setup_view, {}).get((None, None), {}):
+            self.__keys_per_setup_class.pop(setup_class, None)
+            
+    def get_setup_classes(self, setup_view, class_type, class_instance):
+        """
+        Returns a list of the setup classes in a setup view matching the class type and class instance name, where None matches all, in the order they were added
+        """
+        index = self.__setup_classes_per_view.get(setup_view, {})
+        key = (class_type, class_instance)
+        
+        if key not in index:
+            return []
+            
+        if (setup_view,) + key in self.__unsorted_keys:
+            index[key] = dict(sorted(index[key].items(), key=lambda item: item[1]))
+            self.__unsorted_keys.discard((setup_view,) + key)
+            
+        return list(index[key])
@@ -4,6 +4,8 @@ from buttons_gui import TouchButton, RadioButton, ToggleButton
 from helper_functions_general import convert_value_to_string, convert_string_to_value, convert_grid_coordinate_to_actual, convert_actual_coordinate_to_grid, get_font, delete_all
 from default_coordinate_functions import get_options_coordinate
 from pressable_entry import PressableEntry
+from sampler import SAMPLING_STRATEGIES
+from diagnostics import diagnostics
 from config import *
 
 class Options:
@@ -78,14 +80,82 @@ class Options:
         """
         Options for general settings to the program
         """
-        options = Options(model, view, 2, 2, "General settings")
+        options = Options(model, view, 6, 6, "General settings")
         
         entry_text = tk.StringVar()
         options.add_entry(0, 0, "Number of samples when sampling distributions:", settings.get_num_samples(), lambda: set_num_samples(entry_text.get()), entry_text)
         
-        options.add_label(0, 1, "Warn for duplicate class instance names:")
-        options.add_toggle_button(1, 1, "Print warnings", settings.warns_duplicate_names(), lambda: settings.set_warn_duplicate_names(True), lambda: settings.set_warn_duplicate_names(False))
+        options.add_label(0, 1, "Sampling strategy:")
+        initial_radio_button = None
+        
+        for i, sampling_strategy in enumerate(SAMPLING_STRATEGIES):
+            is_selected = sampling_strategy == settings.get_sampling_strategy()
+            
+            if i == 0:
+                initial_radio_button = options.add_radio_button(1, 1, sampling_strategy, is_selected, lambda sampling_strategy=sampling_strategy: settings.set_sampling_strategy(sampling_strategy))
+            else:
+                options.add_linked_radio_button(initial_radio_button, sampling_strategy, is_selected, lambda sampling_strategy=sampling_strategy: settings.set_sampling_strategy(sampling_strategy))
+                
+        entry_text_seed = tk.StringVar()
+        options.add_entry(0, 2, "Seed when sampling distributions:", settings.get_seed(), lambda: set_seed(entry_text_seed.get()), entry_text_seed)
+        
+        options.add_label(0, 3, "Stop sampling when precise enough:")
+        options.add_toggle_button(1, 3, "Adaptive sampling", settings.uses_adaptive_sampling(), lambda: settings.set_adaptive_sampling(True), lambda: settings.set_adaptive_sampling(False))
+        
+        entry_text_tolerance = tk.StringVar()
+        options.add_entry(0, 4, "Standard error to stop sampling at:", settings.get_sampling_tolerance(), lambda: set_sampling_tolerance(entry_text_tolerance.get()), entry_text_tolerance)
+        
+        entry_text_min_samples = tk.StringVar()
+        options.add_entry(0, 5, "Minimum samples when adaptive:", settings.get_min_samples(), lambda: set_min_samples(entry_text_min_samples.get()), entry_text_min_samples)
+        
+        entry_text_num_processes = tk.StringVar()
+        options.add_entry(2, 0, "Processes used when calculating:", settings.get_num_processes(), lambda: set_num_processes(entry_text_num_processes.get()), entry_text_num_processes)
+        
+        options.add_label(2, 2, "Warn for duplicate class instance names:")
+        options.add_toggle_button(3, 2, "Print warnings", settings.warns_duplicate_names(), lambda: settings.set_warn_duplicate_names(True), lambda: settings.set_warn_duplicate_names(False))
+        
+        options.add_label(2, 3, "Calculate attributes of the same type together:")
+        options.add_toggle_button(3, 3, "Batch calculations", settings.uses_batch_calculations(), lambda: settings.set_batch_calculations(True), lambda: settings.set_batch_calculations(False))
+        
+        options.add_label(2, 4, "Propagate samples of triangle distributions:")
+        options.add_toggle_button(3, 4, "Monte Carlo", settings.uses_monte_carlo(), lambda: settings.set_monte_carlo(True), lambda: settings.set_monte_carlo(False))
+        
+        options.add_label(2, 5, "Compare two triangle distributions:")
+        options.add_toggle_button(3, 5, "Exact comparison", settings.uses_exact_triangle_comparison(), lambda: settings.set_exact_triangle_comparison(True), lambda: settings.set_exact_triangle_comparison(False))
+        
+        options.add_label(4, 2, "Print warnings when found:")
+        options.add_toggle_button(5, 2, "Verbose warnings", settings.uses_verbose_warnings(), lambda: settings.set_verbose_warnings(True), lambda: settings.set_verbose_warnings(False))
+        
+        options.add_label(4, 3, "Warnings from the last calculation:")
+        options.add_button(5, 3, "Show warnings", lambda: Options.warnings(model, view))
+        
+    @staticmethod
+    def warnings(model, view):
+        """
+        Shows the most frequent warnings found by the last calculation
+        """
+        records = diagnostics.get_records()[:OPTIONS_MAX_SHOWN_WARNINGS]
+        
+        options = Options(model, view, 1+max(1, len(records)), 4, "Warnings")
         
+        for column, text in enumerate(["Times found", "Kind", "Found in", "Message"]):
+            options.add_label(0, column, text)
+            
+        if len(records) == 0:
+            options.add_label(1, 0, "No warnings", color=OPTIONS_BUTTON_COLOR)
+            
+        for row, record in enumerate(records, start=1):
+            location = " / ".join(name for name in (record["class_type"], record["class_instance"], record["attribute"]) if name != None)
+            message = record["message"].split("\n")[0] # Only the first line, as the rest are details
+            
+            if message.startswith("Warning: "):
+                message = message[len("Warning: "):]
+                
+            options.add_label(row, 0, str(record["count"]), color=OPTIONS_BUTTON_COLOR)
+            options.add_label(row, 1, record["code"], color=OPTIONS_BUTTON_COLOR)
+            options.add_label(row, 2, location, color=OPTIONS_BUTTON_COLOR)
+            options.add_label(row, 3, message, color=OPTIONS_BUTTON_COLOR)
+            
     @staticmethod
     def configuration_class(model, view, configuration_class_gui, configuration_views):
         """
@@ -313,3 +383,27 @@ def set_num_samples(num_samples_string):
         settings.set_num_samples(abs(int(num_samples_string)))
     except:
         settings.set_num_samples(1)
+        
+def set_seed(seed_string):
+    try:
+        settings.set_seed(abs(int(seed_string)))
+    except:
+        settings.set_seed(0)
+        
+def set_sampling_tolerance(sampling_tolerance_string):
+    try:
+        settings.set_sampling_tolerance(abs(float(sampling_tolerance_string)))
+    except:
+        settings.set_sampling_tolerance(0.002)
+        
+def set_min_samples(min_samples_string):
+    try:
+        settings.set_min_samples(max(1, abs(int(min_samples_string))))
+    except:
+        settings.set_min_samples(500)
+        
+def set_num_processes(num_processes_string):
+    try:
+        settings.set_num_processes(max(1, abs(int(num_processes_string))))
+    except:
+        settings.set_num_processes(1)
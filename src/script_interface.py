@@ -1,5 +1,9 @@
+import contextlib
 import numpy as np
 from helper_functions_general import convert_value_to_string, convert_string_to_value
+from sensitivity_analysis import analyze_sensitivity
+from diagnostics import diagnostics
+from attribute_value_store import attribute_value_store
     
 class ScriptInterface:
     """
@@ -14,12 +18,18 @@ class ScriptInterface:
     def __init__(self, model):
         self.__model = model
         self.__script_helper = ScriptHelper(model)
+        self.__script_batch = None # Changes staged while in a batch, None if not in a batch
         
     def get_current_view_name(self):
         """
-        Returns the name of the current view
+        Returns the name of the current view, or None if no view is shown, such as when running without a GUI, which matches all views
         """
-        return self.__model.get_current_view().get_name()
+        current_view = self.__model.get_current_view()
+        
+        if current_view == None:
+            return None
+            
+        return current_view.get_name()
         
     def get_class_type_names(self, view=None):
         """
@@ -80,6 +90,58 @@ class ScriptInterface:
             
         return attributes_values
         
+    def get_attribute_sampling_errors(self, class_type, class_instance, attribute, view=None):
+        """
+        Returns a list of the standard errors of the specified setup attributes, where the error is None for values not estimated by sampling
+        """
+        self.__script_helper.check_type([class_type, class_instance, attribute, view], str)
+        sampling_errors = []
+        
+        for setup_attribute_gui in self.__script_helper.get_setup_attributes_gui(view, class_type, class_instance, attribute):
+            sampling_errors.append(setup_attribute_gui.get_setup_attribute().get_sampling_error())
+            
+        return sampling_errors
+        
+    def get_attribute_table(self, class_type, attributes=None, view=None):
+        """
+        Returns the displayed values of several attributes of all instances of a class type at once, which is faster than calling get_attribute_values for each of them
+        
+        attributes: List of attribute names to include, None including all attributes of the class type
+        
+        Returns a tuple (class_instances, values_per_attribute), where class_instances is a list of class instance names and values_per_attribute is a dictionary (Key: Attribute name, Value: NumPy array)
+        Each NumPy array has a row for each class instance in the same order as class_instances, holding the individual values, where values that are not numbers, such as text or missing values, are NaN
+        """
+        self.__script_helper.check_type([class_type, view], str)
+        
+        if attributes == None:
+            attributes = self.get_attribute_names(class_type)
+            
+        self.__script_helper.check_type([attributes], list)
+        self.__script_helper.check_type(attributes, str)
+        
+        setup_classes_gui = self.__script_helper.get_instances_setup_class_gui(view, class_type, None)
+        attribute_ids = np.full((len(setup_classes_gui), len(attributes)), -1) # Attribute id of each class instance and attribute, -1 if the class instance does not have the attribute
+        
+        for row, setup_class_gui in enumerate(setup_classes_gui):
+            attribute_id_per_name = {}
+            
+            # The first attribute found is used if several have the same name
+            for setup_attribute_gui in reversed(setup_class_gui.get_setup_attributes_gui()):
+                attribute_id_per_name[setup_attribute_gui.get_name()] = setup_attribute_gui.get_setup_attribute().get_attribute_id()
+                
+            attribute_ids[row] = [attribute_id_per_name.get(attribute, -1) for attribute in attributes]
+            
+        values_per_attribute = {}
+        
+        for column, attribute in enumerate(attributes):
+            has_attribute = attribute_ids[:, column] >= 0
+            numbers = attribute_value_store.get_current_numbers(attribute_ids[has_attribute, column])
+            
+            values_per_attribute[attribute] = np.full((len(setup_classes_gui), numbers.shape[1]), np.nan)
+            values_per_attribute[attribute][has_attribute] = numbers
+            
+        return [setup_class_gui.get_name() for setup_class_gui in setup_classes_gui], values_per_attribute
+        
     def convert_value_to_string(self, attribute_value):
         """
         Converts the specified tuple attribute value into a formatted string
@@ -98,8 +160,11 @@ class ScriptInterface:
         override_value = convert_string_to_value(str(override_value))
         
         for setup_attribute_gui in self.__script_helper.get_setup_attributes_gui(view, class_type, class_instance, attribute):
-            setup_attribute_gui.get_setup_attribute().set_override_value(override_value)
-            
+            if self.__script_batch != None:
+                self.__script_batch.add_override_value(setup_attribute_gui, override_value)
+            else:
+                setup_attribute_gui.get_setup_attribute().set_override_value(override_value)
+                
     def reset_override_attribute_values(self, *, class_type=None, class_instance=None, attribute=None, view=None):
         """
         Resets any override value of matching attributes
@@ -107,8 +172,68 @@ class ScriptInterface:
         self.__script_helper.check_type([class_type, class_instance, attribute, view], str)
         
         for setup_attribute_gui in self.__script_helper.get_setup_attributes_gui(view, class_type, class_instance, attribute):
-            setup_attribute_gui.attempt_to_reset_override_value()
+            if self.__script_batch != None:
+                self.__script_batch.add_override_value(setup_attribute_gui, None)
+            else:
+                setup_attribute_gui.attempt_to_reset_override_value()
+                
+    def calculate_scenario_values(self, scenarios, class_type, class_instance, attribute, view=None):
+        """
+        Calculates the values of the specified setup attributes in several scenarios at once, without changing the displayed values
+        
+        scenarios: List of scenarios, each a dictionary with override values, where each key is a tuple (class_type, class_instance, attribute) matching attributes in the same way as override_attribute_values
+        
+        Returns a list with a list of values for each scenario, in the same format as get_attribute_values
+        """
+        self.__script_helper.check_type([class_type, class_instance, attribute, view], str)
+        self.__script_helper.check_type([scenarios], list)
+        override_values_per_scenario = []
+        
+        for scenario in scenarios:
+            self.__script_helper.check_type([scenario], dict)
+            override_values = {}
+            
+            for (override_class_type, override_class_instance, override_attribute), override_value in scenario.items():
+                self.__script_helper.check_type([override_class_type, override_class_instance, override_attribute], str)
+                self.__script_helper.check_convert_to_type(override_value, str)
+                
+                override_value = convert_string_to_value(str(override_value))
+                
+                for setup_attribute_gui in self.__script_helper.get_setup_attributes_gui(view, override_class_type, override_class_instance, override_attribute):
+                    override_values[setup_attribute_gui.get_setup_attribute()] = override_value
+                    
+            override_values_per_scenario.append(override_values)
+            
+        setup_attributes = [setup_attribute_gui.get_setup_attribute() for setup_attribute_gui in self.__script_helper.get_setup_attributes_gui(view, class_type, class_instance, attribute)]
+        
+        # Entered values are added to the attributes before calculating the scenarios
+        self.__model.calculate_values()
+        scenario_values_per_attribute = self.__model.get_evaluation_plan().evaluate_scenarios(override_values_per_scenario, setup_attributes)
+        
+        return [[scenario_values.get_value(i) for scenario_values in scenario_values_per_attribute] for i in range(len(scenarios))]
+        
+    def get_sensitivities(self, class_type, class_instance, attribute, *, relative_change=0.1, view=None):
+        """
+        Finds how much each manually entered attribute that the specified attribute depends on affects its value, by decreasing and increasing each of them by the relative change
+        
+        Returns a list of tuples (input_class_type, input_class_instance, input_attribute, low_value, high_value, effect), sorted with the largest effect first
+        The effect is the difference between the means of the high and low values, or None if any of them could not be calculated
+        """
+        self.__script_helper.check_type([class_type, class_instance, attribute, view], str)
+        self.__script_helper.check_convert_to_type(relative_change, float)
+        
+        setup_attributes_gui = self.__script_helper.get_setup_attributes_gui(view, class_type, class_instance, attribute)
+        
+        if len(setup_attributes_gui) != 1:
+            raise ValueError(f"Expected one matching attribute, but found {len(setup_attributes_gui)}")
             
+        # Entered values are added to the attributes before changing them
+        self.__model.calculate_values()
+        sensitivities = analyze_sensitivity(self.__model.get_evaluation_plan(), setup_attributes_gui[0].get_setup_attribute(), float(relative_change))
+        
+        return [(setup_attribute.get_setup_class().get_configuration_name(), setup_attribute.get_setup_class().get_instance_name(), setup_attribute.get_name(), low_value, high_value, effect) \
+                for setup_attribute, low_value, high_value, effect in sensitivities]
+                
     def set_class_marker(self, value, color, *, class_type=None, class_instance=None, view=None):
         """
         Adds a visual marker on all matching class instances
@@ -117,33 +242,130 @@ class ScriptInterface:
         self.__script_helper.check_convert_to_type(value, str)
         
         for setup_class_gui in self.__script_helper.get_instances_setup_class_gui(view, class_type, class_instance):
-            setup_class_gui.create_script_marker_indicator(value, color)
-            
+            if self.__script_batch != None:
+                self.__script_batch.add_class_marker(setup_class_gui, value, color)
+            else:
+                setup_class_gui.create_script_marker_indicator(value, color)
+                
     def calculate_values(self):
         """
         Calculates all attribute values in the setup views based on the current configuration
         """
         self.__model.calculate_values()
         
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager where override values, resets of override values and markers are staged rather than applied, for use as: with script_if.batch(): ...
+        The staged changes are applied when leaving the context, followed by a single calculation of the affected values and a single update of what is displayed
+        Nothing is applied if an exception is raised within the context, and a batch within another batch is part of the outer batch
+        
+        Values read within the context do not include the staged changes
+        """
+        if self.__script_batch != None:
+            yield
+            return
+            
+        self.__script_batch = ScriptBatch()
+        
+        try:
+            yield
+            script_batch = self.__script_batch
+        finally:
+            self.__script_batch = None
+            
+        script_batch.apply(self.__model)
+        
+    def get_diagnostics(self):
+        """
+        Returns a list of dictionaries describing the distinct warnings found by the last calculation, with the most frequent first
+        Each dictionary has the keys code, message, class_type, class_instance, attribute and count, where names that do not apply are None
+        """
+        return diagnostics.get_records()
+        
     def reset_script_changes(self):
         """
         Reset any changes made by scripts, such as override values and markers
         """
         self.__model.reset_script_changes()
         
+class ScriptBatch:
+    """
+    Changes made by scripts that are staged until the end of a batch, where later changes to the same setup attribute replace earlier ones
+    """
+    def __init__(self):
+        self.__override_values = {} # Key: GUI setup attribute, Value: Override value as a tuple, None to reset the override value
+        self.__class_markers = [] # Tuples (GUI setup class, value, color)
+        
+    def add_override_value(self, setup_attribute_gui, override_value):
+        self.__override_values[setup_attribute_gui] = override_value
+        
+    def add_class_marker(self, setup_class_gui, value, color):
+        self.__class_markers.append((setup_class_gui, value, color))
+        
+    def apply(self, model):
+        """
+        Sets the staged override values of the setup attributes, calculates the values affected by them once and then displays them together with the staged markers
+        """
+        changed_setup_attributes_gui = []
+        
+        for setup_attribute_gui, override_value in self.__override_values.items():
+            setup_attribute = setup_attribute_gui.get_setup_attribute()
+            
+            if override_value == None:
+                if setup_attribute.has_override_value():
+                    setup_attribute.reset_override_value()
+                    
+                    # Attributes taking manual input get their entry field back
+                    for linked_setup_attribute_gui in [setup_attribute_gui] + model.get_linked_setup_attributes_gui(setup_attribute_gui):
+                        linked_setup_attribute_gui.update_value_input_type(False)
+                        changed_setup_attributes_gui.append(linked_setup_attribute_gui)
+                        
+            elif override_value != setup_attribute.get_override_value():
+                setup_attribute.set_override_value(override_value)
+                changed_setup_attributes_gui += [setup_attribute_gui] + model.get_linked_setup_attributes_gui(setup_attribute_gui)
+                
+        if len(changed_setup_attributes_gui) > 0:
+            model.calculate_values()
+            
+            # Calculating only displays the recalculated values, while changed override values are displayed here
+            for setup_attribute_gui in changed_setup_attributes_gui:
+                setup_attribute_gui.display_calculated_value()
+                
+        for setup_class_gui, value, color in self.__class_markers:
+            setup_class_gui.create_script_marker_indicator(value, color)
+            
 class ScriptHelper:
     def __init__(self, model):
         self.__model = model
-        self.__cache = {} # To improve performance when getting the same elements multiple times
+        self.__cache = {} # To improve performance when getting the same elements multiple times, Key: Tuple (lookup name, lookup arguments), Value: Found elements
+        self.__cache_generation = None # Generation of the model when the cached elements were found
         
     def get_from_cache(self, identifier):
-        if identifier in self.__cache:
-            return self.__cache[identifier]
+        """
+        Returns the cached elements of a lookup, or None if the lookup has not been made since classes, names, connections or views last changed
+        """
+        generation = self.__model.get_generation()
+        
+        # Anything found before the model changed might be outdated
+        if generation != self.__cache_generation:
+            self.__cache = {}
+            self.__cache_generation = generation
             
-        return None
+        return self.__cache.get(identifier)
+        
+    def add_to_cache(self, identifier, result):
+        """
+        Caches the elements found by a lookup, which should not be changed by the caller as the same elements are returned by later lookups
+        
+        Returns the found elements
+        """
+        self.__cache[identifier] = result
+        
+        return result
         
     def get_setup_views(self, view):
-        cache_result = self.get_from_cache(view)
+        cache_result = self.get_from_cache(("setup_views", view))
         
         if cache_result != None:
             return cache_result
@@ -155,57 +377,46 @@ class ScriptHelper:
                 if not setup_view.is_excluded():
                     setup_views.append(setup_view)
                     
-        return setup_views
+        return self.add_to_cache(("setup_views", view), setup_views)
         
     def get_setup_classes_gui(self, view, class_type):
-        cache_result = self.get_from_cache((view, class_type))
-        
-        if cache_result != None:
-            return cache_result
-            
-        setup_classes_gui = []
-        seen_setup_classes = set()
-        
-        for setup_view in self.get_setup_views(view):
-            for setup_class_gui in setup_view.get_setup_classes_gui():
-                if class_type in (None, setup_class_gui.get_configuration_name()):
-                    setup_class = setup_class_gui.get_setup_class()
-                    
-                    if not setup_class in seen_setup_classes:
-                        setup_classes_gui.append(setup_class_gui)
-                        seen_setup_classes.add(setup_class)
-                        
-        return setup_classes_gui
+        return self.get_instances_setup_class_gui(view, class_type, None)
         
     def get_first_setup_class_gui(self, class_type):
-        cache_result = self.get_from_cache(class_type)
+        cache_result = self.get_from_cache(("first_setup_class_gui", class_type))
         
         if cache_result != None:
             return cache_result
             
         for setup_view in self.get_setup_views(None):
-            for setup_class_gui in setup_view.get_setup_classes_gui():
-                if class_type in (None, setup_class_gui.get_configuration_name()):
-                    return setup_class_gui
-                    
+            setup_classes_gui = self.__model.get_name_index().get_setup_classes(setup_view, class_type, None)
+            
+            if len(setup_classes_gui) > 0:
+                return self.add_to_cache(("first_setup_class_gui", class_type), setup_classes_gui[0])
+                
         return None
         
     def get_instances_setup_class_gui(self, view, class_type, class_instance):
-        cache_result = self.get_from_cache((view, class_type, class_instance))
+        cache_result = self.get_from_cache(("instances_setup_class_gui", view, class_type, class_instance))
         
         if cache_result != None:
             return cache_result
             
         instance_setup_classes_gui = []
+        seen_setup_classes = set() # Linked copies share the same setup class
         
-        for setup_class_gui in self.get_setup_classes_gui(view, class_type):
-            if class_type in (None, setup_class_gui.get_configuration_name()) and class_instance in (None, setup_class_gui.get_name()):
-                instance_setup_classes_gui.append(setup_class_gui)
+        for setup_view in self.get_setup_views(view):
+            for setup_class_gui in self.__model.get_name_index().get_setup_classes(setup_view, class_type, class_instance):
+                setup_class = setup_class_gui.get_setup_class()
                 
-        return instance_setup_classes_gui
+                if not setup_class in seen_setup_classes:
+                    instance_setup_classes_gui.append(setup_class_gui)
+                    seen_setup_classes.add(setup_class)
+                    
+        return self.add_to_cache(("instances_setup_class_gui", view, class_type, class_instance), instance_setup_classes_gui)
         
     def get_setup_attributes_gui(self, view, class_type, class_instance, attribute):
-        cache_result = self.get_from_cache((view, class_type, class_instance, attribute))
+        cache_result = self.get_from_cache(("setup_attributes_gui", view, class_type, class_instance, attribute))
         
         if cache_result != None:
             return cache_result
@@ -213,12 +424,11 @@ class ScriptHelper:
         setup_attributes_gui = []
         
         for setup_class_gui in self.get_instances_setup_class_gui(view, class_type, class_instance):
-            if class_instance in (None, setup_class_gui.get_name()):
-                for setup_attribute_gui in setup_class_gui.get_setup_attributes_gui():
-                    if attribute in (None, setup_attribute_gui.get_name()):
-                        setup_attributes_gui.append(setup_attribute_gui)
-                        
-        return setup_attributes_gui
+            for setup_attribute_gui in setup_class_gui.get_setup_attributes_gui():
+                if attribute in (None, setup_attribute_gui.get_name()):
+                    setup_attributes_gui.append(setup_attribute_gui)
+                    
+        return self.add_to_cache(("setup_attributes_gui", view, class_type, class_instance, attribute), setup_attributes_gui)
         
     def check_type(self, list_to_check, type_to_check):
         """
@@ -102,6 +102,8 @@ class SetupView(View):
             setup_class_gui = GUISetupClass.new(self.get_model(), self, configuration_class_gui, position)
             
         self.__setup_classes_gui.append(setup_class_gui)
+        self.get_model().get_name_index().add(self, setup_class_gui)
+        self.get_model().mark_changed()
         
         return setup_class_gui
         
@@ -110,6 +112,8 @@ class SetupView(View):
         
     def remove_setup_class_gui(self, setup_class_gui):
         self.__setup_classes_gui.remove(setup_class_gui)
+        self.get_model().get_name_index().remove(setup_class_gui)
+        self.get_model().mark_changed()
         
     def get_movable_items(self):
         """
@@ -208,6 +212,7 @@ class SetupView(View):
             return
             
         self.__is_excluded = is_excluded
+        self.get_model().mark_changed()
         
         # Change background color
         if is_excluded:
@@ -179,6 +179,7 @@ class View(tk.Frame):
     def set_name(self, name):
         self.__name = name
         self.__model.set_text_change_view_buttons(self, name) # Need to update the text of the change view buttons in all views
+        self.__model.mark_changed()
         
     def get_canvas(self):
         return self.__canvas
@@ -1,10 +1,15 @@
 import unittest
+import unittest.mock
 import tkinter as tk
 import sys
 import os
 import time
+import tempfile
+import contextlib
+import numpy as np
 from tkinter import font
 from io import StringIO
+from concurrent.futures.process import BrokenProcessPool
 
 sys.path.append(os.path.join("..", "config"))
 from program_paths import IMPORT_PATHS
@@ -13,8 +18,17 @@ for path in IMPORT_PATHS:
     sys.path.append(os.path.join("..", path))
     
 from model import Model
-from script_interface import ScriptInterface
+from script_interface import ScriptInterface, ScriptHelper
+from headless_model import HeadlessModel
 from configuration_class_calculation import ConfigurationClass
+from sampler import Sampler, SAMPLING_STRATEGIES
+from evaluation_plan import EvaluationPlan
+from parallel_evaluation import shut_down_process_pool
+from sensitivity_analysis import analyze_sensitivity, get_manual_input_setup_attributes
+from result_cache import ResultCache
+from calculation_type_registry import CalculationTypeRegistry
+from diagnostics import diagnostics, CYCLIC_ATTRIBUTES, INVALID_INPUT_VALUE, UNSUPPORTED_INPUT_VALUE_TYPE, PARALLEL_CALCULATION_FAILED, PLUGIN_NOT_LOADED, DUPLICATE_CALCULATION_TYPE, RESULT_CACHE_FAILED
+from attribute_value import MISSING_VALUE
 from helper_functions_general import convert_grid_coordinate_to_actual, convert_actual_coordinate_to_grid
 from default_coordinate_functions import get_block_start_coordinates
 from config import *
@@ -678,7 +692,7 @@ class TestConnections(Test):
         self.assertEqual(len(input_setup_attribute.get_connected_setup_attributes()), 1)
         
 class TestCalculations(Test):
-    def create_system(self, input_value_type, output_value_types, calculation_type):
+    def create_system(self, input_value_type, output_value_types, calculation_type, input_setup_class_scalars=None):
         input_configuration_class = ConfigurationClass("Input")
         input_configuration_attribute = input_configuration_class.create_attribute("Attribute")
         input_configuration_attribute.set_value_type(input_value_type)
@@ -695,10 +709,35 @@ class TestCalculations(Test):
         input_setup_class = input_configuration_class.create_setup_version()
         output_setup_class = output_configuration_class.create_setup_version()
         
-        input_setup_class.set_input_setup_class(output_setup_class)
+        input_setup_class.set_input_setup_class(output_setup_class, input_setup_class_scalars)
         
         return input_setup_class, input_setup_class.get_setup_attributes()[0], output_setup_class, output_setup_class.get_setup_attributes()
         
+    def create_chain(self, num_setup_classes, input_setup_class_scalars=None):
+        """
+        Creates setup versions of a configuration class with a single number attribute, where each setup class takes input from the previous one
+        
+        Returns a list of the setup attributes of the setup classes, in the order of the chain
+        """
+        configuration_class = ConfigurationClass("Chain")
+        configuration_attribute = configuration_class.create_attribute("Attribute")
+        configuration_attribute.set_value_type(ValueTypeNumber)
+        configuration_attribute.set_calculation_type(CalculationTypeAND)
+        configuration_attribute.add_input_configuration_attribute(configuration_attribute, False)
+        
+        setup_classes = []
+        
+        for i in range(num_setup_classes):
+            setup_class = configuration_class.create_setup_version()
+            setup_class.set_instance_name(f"Instance {i}")
+            
+            if i > 0:
+                setup_class.set_input_setup_class(setup_classes[-1], input_setup_class_scalars)
+                
+            setup_classes.append(setup_class)
+            
+        return [setup_class.get_setup_attributes()[0] for setup_class in setup_classes]
+        
     def check_calculation(self, calculation_type, input_value_type, output_value_types, output_values, result):
         input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(input_value_type, output_value_types, calculation_type)
         
@@ -733,7 +772,599 @@ class TestCalculations(Test):
     def test_sample_triangle(self):
         self.check_calculation(CalculationTypeSampleTriangle, ValueTypeProbability, [ValueTypeTriangleDistribution]*2, ["1 / 2 / 3", "4 / 5 / 6"], "0")
         self.check_calculation(CalculationTypeSampleTriangle, ValueTypeProbability, [ValueTypeTriangleDistribution]*2, ["4 / 5 / 6", "1 / 2 / 3"], "1")
+        
+    def test_evaluation_plan_order(self):
+        setup_attributes = self.create_chain(5, [2])
+        setup_attributes[0].set_value((3.0,))
+        
+        # Setup attributes that the specified ones take input from are included, ordered after their inputs
+        evaluation_plan = EvaluationPlan([setup_attributes[-1]])
+        self.assertEqual(evaluation_plan.get_ordered_setup_attributes(), setup_attributes)
+        self.assertEqual(evaluation_plan.get_levels(), [[setup_attribute] for setup_attribute in setup_attributes])
+        
+        evaluation_plan.evaluate()
+        self.assertEqual(setup_attributes[-1].get_value(), (48,))
+        
+        # Connecting setup classes changes the structure, so the plan has to be built again
+        self.assertFalse(evaluation_plan.is_outdated())
+        setup_attributes[0].get_setup_class().set_input_setup_class(self.create_chain(1)[0].get_setup_class())
+        self.assertTrue(evaluation_plan.is_outdated())
+        
+    def test_evaluation_plan_cycle(self):
+        setup_attributes = self.create_chain(3)
+        diagnostics.clear()
+        
+        # Closing the chain makes every setup attribute (indirectly) take itself as input
+        setup_attributes[0].get_setup_class().set_input_setup_class(setup_attributes[-1].get_setup_class())
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        
+        self.assertEqual(evaluation_plan.get_ordered_setup_attributes(), [])
+        self.assertIn(CYCLIC_ATTRIBUTES, [record["code"] for record in diagnostics.get_records()])
+        
+        evaluation_plan.evaluate()
+        
+        for setup_attribute in setup_attributes:
+            self.assertEqual(setup_attribute.get_attribute_value(), MISSING_VALUE)
+            self.assertFalse(setup_attribute.is_dirty())
+            
+    def test_incremental_recalculation(self):
+        setup_attributes = self.create_chain(4, [2])
+        setup_attributes[0].set_value((1.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        self.assertEqual(evaluation_plan.evaluate(), setup_attributes)
+        
+        # Nothing changed since the last evaluation
+        self.assertEqual(evaluation_plan.evaluate(), [])
+        
+        # Changing a value marks it as dirty, which recalculates everything taking input from it
+        setup_attributes[0].set_value((3.0,))
+        self.assertTrue(setup_attributes[0].is_dirty())
+        self.assertEqual(evaluation_plan.evaluate(), setup_attributes)
+        self.assertEqual(setup_attributes[-1].get_value(), (24,))
+        
+        for setup_attribute in setup_attributes:
+            self.assertFalse(setup_attribute.is_dirty())
+            
+        # Overriding a value in the middle of the chain only recalculates from there
+        setup_attributes[2].set_override_value((1.0,))
+        self.assertEqual(evaluation_plan.evaluate(), setup_attributes[2:])
+        self.assertEqual(setup_attributes[-1].get_value(), (2,))
+        
+        setup_attributes[2].reset_override_value()
+        self.assertEqual(evaluation_plan.evaluate(), setup_attributes[2:])
+        self.assertEqual(setup_attributes[-1].get_value(), (24,))
+        
+    def test_scenarios(self):
+        setup_attributes = self.create_chain(4, [2])
+        setup_attributes[0].set_value((3.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        scenario_values_per_attribute = evaluation_plan.evaluate_scenarios([{setup_attributes[0]: (1.0,)}, {setup_attributes[2]: (5.0,)}, {}], setup_attributes[1:])
+        
+        # Each scenario gives the same values as evaluating with its override values set
+        self.assertEqual([scenario_values.get_values() for scenario_values in scenario_values_per_attribute], [[(2,), (6,), (6,)], [(4,), (5,), (12,)], [(8,), (10,), (24,)]])
+        self.assertEqual(scenario_values_per_attribute[-1].get_base_value(), (24,))
+        
+        # The values of the setup attributes are not changed by the scenarios
+        self.assertEqual([setup_attribute.get_value() for setup_attribute in setup_attributes], [(3,), (6,), (12,), (24,)])
+        self.assertFalse(setup_attributes[2].has_override_value())
+        self.assertEqual(evaluation_plan.evaluate(), [])
+        
+    def test_scenarios_with_text(self):
+        setup_attributes = self.create_chain(3, [2])
+        setup_attributes[0].set_value((3.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        evaluation_plan.evaluate()
+        diagnostics.clear()
+        
+        # Values that are not numbers are kept as they are, without being reported as invalid input values
+        scenario_values = evaluation_plan.evaluate_scenarios([{setup_attributes[-1]: ("Text",)}, {}], setup_attributes[-1:])[0]
+        self.assertEqual(scenario_values.get_values(), [("Text",), (12,)])
+        self.assertNotIn(INVALID_INPUT_VALUE, [record["code"] for record in diagnostics.get_records()])
+        
+    def test_sensitivity_analysis(self):
+        setup_attributes = self.create_chain(3, [2])
+        setup_attributes[0].set_value((10.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        
+        # Only the first setup attribute is entered manually, so it is the only one changed by default
+        self.assertEqual(get_manual_input_setup_attributes(evaluation_plan, setup_attributes[-1]), setup_attributes[:1])
+        self.assertEqual(analyze_sensitivity(evaluation_plan, setup_attributes[-1]), [(setup_attributes[0], (36,), (44,), 8)])
+        
+        # Specified low and high values can also change calculated setup attributes, where the largest effect comes first
+        sensitivities = analyze_sensitivity(evaluation_plan, setup_attributes[-1], low_high_values_per_attribute={setup_attributes[0]: ((5.0,), (15.0,)), setup_attributes[1]: ((0.0,), (100.0,))})
+        self.assertEqual(sensitivities, [(setup_attributes[1], (0,), (200,), 200), (setup_attributes[0], (20,), (60,), 40)])
+        self.assertEqual(setup_attributes[-1].get_value(), (40,))
+        
+    def test_result_cache(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        file_path = os.path.join(temporary_directory.name, "results.pickle")
+        
+        setup_attributes = self.create_chain(4, [2])
+        setup_attributes[0].set_value((3.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        evaluation_plan.evaluate()
+        
+        result_cache = ResultCache(file_path)
+        result_cache.update(evaluation_plan)
+        result_cache.save()
+        self.assertEqual(result_cache.get_num_values(), 3)
+        
+        # A setup created the same way finds all calculated values in the cache, so nothing has to be calculated
+        setup_attributes = self.create_chain(4, [2])
+        setup_attributes[0].set_value((3.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        self.assertEqual(ResultCache(file_path).apply(evaluation_plan), setup_attributes[1:])
+        self.assertEqual(evaluation_plan.evaluate(), [])
+        self.assertEqual(setup_attributes[-1].get_value(), (24,))
+        
+        # A changed input value changes the keys of all setup attributes depending on it, which are then calculated again
+        setup_attributes = self.create_chain(4, [2])
+        setup_attributes[0].set_value((1.0,))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        self.assertEqual(ResultCache(file_path).apply(evaluation_plan), [])
+        self.assertEqual(evaluation_plan.evaluate(), setup_attributes[1:])
+        self.assertEqual(setup_attributes[-1].get_value(), (8,))
+        
+        # Files that cannot be read or written are reported as warnings, where all values are then calculated
+        with open(file_path, "wb") as file_cache:
+            file_cache.write(b"Not a result cache")
+            
+        diagnostics.clear()
+        self.assertEqual(ResultCache(file_path).apply(evaluation_plan), [])
+        ResultCache(os.path.join(file_path, "results.pickle")).save()
+        self.assertEqual([record["code"] for record in diagnostics.get_records()], [RESULT_CACHE_FAILED]*2)
+        
+    def test_plugins(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        
+        plugin_texts_per_module_name = {"test_plugin_maximum": "import numpy as np\n" \
+                                                               "from general_calculations import CalculationType, ValueTypeNumber\n" \
+                                                               "class CalculationTypeTestMaximum(CalculationType):\n" \
+                                                               "    @staticmethod\n" \
+                                                               "    def symbol(): return 'TEST MAX'\n" \
+                                                               "    @classmethod\n" \
+                                                               "    def check_input_value_types(cls, value_type, input_value_types):\n" \
+                                                               "        return None if set(input_value_types) == {ValueTypeNumber} else 'Warning: Only numbers'\n" \
+                                                               "    @staticmethod\n" \
+                                                               "    def calculate_output_value(input_values, sampler): return np.max(np.stack(input_values), axis=0)\n", \
+                                        "test_plugin_other": "from general_calculations import CalculationType\n" \
+                                                             "class CalculationTypeTestDuplicate(CalculationType):\n" \
+                                                             "    @staticmethod\n" \
+                                                             "    def symbol(): return 'TEST MAX'\n", \
+                                        "test_plugin_broken": "raise ImportError('Broken plugin')\n", \
+                                        "PLUGIN_TEMPLATE": "from general_calculations import CalculationType\n" \
+                                                           "class CalculationTypeTestTemplate(CalculationType):\n" \
+                                                           "    @staticmethod\n" \
+                                                           "    def symbol(): return 'TEST TEMPLATE'\n"}
+                                                           
+        for module_name, plugin_text in plugin_texts_per_module_name.items():
+            with open(os.path.join(temporary_directory.name, f"{module_name}.py"), "w") as file_plugin:
+                file_plugin.write(plugin_text)
+                
+            self.addCleanup(sys.modules.pop, module_name, None)
+            
+        self.addCleanup(sys.path.remove, temporary_directory.name)
+        
+        calculation_type_registry = CalculationTypeRegistry()
+        
+        for calculation_type in CALCULATION_TYPES:
+            calculation_type_registry.register(calculation_type)
+            
+        diagnostics.clear()
+        
+        with contextlib.redirect_stdout(StringIO()):
+            calculation_type_registry.load_plugins(temporary_directory.name, CalculationType)
+            
+        # Only the first calculation type with a symbol is added, while the template and plugins that cannot be imported are skipped
+        calculation_types = calculation_type_registry.get_calculation_types()
+        self.assertEqual(calculation_types[:-1], CALCULATION_TYPES)
+        self.assertEqual(calculation_types[-1].__name__, "CalculationTypeTestMaximum")
+        self.assertEqual(sorted(record["code"] for record in diagnostics.get_records()), sorted([DUPLICATE_CALCULATION_TYPE, PLUGIN_NOT_LOADED]))
+        
+        # The calculation type decides which input value types it can be calculated from
+        input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeNumber, [ValueTypeNumber]*2, calculation_types[-1])
+        
+        for setup_attribute, value in zip(output_setup_attributes, ["1", "3"]):
+            setup_attribute.set_value(convert_string_to_value(value))
+            
+        input_setup_attribute.calculate_value()
+        self.assertEqual(input_setup_attribute.get_value(), (3,))
+        
+        diagnostics.clear()
+        output_setup_attributes[0].get_configuration_attribute().set_value_type(ValueTypeProbability)
+        self.assertFalse(input_setup_attribute.get_configuration_attribute().is_correctly_connected())
+        self.assertEqual([(record["code"], record["message"]) for record in diagnostics.get_records()], [(UNSUPPORTED_INPUT_VALUE_TYPE, "Warning: Only numbers")])
+        
+    def test_validation_cache(self):
+        input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeNumber, [ValueTypeNumber]*2, CalculationTypeAND)
+        configuration_attribute = input_setup_attribute.get_configuration_attribute()
+        output_configuration_attribute = output_setup_attributes[0].get_configuration_attribute()
+        
+        with unittest.mock.patch.object(ValueTypeNumber, "correctly_connected", wraps=ValueTypeNumber.correctly_connected) as correctly_connected:
+            # The validation is kept until the configuration attribute or the value type of an input changes
+            self.assertTrue(configuration_attribute.is_correctly_connected())
+            self.assertTrue(configuration_attribute.is_correctly_connected())
+            self.assertEqual(correctly_connected.call_count, 1)
+            
+            output_configuration_attribute.set_value_type(ValueTypeString)
+            self.assertFalse(configuration_attribute.is_correctly_connected())
+            self.assertEqual(correctly_connected.call_count, 2)
+            
+            configuration_attribute.remove_input_configuration_attribute(output_configuration_attribute)
+            self.assertTrue(configuration_attribute.is_correctly_connected())
+            self.assertEqual(correctly_connected.call_count, 3)
+            
+            configuration_attribute.add_input_configuration_attribute(output_configuration_attribute, False)
+            self.assertFalse(configuration_attribute.is_correctly_connected())
+            self.assertEqual(correctly_connected.call_count, 4)
+            
+    def test_exact_triangle_comparison(self):
+        self.addCleanup(settings.set_exact_triangle_comparison, settings.uses_exact_triangle_comparison())
+        settings.set_exact_triangle_comparison(True)
+        
+        # With densities 2x and 2(1 - y) on [0, 1], the probability that X > Y is the integral of 2x(2x - x^2) from 0 to 1, which is 5/6
+        self.assertAlmostEqual(calculate_probability_first_greater((0, 1, 1), (0, 0, 1)), 5/6)
+        self.assertAlmostEqual(calculate_probability_first_greater((0, 0, 1), (0, 1, 1)), 1/6)
+        
+        # Identical distributions are equally likely to give the greater value
+        self.assertAlmostEqual(calculate_probability_first_greater((1, 2, 4), (1, 2, 4)), 0.5)
+        
+        self.check_calculation(CalculationTypeSampleTriangle, ValueTypeProbability, [ValueTypeTriangleDistribution]*2, ["0 / 1 / 1", "0 / 0 / 1"], str(round(5/6, DECIMALS_WHEN_ROUNDING)))
+        self.check_calculation(CalculationTypeSampleTriangle, ValueTypeProbability, [ValueTypeTriangleDistribution]*2, ["1 / 2 / 3", "4 / 5 / 6"], "0")
+        
+    def test_batch_calculations(self):
+        self.addCleanup(settings.set_batch_calculations, settings.uses_batch_calculations())
+        
+        # Systems with different numbers of inputs, so that the inputs of some are padded in the batch
+        output_values_per_value_type = {ValueTypeNumber: [["3", "1", "2"], ["4"], ["0.5", "2"]], \
+                                        ValueTypeTriangleDistribution: [["7 / 3 / 4", "1 / 6 / 9", "5 / 8 / 2"], ["1 / 2 / 3"], ["2 / 5 / 4", "3 / 1 / 6"]]}
+                                        
+        for calculation_type in (CalculationTypeMean, CalculationTypeAND, CalculationTypeOR):
+            for value_type, output_values_per_system in output_values_per_value_type.items():
+                input_setup_attributes = []
+                
+                for output_values in output_values_per_system:
+                    input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(value_type, [value_type]*len(output_values), calculation_type)
+                    input_setup_attributes.append(input_setup_attribute)
+                    
+                    for setup_attribute, value in zip(output_setup_attributes, output_values):
+                        setup_attribute.set_value(convert_string_to_value(value))
+                        
+                evaluation_plan = EvaluationPlan(input_setup_attributes)
+                values_per_setting = []
+                
+                # The values calculated together as a batch should be the same as when calculated one at a time
+                for uses_batch_calculations in (False, True):
+                    settings.set_batch_calculations(uses_batch_calculations)
+                    
+                    for input_setup_attribute in input_setup_attributes:
+                        input_setup_attribute.mark_dirty()
+                        
+                    evaluation_plan.evaluate()
+                    values_per_setting.append([input_setup_attribute.get_value() for input_setup_attribute in input_setup_attributes])
+                    
+                self.assertEqual(values_per_setting[0], values_per_setting[1])
+                
+    def test_batch_calculation_warnings(self):
+        self.addCleanup(settings.set_batch_calculations, settings.uses_batch_calculations())
+        
+        setup_attributes = self.create_chain(2)
+        setup_attributes[0].set_value(("Text",))
+        
+        evaluation_plan = EvaluationPlan(setup_attributes)
+        records_per_setting = []
+        
+        # Warnings found when calculating in a batch are attributed to the same class instance as when calculating one at a time
+        for uses_batch_calculations in (False, True):
+            settings.set_batch_calculations(uses_batch_calculations)
+            diagnostics.clear()
+            
+            setup_attributes[1].mark_dirty()
+            evaluation_plan.evaluate()
+            records_per_setting.append(diagnostics.get_records())
+            
+        self.assertEqual(records_per_setting[0], records_per_setting[1])
+        self.assertEqual([(record["code"], record["class_instance"]) for record in records_per_setting[1]], [(INVALID_INPUT_VALUE, "Instance 1")])
+        
+    def create_components(self):
+        """
+        Creates several setup classes that are not connected to each other, so that they can be calculated in separate processes
+        
+        Returns a list of the setup attributes of all setup classes
+        """
+        setup_attributes = []
+        
+        for i in range(4):
+            chain_setup_attributes = self.create_chain(3, [2])
+            chain_setup_attributes[0].set_value((float(i),))
+            
+            input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeTriangleDistribution, [ValueTypeTriangleDistribution]*2, CalculationTypeAND)
+            
+            for setup_attribute, value in zip(output_setup_attributes, ["1 / 2 / 3", f"{i} / {i + 1} / {i + 4}"]):
+                setup_attribute.set_value(convert_string_to_value(value))
+                
+            setup_attributes += chain_setup_attributes + [input_setup_attribute] + output_setup_attributes
+            
+        return setup_attributes
+        
+    def evaluate_in_processes(self, evaluation_plan, num_processes):
+        """
+        Calculates all setup attributes of a plan again using the specified number of processes, returning their values and sampling errors
+        """
+        self.addCleanup(settings.set_num_processes, settings.get_num_processes())
+        settings.set_num_processes(num_processes)
+        
+        for setup_attribute in evaluation_plan.get_ordered_setup_attributes():
+            setup_attribute.mark_dirty()
+            
+        evaluation_plan.evaluate()
+        
+        return [(setup_attribute.get_value(), setup_attribute.get_sampling_error()) for setup_attribute in evaluation_plan.get_ordered_setup_attributes()]
+        
+    def test_parallel_evaluation(self):
+        self.addCleanup(shut_down_process_pool)
+        self.addCleanup(settings.set_monte_carlo, settings.uses_monte_carlo())
+        
+        evaluation_plan = EvaluationPlan(self.create_components())
+        self.assertEqual(len(evaluation_plan.get_components()), 8)
+        
+        # Samplers draw the same samples for a setup attribute in any process, so the values are the same as when calculated in a single process
+        for uses_monte_carlo in (False, True):
+            settings.set_monte_carlo(uses_monte_carlo)
+            diagnostics.clear()
+            
+            self.assertEqual(self.evaluate_in_processes(evaluation_plan, 2), self.evaluate_in_processes(evaluation_plan, 1))
+            self.assertEqual(diagnostics.get_records(), [])
+            
+    def test_parallel_evaluation_failure(self):
+        class BrokenPool:
+            def map(self, *args):
+                raise BrokenProcessPool("A process terminated abruptly")
+                
+        self.addCleanup(shut_down_process_pool)
+        evaluation_plan = EvaluationPlan(self.create_components())
+        values = self.evaluate_in_processes(evaluation_plan, 1)
+        
+        # The values are instead calculated in the program's own process, with a warning that the processes could not be used
+        with unittest.mock.patch("evaluation_plan.get_process_pool", return_value=BrokenPool()):
+            diagnostics.clear()
+            self.assertEqual(self.evaluate_in_processes(evaluation_plan, 2), values)
+            
+        self.assertEqual([record["code"] for record in diagnostics.get_records()], [PARALLEL_CALCULATION_FAILED])
+        
+    def test_sampling_streams(self):
+        input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeTriangleDistribution, [ValueTypeTriangleDistribution]*2, CalculationTypeAND)
+        
+        for sampling_strategy in SAMPLING_STRATEGIES:
+            sampler = Sampler(1000, sampling_strategy=sampling_strategy)
+            samples_per_attribute = [sampler.for_setup_attribute(setup_attribute).sample_triangle(0, 1, 2) for setup_attribute in output_setup_attributes]
+            
+            # The same setup attribute draws the same samples every time, while different setup attributes draw independent samples
+            np.testing.assert_array_equal(sampler.for_setup_attribute(output_setup_attributes[0]).sample_triangle(0, 1, 2), samples_per_attribute[0])
+            self.assertLess(abs(np.corrcoef(samples_per_attribute)[0, 1]), 0.1)
+            
+    def test_seeded_sampling(self):
+        self.addCleanup(settings.set_seed, settings.get_seed())
+        values_per_seed = {}
+        
+        for seed in (1, 2, 1):
+            settings.set_seed(seed)
+            
+            input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeProbability, [ValueTypeTriangleDistribution]*2, CalculationTypeSampleTriangle)
+            
+            for setup_attribute, value in zip(output_setup_attributes, ["1 / 2 / 3", "1.5 / 2 / 4"]):
+                setup_attribute.set_value(convert_string_to_value(value))
+                
+            input_setup_attribute.calculate_value()
+            
+            # A new setup with the same names and seed draws the same samples
+            if seed in values_per_seed:
+                self.assertEqual(input_setup_attribute.get_value(), values_per_seed[seed])
                 
+            values_per_seed[seed] = input_setup_attribute.get_value()
+            
+        self.assertNotEqual(values_per_seed[1], values_per_seed[2])
+        
+    def test_antithetic_sampling(self):
+        triangle_distributions = [np.array([1, 2, 3]), np.array([1.5, 2, 4])]
+        exact_ratio = calculate_probability_first_greater(*[tuple(triangle_distribution) for triangle_distribution in triangle_distributions])
+        ratios_per_strategy = {}
+        
+        # Estimate the ratio with different seeds, which should on average give the exact ratio for both strategies
+        for sampling_strategy in ("Random", "Antithetic"):
+            ratios_per_strategy[sampling_strategy] = [CalculationTypeSampleTriangle.calculate_output_value(triangle_distributions, Sampler(200, seed=seed, sampling_strategy=sampling_strategy))[0] for seed in range(300)]
+            self.assertAlmostEqual(np.mean(ratios_per_strategy[sampling_strategy]), exact_ratio, delta=0.01)
+            
+        self.assertLess(np.var(ratios_per_strategy["Antithetic"]), np.var(ratios_per_strategy["Random"]))
+        
+    def test_adaptive_sampling(self):
+        num_samples_per_comparison = {}
+        
+        for name, (first_triangle_distribution, second_triangle_distribution) in {"Separated": ((10, 11, 12), (0, 1, 2)), "Close": ((1.1, 2, 3), (1, 2, 3))}.items():
+            sampler = Sampler(100000, sampling_tolerance=0.01, min_samples=100)
+            num_samples_per_comparison[name] = 0
+            
+            def draw_comparisons(num_samples):
+                num_samples_per_comparison[name] += num_samples
+                return sampler.sample_triangle(*first_triangle_distribution, num_samples) > sampler.sample_triangle(*second_triangle_distribution, num_samples)
+                
+            sampler.estimate_ratio(draw_comparisons)
+            self.assertLessEqual(sampler.get_sampling_error(), 0.01)
+            
+        # Sampling stops as soon as the error is below the tolerance, which takes more samples the closer the ratio is to 0.5
+        self.assertEqual(num_samples_per_comparison["Separated"], 100)
+        self.assertGreater(num_samples_per_comparison["Close"], 1000)
+        self.assertLess(num_samples_per_comparison["Close"], 100000)
+        
+    def check_monte_carlo_calculation(self, input_setup_attribute, result):
+        """
+        Checks a calculated value using Monte Carlo simulation, where each number of the result only has to be close to the calculated number
+        """
+        self.addCleanup(settings.set_monte_carlo, settings.uses_monte_carlo())
+        settings.set_monte_carlo(True)
+        
+        input_setup_attribute.calculate_value()
+        value = input_setup_attribute.get_value()
+        
+        self.assertEqual(len(value), len(result))
+        
+        for number, expected_number in zip(value, result):
+            self.assertAlmostEqual(number, expected_number, delta=0.1)
+            
+    def test_monte_carlo_input_without_value(self):
+        input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeTriangleDistribution, [ValueTypeTriangleDistribution]*2, CalculationTypeAND)
+        output_setup_attributes[0].set_value(convert_string_to_value("1 / 2 / 3"))
+        
+        # The second input is calculated without any inputs of its own, giving the default triangle distribution which should be sampled like any other
+        output_setup_attributes[1].get_configuration_attribute().set_calculation_type(CalculationTypeAND)
+        
+        self.check_monte_carlo_calculation(input_setup_attribute, (1 + 0.1**0.5, 2, 3 - 0.1**0.5))
+        self.assertEqual(output_setup_attributes[1].get_value(), (0, 0, 0))
+        
+    def test_monte_carlo_separate_input_scalars(self):
+        input_setup_class, input_setup_attribute, output_setup_class, output_setup_attributes = self.create_system(ValueTypeTriangleDistribution, [ValueTypeTriangleDistribution], CalculationTypeMean, [1, 2, 3])
+        output_setup_attributes[0].set_value(convert_string_to_value("1 / 2 / 3"))
+        
+        # Scaling a, b and c separately gives the triangle distribution 1 / 4 / 9, shown as its 5th, 50th and 95th percentiles
+        self.check_monte_carlo_calculation(input_setup_attribute, (1 + 1.2**0.5, 9 - 20**0.5, 9 - 2**0.5))
+        
+class TestHeadless(unittest.TestCase):
+    def setUp(self):
+        """
+        Restores a save without creating any GUI, such that the tests can run without a display
+        """
+        self.headless_model = HeadlessModel(os.path.join("..", "saves", "example_single"))
+        self.script_if = ScriptInterface(self.headless_model)
+        self.setup_view = self.headless_model.get_setup_views()[1]
+        
+    def test_name_index(self):
+        name_index = self.headless_model.get_name_index()
+        setup_classes_gui = name_index.get_setup_classes(self.setup_view, "Defense mechanism", None)
+        self.assertEqual([setup_class_gui.get_name() for setup_class_gui in setup_classes_gui], ["Multi-factor authentication", "Update software of user data storage", "Restrict file and directory permissions"])
+        
+        # A renamed setup class is found by its new name, while keeping its place in the order of its view
+        setup_classes_gui[1].get_setup_class().set_instance_name("Patch user data storage")
+        name_index.update_names(setup_classes_gui[1])
+        
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, "Defense mechanism", None), setup_classes_gui)
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, None, "Patch user data storage"), setup_classes_gui[1:2])
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, "Defense mechanism", "Update software of user data storage"), [])
+        
+        # A removed setup class is no longer found, and is found last when added again unless it gets its old number back
+        number = name_index.remove(setup_classes_gui[0])
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, "Defense mechanism", None), setup_classes_gui[1:])
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, None, "Multi-factor authentication"), [])
+        
+        name_index.add(self.setup_view, setup_classes_gui[0])
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, "Defense mechanism", None), setup_classes_gui[1:] + setup_classes_gui[:1])
+        
+        name_index.remove(setup_classes_gui[0])
+        name_index.add_with_number(self.setup_view, setup_classes_gui[0], number)
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, "Defense mechanism", None), setup_classes_gui)
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, None, None), self.setup_view.get_setup_classes_gui())
+        
+        # Setup classes are only found in their own view
+        name_index.remove_view(self.setup_view)
+        self.assertEqual(name_index.get_setup_classes(self.setup_view, None, None), [])
+        other_setup_view = self.headless_model.get_setup_views()[2]
+        self.assertEqual(name_index.get_setup_classes(other_setup_view, "Defense mechanism", None), [setup_class_gui for setup_class_gui in other_setup_view.get_setup_classes_gui() if setup_class_gui.get_configuration_name() == "Defense mechanism"])
+        
+    def test_get_attribute_table(self):
+        view_name = self.setup_view.get_name()
+        self.script_if.calculate_values()
+        
+        class_instances, values_per_attribute = self.script_if.get_attribute_table("Attack event AND", ["Global difficulty", "Probability of success", "Type"], view=view_name)
+        self.assertEqual(class_instances, self.script_if.get_class_instance_names("Attack event AND", view=view_name))
+        
+        # Each row holds the same numbers as the values of the class instance, where values that are not numbers are NaN
+        for row, class_instance in enumerate(class_instances):
+            for attribute, values in values_per_attribute.items():
+                value = self.script_if.get_attribute_values("Attack event AND", class_instance, attribute, view=view_name)[0]
+                
+                if value == ("-",) or attribute == "Type":
+                    self.assertTrue(np.isnan(values[row]).all())
+                else:
+                    np.testing.assert_array_equal(values[row], value)
+                    
+        # All attributes of the class type are included by default
+        self.assertEqual(list(self.script_if.get_attribute_table("Attack event AND", view=view_name)[1]), self.script_if.get_attribute_names("Attack event AND"))
+        
+    def test_script_batch(self):
+        view_name = self.setup_view.get_name()
+        self.script_if.calculate_values()
+        
+        # Changes made one at a time, to compare with the same changes made in a batch
+        other_headless_model = HeadlessModel(os.path.join("..", "saves", "example_single"))
+        other_script_if = ScriptInterface(other_headless_model)
+        other_script_if.override_attribute_values("10", "Defense mechanism", attribute="Cost", view=view_name)
+        other_script_if.override_attribute_values("1", "Attack event AND", class_instance="Stop streaming service", attribute="Local difficulty", view=view_name)
+        other_script_if.calculate_values()
+        
+        with self.script_if.batch():
+            self.script_if.override_attribute_values("10", "Defense mechanism", attribute="Cost", view=view_name)
+            self.script_if.override_attribute_values("1", "Attack event AND", class_instance="Stop streaming service", attribute="Local difficulty", view=view_name)
+            self.script_if.set_class_marker("Changed", "red", class_type="Defense mechanism", view=view_name)
+            
+            # The changes are staged until the end of the batch
+            self.assertEqual(self.script_if.get_attribute_values("Defense mechanism", "Multi-factor authentication", "Cost", view=view_name), [(20,)])
+            self.assertEqual(self.headless_model.get_script_markers(), [])
+            
+        self.assertEqual(self.headless_model.get_results(), other_headless_model.get_results())
+        self.assertEqual([script_marker["class_instance"] for script_marker in self.headless_model.get_script_markers() if script_marker["view"] == view_name], self.script_if.get_class_instance_names("Defense mechanism", view=view_name))
+        
+        # Nothing is applied if the batch is left by an exception
+        with self.assertRaises(ValueError):
+            with self.script_if.batch():
+                self.script_if.reset_override_attribute_values(view=view_name)
+                raise ValueError
+                
+        self.assertEqual(self.script_if.get_attribute_values("Defense mechanism", "Multi-factor authentication", "Cost", view=view_name), [(10,)])
+        
+    def test_cached_lookups(self):
+        view_name = self.setup_view.get_name()
+        script_helper = ScriptHelper(self.headless_model)
+        identifier = ("instances_setup_class_gui", view_name, "Loss event", None)
+        
+        setup_class_gui = script_helper.get_instances_setup_class_gui(view_name, "Loss event", None)[0]
+        self.assertIs(script_helper.get_from_cache(identifier)[0], setup_class_gui)
+        
+        # Connections are tracked by the calculation blocks, so changing one invalidates the cached lookups even without a GUI
+        input_setup_classes = setup_class_gui.get_setup_class().get_input_setup_classes()
+        setup_class_gui.get_setup_class().remove_input_setup_class(list(input_setup_classes)[0])
+        
+        self.assertIsNone(script_helper.get_from_cache(identifier))
+        self.assertEqual(self.script_if.get_input_class_names("Loss event", "Videos unavailable", view=view_name), [("Attack event AND", "Stop streaming service")])
+        
+    def test_restore_save(self):
+        self.assertEqual([setup_view.get_name() for setup_view in self.headless_model.get_setup_views()], ["Loss events, Abuse cases, and Attackers", "Attack tree hacktivist", "Attack tree organized crime group"])
+        self.assertIsNone(self.script_if.get_current_view_name())
+        
+        self.headless_model.calculate_values()
+        results = self.headless_model.get_results()
+        
+        # Connections are restored from the adjacent triangle blocks, so calculated values depend on their inputs
+        self.assertEqual(self.script_if.get_input_class_names("Loss event", "Videos unavailable", view=self.setup_view.get_name()), [("Abuse case", "Block video streaming"), ("Attack event AND", "Stop streaming service")])
+        self.assertAlmostEqual(self.script_if.get_attribute_values("Loss event", "Videos unavailable", "Risk", view=self.setup_view.get_name())[0][0], 1/36)
+        
+        for result in results:
+            self.assertNotIn(result["value"], (["SETUP ERROR"], ["CONFIGURATION ERROR"]))
+            
+        # Nothing changed since the last calculation, and restoring the save again gives the same values
+        self.assertEqual(self.headless_model.calculate_values(), [])
+        
+        other_headless_model = HeadlessModel(os.path.join("..", "saves", "example_single"))
+        other_headless_model.calculate_values()
+        self.assertEqual(other_headless_model.get_results(), results)
+        
 class TestScripts(Test):
     def setUp(self):
         super().setUp()
@@ -809,6 +1440,22 @@ class TestScripts(Test):
             self.elements_are_equal(self.script_if.get_input_class_names("CLASS 0", class_instance_name, input_class_type="CLASS 0", input_class_instance=("CLASS 0 INSTANCE 1")), ())
             self.elements_are_equal(self.script_if.get_input_class_names("CLASS 0", class_instance_name, input_class_instance="CLASS 0 INSTANCE 1"), names)
             
+    def test_cached_lookups(self):
+        view_name = self.setup_view_names[0]
+        self.elements_are_equal(self.script_if.get_class_instance_names("CLASS 0", view_name), ("CLASS 0 INSTANCE 0", "CLASS 0 INSTANCE 1"))
+        
+        # Renaming, adding and removing classes changes what is found by lookups made after the change
+        self.setup_class_gui.set_name("CLASS 0 RENAMED")
+        self.elements_are_equal(self.script_if.get_class_instance_names("CLASS 0", view_name), ("CLASS 0 RENAMED", "CLASS 0 INSTANCE 1"))
+        self.elements_are_equal(self.script_if.get_attribute_values("CLASS 0", "CLASS 0 RENAMED", "CLASS 0 ATTRIBUTE 0", view_name), (("VALUE 0",),))
+        
+        setup_class_gui = self.setup_class(self.setup_class_gui.get_configuration_class_gui(), x=40, y=40, view=self.setup_views[0])
+        setup_class_gui.set_name("CLASS 0 INSTANCE 3")
+        self.elements_are_equal(self.script_if.get_class_instance_names("CLASS 0", view_name), ("CLASS 0 RENAMED", "CLASS 0 INSTANCE 1", "CLASS 0 INSTANCE 3"))
+        
+        setup_class_gui.delete()
+        self.elements_are_equal(self.script_if.get_class_instance_names("CLASS 0", view_name), ("CLASS 0 RENAMED", "CLASS 0 INSTANCE 1"))
+        
     def test_get_attribute_values(self):
         self.elements_are_equal(self.script_if.get_attribute_values("CLASS 0", "CLASS 0 INSTANCE 0", "CLASS 0 ATTRIBUTE 0"), (("VALUE 0",),))
         self.elements_are_equal(self.script_if.get_attribute_values("CLASS 0", "CLASS 0 INSTANCE 0", "CLASS 0 ATTRIBUTE 1"), (("VALUE 1",),))